@@ -0,0 +1,320 @@
+"""Bulk audits: run many URLs through a pool of auditor workers.
+
+URLs come from a text file (one per line, # comments allowed), a
+sitemap.xml (local path or URL, sitemap indexes are followed) or stdin.
+Browser fetches and LLM calls have separate concurrency limits shared by
+all workers. Each URL gets its own reports; failures and timeouts are
+recorded per URL and never stop the run. A consolidated SUMMARY.md and
+summary.json are written next to the per-URL reports, and every item of
+every page is appended to items.jsonl (one row per item). With snapshots=True
+the entries are saved page snapshots and nothing is fetched. With site=True
+all pages are fetched first so components shared across the site are
+audited once (see cro_site), and SITE.md / site.json roll the pages up
+with a PXL-ranked test backlog (see cro_pxl).
+"""
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from cro_dedup import merge_findings
+from cro_pxl import backlog
+from cro_report import item_scale, report_rows
+from cro_site import SiteProfile, shared_items, template_framework
+
+# Entries of the PXL test backlog listed in the site rollup
+BACKLOG_SIZE = 15
+# Merged findings listed in SUMMARY.md (findings.json has all of them)
+FINDINGS_SIZE = 20
+
+
+def _read_sitemap(source, seen=None):
+    """Return page URLs from a sitemap, following nested sitemap indexes."""
+    seen = seen if seen is not None else set()
+    if source in seen:
+        return []
+    seen.add(source)
+
+    if source.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(source, timeout=30) as response:
+            data = response.read()
+    else:
+        with open(source, 'rb') as f:
+            data = f.read()
+
+    root = ET.fromstring(data)
+    urls = []
+    for element in root:
+        loc = next((child.text.strip() for child in element if child.tag.endswith('loc') and child.text), None)
+        if not loc:
+            continue
+        if element.tag.endswith('sitemap'):
+            urls.extend(_read_sitemap(loc, seen))
+        else:
+            urls.append(loc)
+    return urls
+
+
+def read_urls(source):
+    """Read URLs from a file path, a sitemap (path or URL) or '-' for stdin."""
+    if source.endswith('.xml') or source.startswith(('http://', 'https://')):
+        urls = _read_sitemap(source)
+    else:
+        stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+        try:
+            urls = [line.strip() for line in stream if line.strip() and not line.lstrip().startswith('#')]
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    # Drop duplicates but keep the original order
+    return list(dict.fromkeys(urls))
+
+
+class BatchRunner:
+    """Audit a list of URLs with bounded workers, browsers and LLM calls."""
+
+    def __init__(self, auditor_class, urls, workers=4, browser_slots=2, llm_slots=16,
+                 url_timeout=600, output_dir=None, snapshots=False, site=False, **auditor_kwargs):
+        self.auditor_class = auditor_class
+        self.urls = urls
+        self.workers = max(1, workers)
+        self.url_timeout = url_timeout
+        self.output_dir = output_dir or os.path.join("audits", f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.fetch_slots = threading.BoundedSemaphore(max(1, browser_slots))
+        self.llm_slots = threading.BoundedSemaphore(max(1, llm_slots))
+        self.snapshots = snapshots
+        self.site = site
+        self.site_info = None
+        # Auditors that already hold their page (site mode fetches everything up front)
+        self._auditors = {}
+        self._failed = {}
+        if not auditor_kwargs.get("jsonl"):
+            auditor_kwargs["jsonl"] = os.path.join(self.output_dir, "items.jsonl")
+        self.auditor_kwargs = auditor_kwargs
+        self.results = []
+
+    def _new_auditor(self, url):
+        return self.auditor_class(
+            None if self.snapshots else url,
+            snapshot=url if self.snapshots else None,
+            output_dir=self.output_dir,
+            fetch_slots=self.fetch_slots,
+            llm_slots=self.llm_slots,
+            **self.auditor_kwargs
+        )
+
+    def _audit_one(self, url, started):
+        """Run a single audit; never raises."""
+        started[url] = time.time()
+        try:
+            auditor = self._auditors.get(url) or self._new_auditor(url)
+            # Past the timeout the batch stops waiting; the audit stops making calls too
+            auditor.deadline = started[url] + self.url_timeout
+            auditor.run_audit()
+            summary = auditor.summary()
+            summary["status"] = "failed" if auditor.error else "ok"
+            if self.snapshots:
+                summary["snapshot"] = url
+        except Exception as e:
+            summary = {"url": url, "status": "failed", "error": str(e)}
+        summary["seconds"] = round(time.time() - started[url], 1)
+        return summary
+
+    def run(self):
+        """Audit every URL, write the consolidated summary and return per-URL results."""
+        print(f"\n📦 BATCH AUDIT: {len(self.urls)} URLs, {self.workers} workers\n📁 {self.output_dir}\n")
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+
+        if self.site:
+            self._prepare_site()
+
+        started = {}
+        results = dict(self._failed)
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        futures = {pool.submit(self._audit_one, url, started): url for url in self.urls if url not in self._failed}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = future.result()
+
+                # A hung page must not block the batch: give up on it and move on
+                now = time.time()
+                for future in list(pending):
+                    url = futures[future]
+                    if url in started and now - started[url] > self.url_timeout:
+                        pending.discard(future)
+                        results[url] = {"url": url, "status": "timeout",
+                                        "error": f"Timed out after {self.url_timeout}s",
+                                        "seconds": round(now - started[url], 1)}
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        self.results = [results[url] for url in self.urls if url in results]
+        self._save_summary()
+        if self.site:
+            # Auditors are keyed by the input URL; a result's url may be the normalized one
+            self._save_site([url for url in self.urls if results.get(url, {}).get("status") == "ok"])
+        return self.results
+
+    # -------------------------------------------------------------------
+    # Site mode
+    # -------------------------------------------------------------------
+    def _fetch_one(self, url):
+        auditor = self._new_auditor(url)
+        try:
+            ok = auditor.fetch()
+        except Exception as e:
+            auditor.error, ok = str(e), False
+        return url, auditor, ok
+
+    def _prepare_site(self):
+        """Fetch every page, strip the shared template from each and score shared items once."""
+        print(f"🕸️ Site mode: fetching {len(self.urls)} pages before auditing...")
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for url, auditor, ok in pool.map(self._fetch_one, self.urls):
+                if ok:
+                    self._auditors[url] = auditor
+                else:
+                    self._failed[url] = {"url": url, "status": "failed", "error": auditor.error, "seconds": 0}
+        if not self._auditors:
+            return
+
+        profile = SiteProfile([auditor.page for auditor in self._auditors.values()])
+        for auditor in self._auditors.values():
+            auditor.use_page(profile.strip(auditor.page))
+        stats = profile.stats()
+        print(f"🧩 {stats['shared_sections']} shared sections, {stats['shared_testimonials']} testimonials and "
+              f"{stats['shared_ctas']} CTAs repeat across {stats['pages']} pages")
+
+        # The template itself is audited once, as a page of its own
+        template = None
+        first = next(iter(self._auditors.values()))
+        if profile.sections or profile.testimonials:
+            # Not a real URL: keep it out of the shared items.jsonl and the history store
+            kwargs = dict(self.auditor_kwargs, snapshot=None, output_dir=self.output_dir, llm_slots=self.llm_slots,
+                          framework=template_framework(first.framework), jsonl=None, store=None)
+            page = profile.template_page(first.url)
+            template = self.auditor_class(page.url, page=page, **kwargs)
+            template.run_audit()
+
+        # Items with identical inputs on several pages are scored on the first of them only
+        pages = {url: auditor.page for url, auditor in self._auditors.items()}
+        shared = shared_items(first.framework, pages, first.pack)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {fingerprint: pool.submit(self._auditors[urls[0]].score_item, item)
+                       for fingerprint, (item, urls) in shared.items()}
+            site_results = {fingerprint: future.result() for fingerprint, future in futures.items()}
+        for auditor in self._auditors.values():
+            auditor.site_results = site_results
+        reused = sum(len(urls) - 1 for item, urls in shared.values() if item.get("kind", "llm") != "static")
+        print(f"♻️ {len(shared)} items have identical inputs on several pages: {reused} page-level calls saved\n")
+
+        self.site_info = dict(stats, shared_items=len(shared), reused_results=reused,
+                              template=template.summary() if template else None)
+
+    def _save_site(self, done):
+        """Write the site rollup of the pages audited successfully (input URLs or snapshot paths in `done`)."""
+        auditors = [self._auditors[key] for key in done]
+        items = {}
+        for auditor in auditors:
+            for category, entries in auditor.report.items():
+                for entry in entries:
+                    if entry["score"] is None or entry["id"] is None:
+                        continue
+                    row = items.setdefault(entry["id"], {"id": entry["id"], "category": category,
+                                                         "question": entry["question"], "scores": defaultdict(list)})
+                    row["scores"][auditor.url].append(entry["score"])
+        for row in items.values():
+            # Tasks (9, 10) give several entries per page (features, dimensions): average them
+            if any(len(page_scores) > 1 for page_scores in row["scores"].values()):
+                row["question"] = row["category"]
+            scores = [(url, sum(page_scores) / len(page_scores)) for url, page_scores in row.pop("scores").items()]
+            row["pages"] = len(scores)
+            row["average"] = round(sum(score for _, score in scores) / len(scores), 2)
+            row["max"] = item_scale(row["category"])["max"]
+            row["weakest"] = [url for url, _ in sorted(scores, key=lambda pair: pair[1])[:3]]
+
+        template = (self.site_info or {}).get("template")
+        tokens = sum(auditor.tokens_used for auditor in auditors) + (template["tokens"] if template else 0)
+        rows = [row for auditor in auditors for row in report_rows(auditor.json_report())]
+        rollup = dict(self.site_info or {}, generated=datetime.now().isoformat(),
+                      pages_ok=len(auditors), tokens=tokens, backlog=backlog(rows)[:BACKLOG_SIZE],
+                      items=sorted(items.values(), key=lambda row: row["average"] / row["max"]))
+        with open(os.path.join(self.output_dir, "site.json"), 'w', encoding='utf-8') as f:
+            json.dump(rollup, f, indent=2, ensure_ascii=False)
+
+        md = f"# 🕸️ SITE CRO ROLLUP\n\n**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
+        md += f"**Pages audited:** {len(auditors)}\n"
+        md += (f"**Shared components:** {rollup.get('shared_sections', 0)} sections, "
+               f"{rollup.get('shared_testimonials', 0)} testimonials, {rollup.get('shared_ctas', 0)} CTAs")
+        md += f" ([report]({template['report']}.md), {template['score_pct']}%)\n" if template else "\n"
+        md += f"**Shared item results reused:** {rollup.get('reused_results', 0)}\n"
+        md += f"**Tokens:** {tokens:,}\n\n"
+        md += "## Test backlog (PXL)\n\n| PXL | Item | Question | Pages | Test first on | Suggestion |\n"
+        md += "|-----|------|----------|-------|---------------|------------|\n"
+        for entry in rollup["backlog"]:
+            md += (f"| {entry['pxl']} | {entry['id']} | {entry['question']} | {entry['pages']} | "
+                   f"{entry['top_page']} | {entry['suggestion']} |\n")
+        md += "\n## Items across pages (weakest first)\n\n| Item | Question | Average | Pages | Weakest pages |\n"
+        md += "|------|----------|---------|-------|---------------|\n"
+        for row in rollup["items"]:
+            md += (f"| {row['id']} | {row['question']} | {row['average']}/{row['max']} | {row['pages']} | "
+                   f"{', '.join(row['weakest'])} |\n")
+        path = os.path.join(self.output_dir, "SITE.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(md)
+        print(f"🕸️ {path}")
+
+    @staticmethod
+    def _merge_findings(results):
+        """Near-duplicate findings of all audited pages, merged (see cro_dedup)."""
+        rows = []
+        for r in results:
+            try:
+                with open(f"{r['report']}.json", encoding='utf-8') as f:
+                    rows.extend(report_rows(json.load(f)))
+            except Exception:
+                continue
+        return merge_findings(rows)
+
+    def _save_summary(self):
+        """Write SUMMARY.md and summary.json for the whole batch."""
+        ok = [r for r in self.results if r["status"] == "ok"]
+        with open(os.path.join(self.output_dir, "summary.json"), 'w', encoding='utf-8') as f:
+            json.dump({"generated": datetime.now().isoformat(), "results": self.results}, f, indent=2)
+        findings = self._merge_findings(ok)
+        with open(os.path.join(self.output_dir, "findings.json"), 'w', encoding='utf-8') as f:
+            json.dump(findings, f, indent=2, ensure_ascii=False)
+
+        md = f"# 📦 BATCH CRO AUDIT SUMMARY\n\n**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n"
+        md += f"**Pages:** {len(self.results)} ({len(ok)} ok, {len(self.results) - len(ok)} failed/timed out)\n"
+        md += f"**API calls:** {sum(r.get('api_calls', 0) for r in self.results)} "
+        md += f"({sum(r.get('tokens', 0) for r in self.results)} tokens)\n\n"
+        md += "| URL | Status | Score | API calls | Seconds | Report / Error |\n"
+        md += "|-----|--------|-------|-----------|---------|----------------|\n"
+        for r in sorted(self.results, key=lambda r: (r["status"] != "ok", r.get("score_pct") or 0)):
+            score = f"{r['score_pct']}%" if r.get("score_pct") is not None else "-"
+            detail = r.get("report") if r["status"] == "ok" else r.get("error", "")
+            md += f"| {r['url']} | {r['status']} | {score} | {r.get('api_calls', '-')} | {r.get('seconds', '-')} | {detail} |\n"
+
+        recurring = [finding for finding in findings if len(finding["pages"]) > 1][:FINDINGS_SIZE]
+        if recurring:
+            md += "\n## Recurring findings\n\n| Pages | Items | Fix |\n|-------|-------|-----|\n"
+            for finding in recurring:
+                md += f"| {len(finding['pages'])} | {', '.join(finding['items'])} | {finding['suggestion']} |\n"
+
+        path = os.path.join(self.output_dir, "SUMMARY.md")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(md)
+        print(f"\n📊 {path}")
+        print(f"✅ Batch complete: {len(ok)}/{len(self.results)} pages audited.\n")
@@ -0,0 +1,366 @@
+"""Offline benchmark for ComprehensiveCROAuditor.
+
+Serves a corpus of landing-page fixtures from a local HTTP server together
+with a mock OpenAI chat completions endpoint, then audits every fixture
+through the real fetch, extraction and LLM paths. The mock answers
+deterministically (scores and injected 429s depend only on the prompt),
+with configurable latency and error rate, so runs are comparable across
+commits. Reports throughput, p50/p95 per stage, peak RSS and API calls.
+
+    python cro_bench.py --repeat 3 --output bench.json
+    python cro_bench.py --compare bench.json      # exit 1 on regressions
+"""
+import argparse
+import contextlib
+import glob
+import hashlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openai import OpenAI
+
+from live_cro_analyzer import ComprehensiveCROAuditor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Real pages from the repo, used alongside the generated fixtures
+DEFAULT_FIXTURE_FILES = [os.path.join(HERE, name) for name in ("design_framework_v1.html", "design_framework_v2.html")]
+# Generated fixtures: name -> number of feature sections
+FIXTURE_SIZES = {"small": 3, "medium": 40, "large": 400}
+
+STAGES = ("fetch", "http", "parse", "extract", "items", "report", "total")
+
+
+# ===================================================================
+# FIXTURES
+# ===================================================================
+
+def make_fixture(sections, seed=0):
+    """A deterministic landing page with hero, CTAs, testimonials, a form and N feature sections."""
+    rng = random.Random(seed)
+    words = ("fast reliable secure automated testing release pipeline teams deploy quality insight "
+             "platform cloud workflow save hours reduce risk scale confidence developers").split()
+    sentence = lambda n: ' '.join(rng.choice(words) for _ in range(n)).capitalize() + '.'
+
+    parts = [
+        "<!DOCTYPE html><html><head><title>Acme Release Platform</title>",
+        "<style>.btn{padding:8px}</style><script>window.analytics=[];</script></head><body>",
+        "<header><nav><a href='/'>Acme</a><a href='/pricing'>Pricing</a>"
+        "<a class='btn btn-primary' href='/signup'>Start free trial</a></nav></header>",
+        "<main><section class='hero'><h1>Ship releases 50% faster without breaking production</h1>",
+        "<h2>Automated testing and deployment for Salesforce teams</h2>",
+        f"<p>{sentence(30)}</p><p>{sentence(25)}</p>",
+        "<a class='cta-button' href='/demo'>Book a demo</a><img src='/hero.png' alt='Product'></section>",
+    ]
+    for i in range(sections):
+        parts.append(f"<section id='feature-{i}'><h3>Feature {i}: {sentence(4)}</h3>"
+                     f"<p>{sentence(rng.randint(15, 70))}</p><img src='/f{i}.png' alt='Feature {i}'></section>")
+        if i % 10 == 3:
+            parts.append(f"<blockquote class='testimonial'><p>{sentence(20)}</p><cite>Customer {i}</cite></blockquote>")
+    parts += [
+        "<section class='reviews'><div class='review'>Best tool we adopted this year.</div></section>",
+        "<iframe src='https://www.youtube.com/embed/x'></iframe>",
+        "<form action='/signup'><label for='email'>Work email</label><input id='email' type='email' name='email'>"
+        "<input type='text' name='company' placeholder='Company'><button class='btn' type='submit'>Get started</button></form>",
+        "</main><footer><p>© Acme</p></footer></body></html>",
+    ]
+    return ''.join(parts)
+
+
+def load_fixtures(paths=None):
+    """Generated fixtures plus saved HTML files; returns {name: html}."""
+    fixtures = {name: make_fixture(sections, seed=sections) for name, sections in FIXTURE_SIZES.items()}
+    for path in paths if paths is not None else DEFAULT_FIXTURE_FILES:
+        files = sorted(glob.glob(os.path.join(path, "*.html"))) if os.path.isdir(path) else [path]
+        for file in files:
+            with open(file, encoding='utf-8') as f:
+                fixtures[os.path.splitext(os.path.basename(file))[0]] = f.read()
+    return fixtures
+
+
+# ===================================================================
+# LOCAL SERVER (fixtures + mock OpenAI)
+# ===================================================================
+
+def _mock_reply(prompt):
+    """A valid JSON answer for any of the auditor's prompt shapes, derived from the prompt."""
+    rng = random.Random(hashlib.sha256(prompt.encode('utf-8')).hexdigest())
+    result = lambda: {"score": rng.randint(0, 3), "issues": ["Mock issue"], "suggestion": "Mock suggestion"}
+    if '"dimensions"' in prompt:
+        names = ("Specificity", "Uniqueness", "Desire", "Clarity", "Succinctness")
+        return {"dimensions": [{"name": name, "score": rng.randint(1, 10), "analysis": "Mock analysis",
+                                "suggestion": "Mock rewrite"} for name in names]}
+    if '"features"' in prompt:
+        return {"features": [{"feature": f"Feature {i}", "unique": rng.random() < 0.5, "pain_point": "Mock pain",
+                              "severity": rng.randint(1, 5), "frequency": rng.randint(1, 5), "outcome": "Mock outcome"}
+                             for i in range(3)]}
+    ids = re.findall(r'\*\*\[([^\]]+)\] Question', prompt)
+    if ids:
+        return {item_id: result() for item_id in ids}
+    return result()
+
+
+class MockServer:
+    """Serves /<fixture>.html and a mock POST /v1/chat/completions on localhost."""
+
+    def __init__(self, fixtures, latency_ms=50, jitter_ms=20, error_rate=0.0):
+        self.fixtures = fixtures
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.requests = 0
+        self.errors = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body, content_type, headers=()):
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                html = mock.fixtures.get(self.path.strip('/').rsplit('.html', 1)[0])
+                if html is None:
+                    self._send(404, "not found", "text/plain")
+                else:
+                    self._send(200, html, "text/html; charset=utf-8")
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                status, payload, headers = mock.complete(body)
+                self._send(status, json.dumps(payload), "application/json", headers)
+
+        return Handler
+
+    def complete(self, body):
+        """Answer one chat completion request: (status, payload, headers)."""
+        prompt = "\n".join(message.get("content") or "" for message in body.get("messages", []))
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        with self._lock:
+            self.requests += 1
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+
+        # Latency and injected errors depend only on the prompt and attempt, never on timing
+        rng = random.Random(f"{digest}:{attempt}")
+        time.sleep((self.latency_ms + rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000)
+        if rng.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+            error = {"error": {"message": "Mock rate limit", "type": "requests", "code": "rate_limit_exceeded"}}
+            return 429, error, [("Retry-After", "0.1")]
+
+        content = json.dumps(_mock_reply(prompt))
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(content) // 4
+        return 200, {
+            "id": f"mock-{digest[:12]}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }, []
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# ===================================================================
+# BENCHMARK
+# ===================================================================
+
+def percentile(values, pct):
+    """Nearest-rank percentile (None for no values)."""
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process (the browser, if any, is not included)."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmark(fixtures, repeat=3, workers=4, latency_ms=50, jitter_ms=20, error_rate=0.0,
+                  batch=False, max_concurrency=8, fetch_mode="static", quiet=True):
+    """Audit every fixture `repeat` times against the local server; returns the results dict."""
+    server = MockServer(fixtures, latency_ms, jitter_ms, error_rate).start()
+    output_dir = tempfile.mkdtemp(prefix="cro_bench_")
+    client = OpenAI(api_key="mock", base_url=f"{server.base_url}/v1", max_retries=0)
+    jobs = [name for _ in range(repeat) for name in sorted(fixtures)]
+
+    def audit(name):
+        start = time.time()
+        auditor = ComprehensiveCROAuditor(f"{server.base_url}/{name}.html", client=client, output_dir=output_dir,
+                                          fetch_mode=fetch_mode, batch=batch, max_concurrency=max_concurrency)
+        auditor.run_audit()
+        timings = dict(auditor.timings, total=round(time.time() - start, 3))
+        return {"fixture": name, "timings": timings, "api_calls": auditor.api_calls_made,
+                "tokens": auditor.tokens_used, "retries": auditor.llm.retries, "error": auditor.error,
+                "unscored": auditor.summary()["unscored"]}
+
+    started = time.time()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                runs = list(pool.map(audit, jobs))
+    finally:
+        server.stop()
+        shutil.rmtree(output_dir, ignore_errors=True)
+    wall = time.time() - started
+
+    stages = {}
+    for stage in STAGES:
+        values = [run["timings"][stage] for run in runs if stage in run["timings"]]
+        if values:
+            stages[stage] = {"p50": percentile(values, 50), "p95": percentile(values, 95), "n": len(values)}
+
+    return {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "params": {"repeat": repeat, "workers": workers, "latency_ms": latency_ms, "jitter_ms": jitter_ms,
+                   "error_rate": error_rate, "batch": batch, "max_concurrency": max_concurrency,
+                   "fetch_mode": fetch_mode, "fixtures": {name: len(html) for name, html in sorted(fixtures.items())}},
+        "audits": len(runs),
+        "failed": sum(1 for run in runs if run["error"]),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_min": round(60 * len(runs) / wall, 2) if wall else None,
+        "stages": stages,
+        "peak_rss_mb": peak_rss_mb(),
+        "api_calls": sum(run["api_calls"] for run in runs),
+        "mock_requests": server.requests,
+        "mock_errors": server.errors,
+        "retries": sum(run["retries"] for run in runs),
+        "tokens": sum(run["tokens"] for run in runs),
+        "unscored": sum(run["unscored"] for run in runs),
+        "per_fixture": {name: {"api_calls": next(run["api_calls"] for run in runs if run["fixture"] == name),
+                               "total_p50": percentile([run["timings"]["total"] for run in runs
+                                                        if run["fixture"] == name], 50)}
+                        for name in sorted(fixtures)},
+    }
+
+
+def compare(current, baseline, threshold=0.2, min_seconds=0.02):
+    """Return a list of regression messages (slower/less throughput beyond threshold, call count changes)."""
+    problems = []
+    for stage, stats in current["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if not old:
+            continue
+        for key in ("p50", "p95"):
+            if stats[key] - old[key] > max(min_seconds, threshold * old[key]):
+                problems.append(f"{stage} {key}: {old[key]:.3f}s -> {stats[key]:.3f}s")
+    if baseline.get("throughput_per_min") and current["throughput_per_min"] < (1 - threshold) * baseline["throughput_per_min"]:
+        problems.append(f"throughput: {baseline['throughput_per_min']} -> {current['throughput_per_min']} audits/min")
+    if baseline.get("peak_rss_mb") and current["peak_rss_mb"] > (1 + threshold) * baseline["peak_rss_mb"]:
+        problems.append(f"peak RSS: {baseline['peak_rss_mb']} -> {current['peak_rss_mb']} MB")
+    if baseline.get("params", {}).get("fixtures") == current["params"]["fixtures"] and \
+            baseline.get("api_calls") != current["api_calls"] and not current["params"]["error_rate"]:
+        problems.append(f"API calls: {baseline.get('api_calls')} -> {current['api_calls']}")
+    return problems
+
+
+def format_results(results):
+    lines = [f"📏 {results['audits']} audits ({results['failed']} failed) in {results['wall_seconds']}s "
+             f"= {results['throughput_per_min']} audits/min  [commit {results['commit']}]",
+             f"   {'stage':<10}{'p50':>10}{'p95':>10}"]
+    for stage, stats in results["stages"].items():
+        lines.append(f"   {stage:<10}{stats['p50']:>9.3f}s{stats['p95']:>9.3f}s")
+    lines.append(f"   peak RSS {results['peak_rss_mb']} MB, {results['api_calls']} API calls "
+                 f"({results['mock_errors']} injected errors, {results['retries']} retries), {results['tokens']} tokens")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmark of the CRO auditor (local fixtures + mock LLM).")
+    parser.add_argument("--fixtures", nargs="*", metavar="PATH",
+                        help="Saved HTML files or directories added to the generated fixtures "
+                             "(defaults to the design framework pages)")
+    parser.add_argument("--repeat", type=int, default=3, help="Audits per fixture")
+    parser.add_argument("--workers", type=int, default=4, help="Audits running at the same time")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Mock LLM latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="Deterministic +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of mock calls answered with a 429")
+    parser.add_argument("--batch", action="store_true", help="Benchmark with batched item prompts")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="LLM requests in flight per audit")
+    parser.add_argument("--fetch", choices=["static", "auto", "browser"], default="static",
+                        help="Fetch path to exercise (browser needs Chrome)")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare against a saved results file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown counted as a regression")
+    parser.add_argument("--verbose", action="store_true", help="Show the auditor's own output")
+    args = parser.parse_args()
+
+    results = run_benchmark(load_fixtures(args.fixtures), repeat=args.repeat, workers=args.workers,
+                            latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            batch=args.batch, max_concurrency=args.max_concurrency, fetch_mode=args.fetch,
+                            quiet=not args.verbose)
+    print(format_results(results))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("params") != results["params"]:
+            print(f"⚠️ Parameters differ from the baseline (commit {baseline.get('commit')}); timings may not be comparable")
+        regressions = compare(results, baseline, threshold=args.threshold)
+        if regressions:
+            print("❌ Regressions vs " + args.compare + ":\n   " + "\n   ".join(regressions))
+            sys.exit(1)
+        print(f"✅ No regressions vs {args.compare}")
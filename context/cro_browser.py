@@ -0,0 +1,318 @@
+"""Warm headless Chrome instances shared across audits.
+
+Starting Chrome costs seconds and hundreds of MB, so bulk and service runs
+keep a small pool of drivers alive and hand them out per fetch. Cookies
+and web storage are wiped between uses, and a driver is recycled after
+max_pages fetches or once its process tree exceeds max_rss_mb (measured
+with psutil when it is installed).
+
+The same driver can also capture other viewports (see VIEWPORTS) through
+Chrome DevTools device emulation, and read_layout() measures where CTAs
+and form fields end up in the current viewport.
+"""
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+PAGE_LOAD_TIMEOUT = 60
+
+# Scrolling stops at whichever limit is hit first
+SCROLL_TIME_BUDGET = 8.0
+SCROLL_MAX_HEIGHT = 30000
+QUIET_MS = 300
+# Longest wait for quiet after one step (animated pages may never go quiet)
+STEP_MAX_WAIT = 1.2
+
+# Records the time of the last DOM mutation or finished network request. Only nodes and
+# src/srcset count: carousels and animations rewrite style/class attributes every frame
+_INSTALL_QUIET_PROBE = """
+if (!window.__croProbe) {
+    performance.setResourceTimingBufferSize(10000);
+    window.__croProbe = {last: performance.now(), resources: performance.getEntriesByType('resource').length};
+    new MutationObserver(function () { window.__croProbe.last = performance.now(); })
+        .observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'srcset']});
+}
+"""
+
+# Returns [page height, ms since the page last changed, bottom of the viewport, viewport height]
+_READ_QUIET_PROBE = """
+var probe = window.__croProbe, count = performance.getEntriesByType('resource').length;
+if (count !== probe.resources) { probe.resources = count; probe.last = performance.now(); }
+return [document.body.scrollHeight, performance.now() - probe.last,
+        window.scrollY + window.innerHeight, window.innerHeight];
+"""
+
+
+# Device profiles for emulate_viewport(); "desktop" is the window size Chrome starts with
+VIEWPORTS = {
+    "desktop": {"width": 1920, "height": 1080, "scale": 1, "mobile": False, "user_agent": None},
+    "mobile": {
+        "width": 412, "height": 915, "scale": 2.625, "mobile": True,
+        "user_agent": "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "Chrome/124.0.0.0 Mobile Safari/537.36",
+    },
+    "tablet": {
+        "width": 820, "height": 1180, "scale": 2, "mobile": True,
+        "user_agent": "Mozilla/5.0 (Linux; Android 14; Pixel Tablet) AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "Chrome/124.0.0.0 Safari/537.36",
+    },
+}
+
+# Returns the viewport size plus the page-coordinate boxes of CTAs (same selector as
+# cro_page.CTA_CLASS) and of the visible fields of each form
+_READ_LAYOUT = """
+function box(el) {
+    var r = el.getBoundingClientRect();
+    return {x: Math.round(r.left + window.scrollX), y: Math.round(r.top + window.scrollY),
+            w: Math.round(r.width), h: Math.round(r.height)};
+}
+function shown(el) {
+    var s = getComputedStyle(el), r = el.getBoundingClientRect();
+    return r.width > 0 && r.height > 0 && s.visibility !== 'hidden' && s.display !== 'none';
+}
+var ctas = [];
+document.querySelectorAll('a, button').forEach(function (el) {
+    if (ctas.length >= 10 || !/btn|button|cta/i.test(el.getAttribute('class') || '') || !shown(el)) return;
+    var b = box(el);
+    b.text = (el.innerText || '').trim().slice(0, 80);
+    b.font = parseFloat(getComputedStyle(el).fontSize) || null;
+    ctas.push(b);
+});
+var forms = [];
+document.querySelectorAll('form').forEach(function (form) {
+    var fields = [];
+    form.querySelectorAll('input, select, textarea').forEach(function (el) {
+        if (/^(hidden|submit|button|image|reset)$/i.test(el.type || '') || !shown(el)) return;
+        fields.push(box(el));
+    });
+    forms.push({fields: fields});
+});
+return {viewport: [window.innerWidth, window.innerHeight], ctas: ctas, forms: forms};
+"""
+
+
+def chrome_options(window_size="1920,1080"):
+    """Headless Chrome options used for every audit fetch."""
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument(f'--window-size={window_size}')
+    options.add_argument('--log-level=3')
+    return options
+
+
+def new_driver():
+    """Start a fresh headless Chrome."""
+    driver = webdriver.Chrome(options=chrome_options())
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+def emulate_viewport(driver, name):
+    """Switch the driver to a viewport from VIEWPORTS (takes effect on the next page load)."""
+    viewport = VIEWPORTS[name]
+    if not hasattr(driver, "cro_user_agent"):
+        driver.cro_user_agent = driver.execute_script("return navigator.userAgent")
+    driver.execute_cdp_cmd("Emulation.setDeviceMetricsOverride", {
+        "width": viewport["width"], "height": viewport["height"],
+        "deviceScaleFactor": viewport["scale"], "mobile": viewport["mobile"],
+    })
+    driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": viewport["mobile"], "maxTouchPoints": 5})
+    driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": viewport["user_agent"] or driver.cro_user_agent})
+
+
+def clear_emulation(driver):
+    """Undo emulate_viewport()."""
+    if not hasattr(driver, "cro_user_agent"):
+        return
+    driver.execute_cdp_cmd("Emulation.clearDeviceMetricsOverride", {})
+    driver.execute_cdp_cmd("Emulation.setTouchEmulationEnabled", {"enabled": False})
+    driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": driver.cro_user_agent})
+
+
+def read_layout(driver):
+    """Viewport size and the boxes of CTAs and form fields on the loaded page."""
+    return driver.execute_script(_READ_LAYOUT)
+
+
+def driver_rss_mb(driver):
+    """Resident memory of chromedriver and all its Chrome children, or None if unknown."""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def _wait_for_quiet(driver, quiet_ms, deadline, max_wait=STEP_MAX_WAIT):
+    """Poll until neither the DOM nor the network changed for quiet_ms (at most max_wait, or the deadline)."""
+    deadline = min(deadline, time.time() + max_wait)
+    while True:
+        height, quiet_for, bottom, viewport = driver.execute_script(_READ_QUIET_PROBE)
+        if quiet_for >= quiet_ms or time.time() >= deadline:
+            return int(height), int(bottom), int(viewport)
+        time.sleep(min(0.05, max(0, deadline - time.time())))
+
+
+def scroll_page(driver, time_budget=SCROLL_TIME_BUDGET, max_height=SCROLL_MAX_HEIGHT, quiet_ms=QUIET_MS):
+    """Scroll a viewport at a time until the page stops growing, to trigger lazy content.
+    
+    After each step it waits for DOM/network quiescence instead of sleeping a
+    fixed time, and re-measures the height so growing pages are followed.
+    Returns {"seconds", "height", "steps", "stopped"}.
+    """
+    start = time.time()
+    deadline = start + time_budget
+    driver.execute_script(_INSTALL_QUIET_PROBE)
+    height, bottom, viewport = _wait_for_quiet(driver, quiet_ms, deadline)
+    
+    steps = 0
+    stopped = "bottom"
+    while bottom < height:
+        if time.time() >= deadline:
+            stopped = "time budget"
+            break
+        if bottom >= max_height:
+            stopped = "height limit"
+            break
+        driver.execute_script("window.scrollTo(0, arguments[0]);", bottom)
+        steps += 1
+        height, bottom, viewport = _wait_for_quiet(driver, quiet_ms, deadline)
+    
+    return {"seconds": round(time.time() - start, 3), "height": height, "steps": steps, "stopped": stopped}
+
+
+class BrowserPool:
+    """Keep up to `size` warm Chrome drivers and lend them out one fetch at a time."""
+
+    def __init__(self, size=2, max_pages=50, max_rss_mb=1500, driver_factory=new_driver):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.driver_factory = driver_factory
+        self.started = 0
+        self.recycled = 0
+        self._idle = queue.LifoQueue()
+        self._pages = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _acquire(self):
+        """Take an idle driver, start a new one if below size, or wait for one."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                can_start = self._created < self.size
+                if can_start:
+                    self._created += 1
+            if can_start:
+                try:
+                    driver = self.driver_factory()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                with self._lock:
+                    self.started += 1
+                    self._pages[id(driver)] = 0
+                return driver
+
+            # Poll so a slot freed by a retired driver is noticed too
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _retire(self, driver):
+        """Quit a driver and free its slot."""
+        with self._lock:
+            self._created -= 1
+            self.recycled += 1
+            self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _reset(self, driver):
+        """Clear cookies, storage and device emulation so the next page starts from a clean profile.
+
+        Cookies and storage are cleared for every origin the driver visited, not
+        just the loaded one; if Chrome refuses, the caller retires the driver.
+        """
+        try:
+            clear_emulation(driver)
+        except Exception:
+            pass
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": "*", "storageTypes": "all"})
+        driver.execute_script("try { window.sessionStorage.clear(); } catch (e) {}")
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+        except Exception:
+            pass
+        driver.get("about:blank")
+
+    def _release(self, driver, healthy):
+        """Return a driver to the pool, or retire it if it is worn out or broken."""
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            pages = self._pages[id(driver)]
+
+        rss = driver_rss_mb(driver) if healthy and self.max_rss_mb else None
+        if (not healthy or self._closed or pages >= self.max_pages
+                or (rss is not None and rss > self.max_rss_mb)):
+            self._retire(driver)
+            return
+
+        try:
+            self._reset(driver)
+        except Exception:
+            self._retire(driver)
+            return
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self):
+        """Borrow a driver for one fetch: `with pool.driver() as driver: ...`."""
+        driver = self._acquire()
+        healthy = True
+        try:
+            yield driver
+        except Exception:
+            # The page may have left the browser in a bad state; don't reuse it
+            healthy = False
+            raise
+        finally:
+            self._release(driver, healthy)
+
+    def close(self):
+        """Quit every idle driver; drivers still in use are quit when returned."""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(driver)
+
+    def stats(self):
+        return {"started": self.started, "recycled": self.recycled, "alive": self._created}
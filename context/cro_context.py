@@ -0,0 +1,106 @@
+"""Context packing: the most relevant page sections within a token budget.
+
+Copy-based items used to see text_content[:600/800/1000], i.e. whatever
+comes first on the page, nav and cookie banners included, while FAQs,
+testimonials, guarantees and pricing further down were never sent.
+pack_sections() ranks the page's sections (PageModel.sections, which
+already leave out site chrome) by TF-IDF overlap with the item's question
+and guidance, fills the budget with the best ones and returns them in
+page order. Sections that match nothing only top the context up to half
+the budget, starting with the opening copy, so an item about guarantees
+on a page without any costs fewer tokens, not more. Tokens are counted with tiktoken when it is installed
+(~4 characters per token otherwise).
+"""
+import math
+import re
+from collections import Counter
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENCODING = None
+
+CHARS_PER_TOKEN = 4
+# Budget below which a partly used section isn't worth including
+MIN_SECTION_TOKENS = 30
+SEPARATOR = "\n...\n"
+
+WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+STOPWORDS = set("""
+a about above after all also an and any are as at be been being but by can could did do does doing for from
+had has have how i if in into is it its just more most no not of on or our out over own same score should so
+some such than that the their them then there these they this those through to too under up very was we were
+what when where which while who why will with would you your copy page look check clear strong
+""".split())
+
+
+def count_tokens(text):
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_tokens(text, tokens):
+    """Cut text to at most `tokens` tokens, at a word boundary."""
+    if _ENCODING is not None:
+        encoded = _ENCODING.encode(text)
+        if len(encoded) <= tokens:
+            return text
+        text = _ENCODING.decode(encoded[:tokens])
+    elif len(text) <= tokens * CHARS_PER_TOKEN:
+        return text
+    else:
+        text = text[:tokens * CHARS_PER_TOKEN]
+    return text.rsplit(' ', 1)[0] if ' ' in text else text
+
+
+def terms(text):
+    return [word for word in WORD.findall(text.lower()) if word not in STOPWORDS and len(word) > 2]
+
+
+def rank_sections(sections, query):
+    """Relevance of each section to the query (TF-IDF over the page's sections)."""
+    wanted = set(terms(query))
+    counts = [Counter(terms(section["heading"] + " " + section["text"])) for section in sections]
+    df = Counter(term for count in counts for term in wanted & set(count))
+    scores = []
+    for count in counts:
+        score = sum((1 + math.log(count[term])) * math.log(1 + len(sections) / df[term])
+                    for term in wanted if count[term])
+        scores.append(score)
+    return scores
+
+
+def pack_sections(page, query, budget):
+    """The page sections most relevant to `query`, in page order, within `budget` tokens."""
+    sections = page.sections
+    if not sections:
+        return truncate_tokens(page.text_content, budget)
+
+    scores = rank_sections(sections, query)
+    # Best matches first, then the rest in page order while less than half the budget is used
+    matched = sorted((i for i in range(len(sections)) if scores[i] > 0), key=lambda i: (-scores[i], i))
+    order = matched + [i for i in range(len(sections)) if scores[i] <= 0]
+
+    chosen = {}
+    seen = set()
+    remaining = budget
+    for position, i in enumerate(order):
+        if position >= len(matched) and remaining <= budget // 2:
+            break
+        text = sections[i]["text"]
+        if text in seen:
+            continue
+        seen.add(text)
+        size = count_tokens(text)
+        if size > remaining:
+            if remaining < MIN_SECTION_TOKENS:
+                continue
+            text = truncate_tokens(text, remaining)
+            size = count_tokens(text)
+        chosen[i] = text
+        remaining -= size
+        if remaining < MIN_SECTION_TOKENS:
+            break
+    return SEPARATOR.join(chosen[i] for i in sorted(chosen))
@@ -0,0 +1,121 @@
+"""Merge near-duplicate findings into one, across items and pages.
+
+Items overlap, so one audit says "add testimonials" or "add urgency" under
+several items, and a batch says it again on every page. merge_findings()
+clusters the suggestions of items below their maximum by TF-IDF cosine
+similarity and returns one finding per cluster, listing every item and
+page it covers. Clustering is greedy against cluster leaders (the most
+common wording first) through an inverted index, so it stays well under a
+second for 10k findings on one CPU and never chains "add testimonials" to
+"add urgency" through a suggestion that mentions both.
+
+    python cro_dedup.py audits/                    # JSON reports, searched recursively
+    python cro_dedup.py audits/items.jsonl --threshold 0.6 --limit 20
+"""
+import argparse
+import json
+import math
+from collections import Counter, defaultdict
+
+from cro_context import terms
+
+# Cosine similarity at which two suggestions are the same finding
+SIMILARITY = 0.5
+# Distinct issue texts kept on a merged finding
+MAX_ISSUES = 5
+
+
+def _stem(word):
+    """Plural folding, enough for "testimonials" and "testimonial" to match."""
+    return word[:-1] if len(word) > 4 and word.endswith('s') and not word.endswith('ss') else word
+
+
+def _vectors(texts):
+    """Unit-length TF-IDF vectors ({term: weight}) of the texts."""
+    counts = [Counter(_stem(word) for word in terms(text)) for text in texts]
+    df = Counter(term for count in counts for term in count)
+    vectors = []
+    for count in counts:
+        vector = {term: (1 + math.log(n)) * math.log(1 + len(texts) / df[term]) for term, n in count.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vectors.append({term: weight / norm for term, weight in vector.items()})
+    return vectors
+
+
+def cluster(texts, frequency, threshold=SIMILARITY):
+    """Cluster index of each text; texts are tried most frequent first and join the closest leader."""
+    vectors = _vectors(texts)
+    labels = [None] * len(texts)
+    leaders = []
+    # term -> [(leader number, weight)]
+    postings = defaultdict(list)
+    for i in sorted(range(len(texts)), key=lambda i: (-frequency[i], len(texts[i]))):
+        scores = defaultdict(float)
+        for term, weight in vectors[i].items():
+            for leader, leader_weight in postings.get(term, ()):
+                scores[leader] += weight * leader_weight
+        best = max(scores, key=scores.get) if scores else None
+        if best is not None and scores[best] >= threshold:
+            labels[i] = best
+            continue
+        labels[i] = len(leaders)
+        leaders.append(i)
+        for term, weight in vectors[i].items():
+            postings[term].append((labels[i], weight))
+    return labels, leaders
+
+
+def _id_key(item_id):
+    return [int(part) if part.isdigit() else 0 for part in str(item_id).split('.')]
+
+
+def merge_findings(rows, threshold=SIMILARITY):
+    """One finding per group of similar suggestions, most widespread first.
+
+    rows are item rows as written by cro_report.report_rows (a single
+    report's rows, or those of many pages).
+    """
+    rows = [row for row in rows
+            if row["score"] is not None and row["score"] < row["scale_max"] and (row.get("suggestion") or "").strip()]
+    # Identical wording is merged before any vector work
+    by_text = defaultdict(list)
+    for row in rows:
+        by_text[' '.join(row["suggestion"].split())].append(row)
+    texts = list(by_text)
+    labels, leaders = cluster(texts, [len(by_text[text]) for text in texts], threshold)
+
+    members = defaultdict(list)
+    for text, label in zip(texts, labels):
+        members[label].append(text)
+    findings = []
+    for label, group in members.items():
+        grouped = [row for text in group for row in by_text[text]]
+        issues = Counter(issue for row in grouped for issue in row.get("issues") or [])
+        findings.append({
+            "suggestion": texts[leaders[label]],
+            "findings": len(grouped),
+            "items": sorted({row["id"] for row in grouped if row["id"] is not None}, key=_id_key),
+            "pages": sorted({row["url"] for row in grouped}),
+            "variants": len(group),
+            "issues": [issue for issue, _ in issues.most_common(MAX_ISSUES)],
+        })
+    return sorted(findings, key=lambda finding: (-finding["findings"], -len(finding["items"])))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge near-duplicate findings from audit reports.")
+    parser.add_argument("paths", nargs="+", help="JSON reports, items JSONL files or directories")
+    parser.add_argument("--threshold", type=float, default=SIMILARITY,
+                        help="Cosine similarity at which suggestions merge (default: %(default)s)")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print findings as JSON instead of a table")
+    args = parser.parse_args()
+
+    from cro_pxl import load_rows
+    from cro_store import format_rows
+    merged = merge_findings(load_rows(args.paths), args.threshold)[:args.limit]
+    if args.json:
+        print(json.dumps(merged, indent=2, ensure_ascii=False))
+    else:
+        print(format_rows([{"findings": f["findings"], "pages": len(f["pages"]), "items": ', '.join(f["items"]),
+                            "suggestion": f["suggestion"][:80]} for f in merged]))
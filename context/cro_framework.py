@@ -0,0 +1,640 @@
+"""Declarative CRO framework definition.
+
+Each framework item is plain data: the category it reports under, the
+question sent to the LLM, the context builder that renders page data for
+it and the scoring guidance. Objective items also name a local "rule"
+(see cro_rules) that can score them without the LLM. The auditor walks this list instead of a
+hand-written call sequence, so scheduling, batching and caching apply to
+every item the same way. Alternative framework versions can be loaded
+from JSON files with the same shape as DEFAULT_FRAMEWORK.
+"""
+import hashlib
+import json
+
+from cro_context import CHARS_PER_TOKEN, pack_sections
+from cro_rules import RULE_FIELDS, RULES
+
+
+# ===================================================================
+# CONTEXT BUILDERS
+# ===================================================================
+# Each builder takes the PageModel and the item's optional "limit" and
+# returns the context string for the prompt. Copy builders also take the
+# item's query: with one, "limit" (characters of the old leading slice) is
+# the token budget for the most relevant sections instead.
+
+def _first_paragraph(page, missing='None'):
+    return page.hero_paragraphs[0] if page.hero_paragraphs else missing
+
+
+def _hero_copy(page):
+    return '\n'.join(page.hero_paragraphs[:2])
+
+
+def _headline_hero(page, limit=None):
+    return f"H1: '{page.h1}'\nH2: '{page.h2}'\nFirst paragraph: '{_first_paragraph(page)}'"
+
+
+def _headline_audience(page, limit=None):
+    return f"H1: '{page.h1}'\nH2: '{page.h2}'\nHero: '{_first_paragraph(page, '')}'"
+
+
+def _headline_offer(page, limit=None):
+    return f"H1: '{page.h1}'\nH2: '{page.h2}'\nFirst paragraph: '{_first_paragraph(page, '')}'"
+
+
+def _headline(page, limit=None):
+    return f"H1: '{page.h1}'\nH2: '{page.h2}'"
+
+
+def _title_h1(page, limit=None):
+    return f"Page Title: '{page.title}'\nH1: '{page.h1}'"
+
+
+def _ctas(page, limit=None):
+    return f"CTAs: {', '.join(page.ctas) if page.ctas else 'No CTAs found'}"
+
+
+def _ctas_found(page, limit=None):
+    return f"CTAs found: {', '.join(page.ctas) if page.ctas else 'None'}"
+
+
+def _cta_layout(page, limit=5):
+    if not page.layout.get("ctas"):
+        return _ctas(page)
+    width, height = page.layout["viewport"]
+    lines = [_ctas(page), f"Viewport: {width}x{height}px. Rendered CTAs (largest first):"]
+    for cta in sorted(page.layout["ctas"], key=lambda cta: cta["w"] * cta["h"], reverse=True)[:limit]:
+        fold = "above the fold" if cta["y"] < height else f"below the fold (y={cta['y']}px)"
+        lines.append(f"- '{cta['text']}': {cta['w']}x{cta['h']}px, {cta['font']}px text, {fold}")
+    return '\n'.join(lines)
+
+
+def _hero_copy_ctx(page, limit=None):
+    return f"Hero copy:\n{_hero_copy(page)}"
+
+
+def _hero_copy_headings(page, limit=5):
+    return f"Hero copy:\n{_hero_copy(page)}\n\nAll headings: {', '.join(page.all_headings[:limit])}"
+
+
+def _copy(page, limit, query):
+    if query is None:
+        return f"Sample copy:\n{page.text_content[:limit]}"
+    return f"Relevant copy:\n{pack_sections(page, query, limit // CHARS_PER_TOKEN)}"
+
+
+def _sample_copy(page, limit=1000, query=None):
+    return _copy(page, limit, query)
+
+
+def _evidence(page, limit=1000, query=None):
+    return f"{_copy(page, limit, query)}\nTestimonials: {len(page.testimonials)}"
+
+
+def _headings(page, limit=None):
+    return f"Headings: {', '.join(page.all_headings[:limit])}"
+
+
+def _headings_list(page, limit=8):
+    return f"Headings:\n{chr(10).join(page.all_headings[:limit])}"
+
+
+def _testimonials(page, limit=None):
+    testimonial_text = '\n---\n'.join(page.testimonials) if page.testimonials else "None found"
+    return f"Testimonials:\n{testimonial_text}"
+
+
+def _media(page, limit=None):
+    return f"Found {page.video_count} videos, {page.media['images']} images"
+
+
+def _form_fields(page, limit=None):
+    fields = page.forms[0]["fields"] if page.forms else []
+    inputs = [field for field in fields if field["tag"] == 'input']
+    return f"Form has {len(inputs)} input fields"
+
+
+def _long_paragraphs(page, limit=50):
+    return f"Found {len(page.long_paragraphs(limit))} paragraphs over {limit} words"
+
+
+CONTEXT_BUILDERS = {
+    "headline_hero": _headline_hero,
+    "headline_audience": _headline_audience,
+    "headline_offer": _headline_offer,
+    "headline": _headline,
+    "title_h1": _title_h1,
+    "ctas": _ctas,
+    "ctas_found": _ctas_found,
+    "cta_layout": _cta_layout,
+    "hero_copy": _hero_copy_ctx,
+    "hero_copy_headings": _hero_copy_headings,
+    "sample_copy": _sample_copy,
+    "evidence": _evidence,
+    "headings": _headings,
+    "headings_list": _headings_list,
+    "testimonials": _testimonials,
+    "media": _media,
+    "form_fields": _form_fields,
+    "long_paragraphs": _long_paragraphs,
+}
+
+# Page fields each context builder reads
+CONTEXT_FIELDS = {
+    "headline_hero": ("h1", "h2", "hero_paragraphs"),
+    "headline_audience": ("h1", "h2", "hero_paragraphs"),
+    "headline_offer": ("h1", "h2", "hero_paragraphs"),
+    "headline": ("h1", "h2"),
+    "title_h1": ("title", "h1"),
+    "ctas": ("ctas",),
+    "ctas_found": ("ctas",),
+    "cta_layout": ("ctas", "layout"),
+    "hero_copy": ("hero_paragraphs",),
+    "hero_copy_headings": ("hero_paragraphs", "all_headings"),
+    "sample_copy": ("text_content", "sections"),
+    "evidence": ("text_content", "sections", "testimonials"),
+    "headings": ("all_headings",),
+    "headings_list": ("all_headings",),
+    "testimonials": ("testimonials",),
+    "media": ("media",),
+    "form_fields": ("forms",),
+    "long_paragraphs": ("paragraphs",),
+}
+
+# Builders that pick sections by relevance when packing is on
+PACKED_BUILDERS = {"sample_copy", "evidence"}
+
+FEATURE_QUERY = ("features benefits problem pain frustration struggle hours manual slow errors risk "
+                 "automate automatically integrates faster easier without instead save")
+
+
+def feature_copy(page, pack=True):
+    """The copy sent with the feature extraction task."""
+    if pack and page.sections:
+        return pack_sections(page, FEATURE_QUERY, 2000 // CHARS_PER_TOKEN)
+    return page.text_content[:2000]
+
+
+# What the auditor's task methods put in their prompts (keep in sync with them)
+TASK_INPUTS = {
+    "feature_extraction": lambda page, pack: {
+        "title": page.title, "h1": page.h1, "h2": page.h2, "hero_paragraphs": page.hero_paragraphs[:1],
+        "all_headings": page.all_headings[:10], "text_content": page.text_content[:2000],
+        "copy": feature_copy(page, pack),
+    },
+    "headline_analysis": lambda page, pack: {"h1": page.h1, "h2": page.h2},
+}
+TASK_FIELDS = {
+    "feature_extraction": ("title", "h1", "h2", "hero_paragraphs", "all_headings", "text_content", "sections"),
+    "headline_analysis": ("h1", "h2"),
+}
+
+# Conditions an item can require via its "when" key
+CONDITIONS = {
+    "has_form": lambda page: bool(page.forms),
+    "no_form": lambda page: not page.forms,
+}
+
+ITEM_KINDS = ("llm", "static", "task")
+
+
+def item_query(item):
+    """Text describing what an item looks for, used to rank page sections."""
+    return f"{item.get('label', '')} {item.get('question', '')} {item.get('guidance', '')}"
+
+
+def render_context(item, page, pack=True, query=None):
+    """Render the item's context builder output, without its note.
+    
+    With pack=True copy builders get the item's query (or `query`, e.g. the
+    combined query of a batch) and send the most relevant sections.
+    """
+    builder = CONTEXT_BUILDERS[item["context"]]
+    args = (page, item["limit"]) if "limit" in item else (page,)
+    if pack and page.sections and item["context"] in PACKED_BUILDERS:
+        return builder(*args, query=query if query is not None else item_query(item))
+    return builder(*args)
+
+
+def build_context(item, page, pack=True):
+    """Render the prompt context for an LLM item."""
+    context = render_context(item, page, pack)
+    if item.get("note"):
+        context += f"\nNote: {item['note']}"
+    return context
+
+
+def item_fields(item):
+    """Names of the page fields an item's result depends on."""
+    kind = item.get("kind", "llm")
+    fields = RULE_FIELDS.get(item.get("rule"), ())
+    if kind == "llm":
+        return CONTEXT_FIELDS.get(item["context"], ()) + fields
+    if kind == "task":
+        return TASK_FIELDS.get(item.get("task"), ()) + fields
+    return fields
+
+
+def item_fingerprint(item, page, pack=True):
+    """Hash of everything an item's result depends on: its definition and the page data it reads.
+    
+    LLM items hash their rendered context, so a change outside the slice an
+    item reads (e.g. past text_content[:800]) doesn't trigger a re-score.
+    Pass the auditor's pack setting so the hash covers the context it sends.
+    """
+    kind = item.get("kind", "llm")
+    if kind == "llm":
+        inputs = build_context(item, page, pack)
+    elif kind == "task":
+        inputs = TASK_INPUTS[item["task"]](page, pack) if item.get("task") in TASK_INPUTS else page.to_dict()
+    else:
+        inputs = None
+    if item.get("rule"):
+        inputs = [inputs, {field: getattr(page, field) for field in RULE_FIELDS.get(item["rule"], ())}]
+    payload = json.dumps([item, inputs], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def item_applies(item, page):
+    """Check the item's "when" condition against the page."""
+    condition = item.get("when")
+    return condition is None or CONDITIONS[condition](page)
+
+
+# ===================================================================
+# DEFAULT FRAMEWORK
+# ===================================================================
+
+def _manual(id, label, issue, suggestion, rule=None):
+    """Placeholder for items that still need a manual check (unless their rule can score them)."""
+    item = {
+        "id": id, "category": "7. Form Design", "label": label, "kind": "static", "when": "has_form",
+        "result": {"score": 0, "issues": [issue], "suggestion": suggestion},
+    }
+    if rule:
+        item["rule"] = rule
+    return item
+
+
+DEFAULT_FRAMEWORK = {
+    "name": "Comprehensive CRO",
+    "version": "1",
+    "items": [
+        # 1. ORIENT UPON ENTRANCE
+        {
+            "id": "1.1", "category": "1. Orient Upon Entrance",
+            "label": "Does header explain WHAT the product is?",
+            "question": "Does the header copy explain WHAT the product/service is?",
+            "context": "headline_hero",
+            "guidance": "The H1 should immediately clarify the product category and function. Score 3 if crystal clear, 0 if vague.",
+        },
+        {
+            "id": "1.2", "category": "1. Orient Upon Entrance",
+            "label": "Does header match ad/SERP expectations?",
+            "question": "Does the header copy match the pre-click ad or SERP copy?",
+            "context": "title_h1",
+            "guidance": "Check for message match/scent. Title is a proxy for ad copy. Strong overlap = 3, no overlap = 0.",
+        },
+        {
+            "id": "1.3", "category": "1. Orient Upon Entrance",
+            "label": "Does copy call out WHO it's for?",
+            "question": "Does the copy clearly call out WHO the product/service is for?",
+            "context": "headline_audience",
+            "guidance": "Look for explicit audience targeting like 'for DevOps teams' or 'built for marketers'. Score 3 if specific, 0 if generic.",
+        },
+        {
+            "id": "1.4", "category": "1. Orient Upon Entrance",
+            "label": "Is there a clear page goal?",
+            "question": "Is there a clear, visually dominant page goal that leads into the funnel?",
+            "context": "ctas_found",
+            "guidance": "Evaluate if there's ONE primary action. Score 3 if clear dominant CTA, 0 if confusing/multiple equal CTAs.",
+        },
+
+        # 2. APPEAL TO USER MOTIVATION
+        {
+            "id": "2.1", "category": "2. Appeal to User Motivation",
+            "label": "Focus on pain/gain outcomes?",
+            "question": "Does the copy focus on desired outcomes or pain elimination?",
+            "context": "hero_copy",
+            "guidance": "Look for pain (frustrations, risks) and gain (achievements, outcomes) language. Score 3 if strong focus, 0 if product-centric only.",
+        },
+        {
+            "id": "2.2", "category": "2. Appeal to User Motivation",
+            "label": "Specific and vivid language?",
+            "question": "Are these desires/pain points described specifically and vividly?",
+            "context": "hero_copy_headings", "limit": 5,
+            "guidance": "Check for specific, quantified language vs generic ('save time' = bad, 'deploy in 60 seconds' = good). Score 3 if vivid, 0 if generic.",
+        },
+
+        # 3. CONVEY UNIQUE VALUE
+        {
+            "id": "3.1", "category": "3. Convey Unique Value",
+            "label": "Feature-benefit bridges?",
+            "question": "Does the copy bridge product features to user desires?",
+            "context": "sample_copy", "limit": 1000,
+            "guidance": "Look for 'so that', 'which means', 'allowing you to' connectors. Score 3 if consistent bridges, 0 if feature-dump.",
+        },
+        {
+            "id": "3.2", "category": "3. Convey Unique Value",
+            "label": "Competitive advantages explained?",
+            "question": "Does copy explain advantages over existing solutions?",
+            "context": "headings", "limit": 10,
+            "guidance": "Look for competitive differentiation, comparisons, or 'unlike X' language. Score 3 if clear differentiation, 0 if generic.",
+        },
+        {
+            "id": "3.3", "category": "3. Convey Unique Value",
+            "label": "Claims backed by proof?",
+            "question": "Does copy support claims with objective proof?",
+            "context": "sample_copy", "limit": 1000,
+            "guidance": "Look for stats, numbers, percentages, case study data. Score 3 if proof-heavy, 0 if unsubstantiated claims.",
+        },
+        {
+            "id": "3.4", "category": "3. Convey Unique Value",
+            "label": "Visual demonstrations included?",
+            "question": "Does copy support claims with demonstrations/previews?",
+            "context": "media", "rule": "media_demo",
+            "guidance": "Check if visual demos/screenshots exist. Score 3 if strong visual proof, 0 if text-only.",
+        },
+
+        # 4. ESTABLISH CREDIBILITY
+        {
+            "id": "4.1", "category": "4. Establish Credibility",
+            "label": "Customer testimonials present?",
+            "question": "Does copy include customer endorsements from target market?",
+            "context": "testimonials",
+            "guidance": "Check for customer quotes. Score 3 if multiple relevant testimonials, 0 if none.",
+        },
+        {
+            "id": "4.2", "category": "4. Establish Credibility",
+            "label": "Media endorsements?",
+            "question": "Does copy include high-profile media endorsements?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Look for 'Featured in', 'As seen on', media logos. Score 3 if strong media presence, 0 if none.",
+        },
+        {
+            "id": "4.3", "category": "4. Establish Credibility",
+            "label": "Popularity metrics shown?",
+            "question": "Does copy include impressive popularity metrics?",
+            "context": "sample_copy", "limit": 800, "rule": "metrics",
+            "guidance": "Look for '10,000+ users', '5-star rated', large numbers. Score 3 if compelling metrics, 0 if no social proof numbers.",
+        },
+        {
+            "id": "4.4", "category": "4. Establish Credibility",
+            "label": "Testimonials verifiable?",
+            "question": "Are testimonials easily verifiable?",
+            "context": "testimonials",
+            "guidance": "Check for full names, job titles, companies, photos. Score 3 if fully attributed, 0 if anonymous.",
+        },
+
+        # 5. ADDRESS OBJECTIONS/FEARS
+        {
+            "id": "5.1", "category": "5. Address Objections/Fears",
+            "label": "Guarantees/reassurances offered?",
+            "question": "Does copy offer guarantees or reassurances?",
+            "context": "sample_copy", "limit": 1000, "rule": "guarantee",
+            "guidance": "Look for money-back guarantees, free trials, 'cancel anytime', risk reversals. Score 3 if strong guarantees, 0 if none.",
+        },
+        {
+            "id": "5.2", "category": "5. Address Objections/Fears",
+            "label": "Critical questions addressed?",
+            "question": "Does copy address conversion-critical questions?",
+            "context": "headings",
+            "guidance": "Look for FAQ, 'How it works', answers to pricing/setup/time questions. Score 3 if comprehensive FAQ, 0 if glossed over.",
+        },
+
+        # 6. PRESENT THE OFFER
+        {
+            "id": "6.1", "category": "6. Present the Offer",
+            "label": "CTA focuses on value?",
+            "question": "Does CTA focus on acquiring value vs mechanical action?",
+            "context": "ctas",
+            "guidance": "Good: 'Get Your Free Audit', 'Start Testing'. Bad: 'Submit', 'Click Here'. Score 3 if value-focused, 0 if mechanical.",
+        },
+        {
+            "id": "6.2", "category": "6. Present the Offer",
+            "label": "CTA visually dominant?",
+            "question": "Is the CTA the most visually dominant element?",
+            "context": "cta_layout", "note": "Check visual hierarchy manually if scoring low.",
+            "guidance": "Score 3 if CTA stands out clearly, 0 if buried/small.",
+        },
+        {
+            "id": "6.3", "category": "6. Present the Offer",
+            "label": "CTA outcome clear?",
+            "question": "Does CTA make clear what user gets upon converting?",
+            "context": "ctas",
+            "guidance": "Should be obvious what happens after clicking. Score 3 if crystal clear, 0 if ambiguous.",
+        },
+        {
+            "id": "6.4", "category": "6. Present the Offer",
+            "label": "Value maximized, cost minimized?",
+            "question": "Does offer maximize value and minimize cost perception?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Look for 'free', 'no credit card', value stacking, cost anchoring. Score 3 if optimized, 0 if value unclear.",
+        },
+        {
+            "id": "6.5", "category": "6. Present the Offer",
+            "label": "Urgency/scarcity present?",
+            "question": "Does offer include time-sensitive incentives?",
+            "context": "sample_copy", "limit": 800, "rule": "urgency",
+            "guidance": "Look for urgency: limited-time, countdown, scarcity. Score 3 if strong urgency, 0 if none.",
+        },
+
+        # 7. FORM DESIGN (only when the page has a form)
+        {
+            "id": "7.1", "category": "7. Form Design", "when": "has_form",
+            "label": "Minimum fields?",
+            "question": "Does form ask for minimum required information?",
+            "context": "form_fields", "rule": "form_length",
+            "guidance": "Fewer fields = higher conversion. Score 3 if ≤3 fields, 1 if 4-6, 0 if >6.",
+        },
+        _manual("7.2", "Single-column layout?", "Manual visual check required", "Use single-column vertical layout for mobile.",
+                "form_layout"),
+        _manual("7.3", "Labels visible (not placeholders)?", "Manual check required", "Place labels above fields, don't rely on placeholders.",
+                "form_labels"),
+        _manual("7.4", "Input types optimized?", "Manual check", "Use type='email' for email, type='tel' for phone, etc.",
+                "input_types"),
+        _manual("7.5", "Error messages clear?", "Manual check", "Show inline errors: 'Enter a valid email address'."),
+        _manual("7.6", "Form preserves data on error?", "Requires testing", "Don't clear form on submit error."),
+        _manual("7.7", "Trust icons present?", "Manual check", "Add 'Secure checkout' or SSL badges."),
+        _manual("7.8", "Help available if issues?", "Manual check", "Add 'Need help?' link with chat/phone."),
+        _manual("7.9", "Confidence copy near form?", "Manual check", "Add testimonial or 'Join 10k users' above form."),
+        {
+            "id": "7.0", "category": "7. Form Design", "when": "no_form",
+            "label": "No form detected", "kind": "static",
+            "result": {"score": 0, "issues": ["No forms found on page"], "suggestion": "N/A"},
+        },
+
+        # 8.1 SALES PAGE EDITING CHECKLIST - CLARITY AND OFFER
+        {
+            "id": "8.1.1", "category": "8. Sales Page Editing Checklist - Clarity",
+            "label": "Offer clarity?",
+            "question": "Is the offer and its purpose stated with maximum clarity?",
+            "context": "headline_offer",
+            "guidance": "Score 3 if the offer is crystal clear within 3 seconds of landing. Score 0 if visitor must search to understand what's being offered.",
+        },
+        {
+            "id": "8.1.2", "category": "8. Sales Page Editing Checklist - Clarity",
+            "label": "Value prop obvious?",
+            "question": "Is the value proposition immediately obvious?",
+            "context": "headline",
+            "guidance": "The main benefit should jump out. Score 3 if value is obvious without reading body copy, 0 if buried.",
+        },
+
+        # 8.2 AUDIENCE AND MESSAGING ALIGNMENT
+        {
+            "id": "8.2.1", "category": "8. Sales Page Editing Checklist - Messaging",
+            "label": "Ad scent match?",
+            "question": "Is hero copy consistent with ad/SERP entry points?",
+            "context": "title_h1",
+            "guidance": "Message match is critical. Score 3 if title/H1 align perfectly (ad scent), 0 if mismatch creates confusion.",
+        },
+        {
+            "id": "8.2.2", "category": "8. Sales Page Editing Checklist - Messaging",
+            "label": "Reader motivation reflected?",
+            "question": "Does copy reflect reader's motivations and pain points?",
+            "context": "hero_copy",
+            "guidance": "Copy should speak to reader's world, not yours. Score 3 if empathetic and motivation-focused, 0 if company-centric.",
+        },
+
+        # 8.3 VALUE AND PERSUASION
+        {
+            "id": "8.3.1", "category": "8. Sales Page Editing Checklist - Persuasion",
+            "label": "Overwhelming value?",
+            "question": "Does page convey overwhelming value and opportunity?",
+            "context": "sample_copy", "limit": 1000,
+            "guidance": "Value stacking is key. Score 3 if benefits are abundant and compelling, 0 if value is unclear or weak.",
+        },
+        {
+            "id": "8.3.2", "category": "8. Sales Page Editing Checklist - Persuasion",
+            "label": "'So what?' and 'Prove it?' answered?",
+            "question": "Does copy answer 'So what?' and 'Prove it?' for skeptics?",
+            "context": "sample_copy", "limit": 1000,
+            "guidance": "Every claim needs proof and benefit clarity. Score 3 if skeptic-proof with evidence, 0 if unsubstantiated claims.",
+        },
+        {
+            "id": "8.3.3", "category": "8. Sales Page Editing Checklist - Persuasion",
+            "label": "Claims have evidence?",
+            "question": "Are claims substantiated with evidence?",
+            "context": "evidence", "limit": 1000,
+            "guidance": "Look for testimonials, data, case studies. Score 3 if evidence-rich, 0 if claims without proof.",
+        },
+
+        # 8.4 CONTENT AND ENGAGEMENT
+        {
+            "id": "8.4.1", "category": "8. Sales Page Editing Checklist - Engagement",
+            "label": "Vivid word pictures?",
+            "question": "Have generic descriptions been replaced with vivid 'word pictures'?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Vivid language creates mental images. Score 3 if copy paints pictures ('deploy in 60 seconds'), 0 if abstract/boring ('fast deployment').",
+        },
+        {
+            "id": "8.4.2", "category": "8. Sales Page Editing Checklist - Engagement",
+            "label": "Guides attention to visuals?",
+            "question": "Does copy guide attention to key visual elements?",
+            "context": "sample_copy", "limit": 600,
+            "guidance": "Look for directive language like 'notice the screenshot above', 'see how'. Score 3 if copy directs eyes, 0 if disconnected from visuals.",
+        },
+        {
+            "id": "8.4.3", "category": "8. Sales Page Editing Checklist - Engagement",
+            "label": "Visuals support message?",
+            "question": "Do imagery and video directly support the copy's message?",
+            "context": "media", "rule": "media_present",
+            "guidance": "Visuals should enhance, not decorate. Score 3 if visuals prove claims/show product, 0 if generic stock photos.",
+        },
+        {
+            "id": "8.4.4", "category": "8. Sales Page Editing Checklist - Engagement",
+            "label": "Authentic details?",
+            "question": "Does content include authentic, memorable details?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Specificity builds trust. Score 3 if specific names/numbers/stories ('Sarah at TechCorp saved 40 hours'), 0 if generic.",
+        },
+
+        # 8.5 CONTENT PRUNING AND FOCUS
+        {
+            "id": "8.5.1", "category": "8. Sales Page Editing Checklist - Pruning",
+            "label": "Non-essential removed?",
+            "question": "Has all non-essential content been removed?",
+            "context": "long_paragraphs", "limit": 50, "rule": "long_paragraphs",
+            "guidance": "Every word must earn its place. Score 3 if lean and focused, 0 if bloated with fluff.",
+        },
+        {
+            "id": "8.5.2", "category": "8. Sales Page Editing Checklist - Pruning",
+            "label": "Elements reflect motivation?",
+            "question": "Does every element reflect reader's motivation?",
+            "context": "headings_list", "limit": 8,
+            "guidance": "Each section should address a desire or pain. Score 3 if motivation-centric throughout, 0 if product-centric.",
+        },
+        {
+            "id": "8.5.3", "category": "8. Sales Page Editing Checklist - Pruning",
+            "label": "Elements clarify value?",
+            "question": "Does every element convey/clarify value?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Features need benefit bridges. Score 3 if value is clear everywhere, 0 if feature-dumping without benefits.",
+        },
+        {
+            "id": "8.5.4", "category": "8. Sales Page Editing Checklist - Pruning",
+            "label": "Elements prove claims?",
+            "question": "Does every element prove a claim?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Claims need proof. Score 3 if every claim backed by evidence, 0 if unsubstantiated assertions.",
+        },
+        {
+            "id": "8.5.5", "category": "8. Sales Page Editing Checklist - Pruning",
+            "label": "Addresses objections?",
+            "question": "Does every element address anxiety/objection?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Anticipate concerns. Score 3 if objections are pre-answered (FAQ, guarantees), 0 if ignored.",
+        },
+        {
+            "id": "8.5.6", "category": "8. Sales Page Editing Checklist - Pruning",
+            "label": "Authentic specificity?",
+            "question": "Does every element add authenticity/specificity?",
+            "context": "sample_copy", "limit": 800,
+            "guidance": "Generic kills trust. Score 3 if specific throughout ('1,247 teams', real names), 0 if vague ('many customers').",
+        },
+
+        # 9. FEATURE-PAIN EXTRACTION and 10. HEADLINE COPY ANALYSIS
+        {"id": "9", "category": "9. Feature-Pain Point Analysis", "kind": "task", "task": "feature_extraction"},
+        {"id": "10", "category": "10. Headline Copy Quality", "kind": "task", "task": "headline_analysis"},
+    ],
+}
+
+
+def validate_framework(framework, tasks=()):
+    """Raise ValueError if the framework references unknown builders, kinds or tasks."""
+    seen = set()
+    for item in framework.get("items", []):
+        item_id = item.get("id")
+        if not item_id or item_id in seen:
+            raise ValueError(f"Framework item ids must be unique and non-empty (got {item_id!r})")
+        seen.add(item_id)
+        if not item.get("category"):
+            raise ValueError(f"Item {item_id} has no category")
+        kind = item.get("kind", "llm")
+        if kind not in ITEM_KINDS:
+            raise ValueError(f"Item {item_id} has unknown kind {kind!r}")
+        if item.get("rule") and item["rule"] not in RULES:
+            raise ValueError(f"Item {item_id} has unknown rule {item['rule']!r}")
+        if item.get("when") and item["when"] not in CONDITIONS:
+            raise ValueError(f"Item {item_id} has unknown condition {item['when']!r}")
+        if kind == "llm":
+            for key in ("label", "question", "context", "guidance"):
+                if key not in item:
+                    raise ValueError(f"Item {item_id} is missing {key!r}")
+            if item["context"] not in CONTEXT_BUILDERS:
+                raise ValueError(f"Item {item_id} has unknown context builder {item['context']!r}")
+        elif kind == "static" and "result" not in item:
+            raise ValueError(f"Static item {item_id} is missing 'result'")
+        elif kind == "task" and tasks and item.get("task") not in tasks:
+            raise ValueError(f"Item {item_id} has unknown task {item.get('task')!r}")
+    return framework
+
+
+def load_framework(path):
+    """Load a framework version from a JSON file."""
+    with open(path, encoding='utf-8') as f:
+        framework = json.load(f)
+    framework.setdefault("name", path)
+    framework.setdefault("version", "custom")
+    return framework
@@ -0,0 +1,74 @@
+"""Plain HTTP fetch path for server-rendered pages.
+
+Most landing pages ship their copy in the initial HTML, so a pooled GET
+is enough and takes a fraction of a browser load. needs_browser() looks
+at the response for signs that the content is rendered client-side, in
+which case the auditor falls back to Selenium.
+"""
+import re
+import threading
+
+import urllib3
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+
+# Below this much visible text the page is probably an empty app shell
+MIN_TEXT_CHARS = 200
+
+_EMPTY_MOUNT_POINT = re.compile(
+    r'<(div|main|app-root)[^>]*\bid=["\']?(root|app|__next|__nuxt|main|svelte)["\']?[^>]*>\s*</\1>', re.I)
+_NOSCRIPT_WARNING = re.compile(r'<noscript[^>]*>[^<]*(enable|requires?)\s+javascript', re.I)
+_STRIP_BLOCKS = re.compile(r'<(script|style|noscript|template)\b.*?</\1>', re.I | re.S)
+_TAGS = re.compile(r'<[^>]+>')
+_H1 = re.compile(r'<h1[\s>]', re.I)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _http():
+    """Shared connection pool, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = urllib3.PoolManager(
+                num_pools=50,
+                maxsize=10,
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+                retries=urllib3.Retry(total=2, redirect=5, backoff_factor=0.3),
+                timeout=urllib3.Timeout(connect=5, read=15),
+            )
+        return _pool
+
+
+def fetch_static(url):
+    """GET a page and return its decoded HTML; raises on HTTP errors or non-HTML responses."""
+    response = _http().request("GET", url)
+    if response.status >= 400:
+        raise RuntimeError(f"HTTP {response.status}")
+    content_type = response.headers.get("Content-Type", "")
+    if content_type and "html" not in content_type:
+        raise RuntimeError(f"Not an HTML page ({content_type})")
+
+    charset = "utf-8"
+    match = re.search(r'charset=([\w-]+)', content_type)
+    if match:
+        charset = match.group(1)
+    return response.data.decode(charset, errors="replace")
+
+
+def needs_browser(html):
+    """Return why the HTML looks client-rendered, or None if it can be audited as is."""
+    if not html or not html.strip():
+        return "empty body"
+    if _EMPTY_MOUNT_POINT.search(html):
+        return "empty SPA mount point"
+    if _NOSCRIPT_WARNING.search(html):
+        return "page asks for JavaScript"
+    if not _H1.search(html):
+        return "no <h1> in server HTML"
+    text = _TAGS.sub(' ', _STRIP_BLOCKS.sub(' ', html))
+    if len(' '.join(text.split())) < MIN_TEXT_CHARS:
+        return "too little text"
+    return None
@@ -0,0 +1,179 @@
+"""Rate-limited, retrying access to the chat completions API.
+
+Audits running side by side share one RateLimiter, a pair of token
+buckets for requests/min and tokens/min, so they stay inside the account
+quota instead of hammering it into 429s. Transient failures (429, 5xx,
+timeouts, dropped connections) are retried with jittered exponential
+backoff, waiting at least as long as the server's Retry-After. Each
+auditor also enforces its own token budget; once spent, remaining calls
+raise TokenBudgetExceeded instead of going out.
+"""
+import os
+import random
+import threading
+import time
+
+DEFAULT_REQUESTS_PER_MIN = int(os.environ.get('CRO_REQUESTS_PER_MIN', '500'))
+DEFAULT_TOKENS_PER_MIN = int(os.environ.get('CRO_TOKENS_PER_MIN', '200000'))
+DEFAULT_MAX_RETRIES = 5
+BASE_DELAY = 1.0
+MAX_DELAY = 60.0
+
+# Reply size assumed for rate limiting when the request doesn't set max_tokens
+DEFAULT_REPLY_TOKENS = 500
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = ("APIConnectionError", "APITimeoutError", "Timeout", "ConnectionError")
+
+
+class TokenBudgetExceeded(RuntimeError):
+    """The audit used up its token budget; no further calls are made."""
+
+
+class TokenBucket:
+    """Holds up to `per_minute` units, refilled continuously."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` is available (0 if it is now)."""
+        self._refill(now)
+        # A request larger than the bucket only has to wait for a full bucket
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= amount
+
+
+class RateLimiter:
+    """Requests/min and tokens/min limits shared by every caller."""
+
+    def __init__(self, requests_per_min=DEFAULT_REQUESTS_PER_MIN, tokens_per_min=DEFAULT_TOKENS_PER_MIN):
+        self.requests = TokenBucket(requests_per_min) if requests_per_min else None
+        self.tokens = TokenBucket(tokens_per_min) if tokens_per_min else None
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens):
+        """Block until one request and `tokens` tokens fit in both buckets, then take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = 0.0
+                if self.requests:
+                    wait = self.requests.wait_time(1, now)
+                if self.tokens:
+                    wait = max(wait, self.tokens.wait_time(tokens, now))
+                if wait <= 0:
+                    if self.requests:
+                        self.requests.take(1)
+                    if self.tokens:
+                        self.tokens.take(tokens)
+                    return
+                self.waited += wait
+            time.sleep(wait)
+
+    def settle(self, estimated, actual):
+        """Correct the tokens bucket once the real usage of a call is known."""
+        if self.tokens and actual is not None:
+            with self._lock:
+                self.tokens.take(actual - estimated)
+
+
+def estimate_tokens(messages, max_tokens=None):
+    """Rough prompt + reply size (~4 characters per token) used before a call."""
+    prompt = sum(len(message.get("content") or "") for message in messages) // 4 + 4 * len(messages)
+    return prompt + (max_tokens or DEFAULT_REPLY_TOKENS)
+
+
+def _status(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error):
+    """Whether a failed call is worth retrying (rate limits, server errors, network trouble)."""
+    # A 429 for an exhausted quota won't go away by waiting
+    if getattr(error, "code", None) == "insufficient_quota":
+        return False
+    status = _status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def retry_after(error):
+    """Seconds the server asked us to wait, from Retry-After(-ms) headers, or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def backoff_delay(attempt, error=None, base=BASE_DELAY, cap=MAX_DELAY):
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    hint = retry_after(error) if error is not None else None
+    return max(delay, min(hint, cap)) if hint is not None else delay
+
+
+class LLMClient:
+    """Wraps an OpenAI-style client with rate limiting and retries."""
+
+    def __init__(self, client, limiter=None, max_retries=DEFAULT_MAX_RETRIES):
+        self.client = client
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def complete(self, **kwargs):
+        """Call chat.completions.create; returns (response, usage).
+        
+        usage holds prompt_tokens, completion_tokens, total_tokens (estimated
+        if the response has no usage) and the number of retries it took.
+        """
+        estimated = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"))
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire(estimated)
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt, e)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                print(f"⏳ {type(e).__name__}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            usage = getattr(response, "usage", None)
+            used = getattr(usage, "total_tokens", None)
+            if self.limiter:
+                self.limiter.settle(estimated, used)
+            return response, {
+                "prompt_tokens": getattr(usage, "prompt_tokens", None),
+                "completion_tokens": getattr(usage, "completion_tokens", None),
+                "total_tokens": used if used is not None else estimated,
+                "retries": attempt,
+            }
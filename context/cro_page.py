@@ -0,0 +1,279 @@
+"""Single-pass extraction of the page model the framework reads.
+
+The auditor used to run a separate find_all() scan (and get_text() call)
+for every kind of element it needed. PageModel.from_soup walks the tree
+once, skipping script/style/noscript subtrees. Each element's text is
+taken as a slice of the strings collected during the walk, so no subtree
+is visited twice. The same walk splits the page copy into sections at
+h1-h3 headings, leaving out navigation, footers, asides and cookie
+banners, for context packing (see cro_context). lxml is used as the
+parser when it is installed.
+"""
+import gzip
+import json
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+from bs4.element import CData, NavigableString, Tag
+
+try:
+    import lxml  # noqa: F401
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+TEXT_LIMIT = 5000
+
+# Bump when the snapshot layout or the fields of PageModel change
+SNAPSHOT_FORMAT = "cro-page-snapshot"
+SNAPSHOT_VERSION = 3
+CTA_CLASS = re.compile(r'btn|button|cta', re.I)
+TESTIMONIAL_CLASS = re.compile(r'testimon|review|quote', re.I)
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+FIELD_TAGS = {'input', 'select', 'textarea'}
+SECTION_TAGS = {'h1', 'h2', 'h3'}
+# <head> and site chrome are left out of sections (but still part of full_text)
+CHROME_TAGS = {'head', 'nav', 'footer', 'aside'}
+CHROME_CLASS = re.compile(r'cookie|consent|gdpr|navbar|menu|breadcrumb', re.I)
+
+
+def _class_matches(tag, pattern):
+    return any(pattern.search(c) for c in tag.get('class') or ())
+
+
+def _is_chrome(tag):
+    return (tag.name in CHROME_TAGS or tag.get('role') == 'navigation' or _class_matches(tag, CHROME_CLASS)
+            or bool(CHROME_CLASS.search(tag.get('id') or '')))
+
+
+class PageModel:
+    """Everything the framework items read from a page, built in one traversal."""
+
+    def __init__(self, url=""):
+        self.url = url
+        self.title = "No Title"
+        self.full_text = ""
+        self.headings = []        # [(tag, text)] for h1-h6 in document order
+        self.paragraphs = []      # [{"text", "words"}] for every <p>
+        self.cta_texts = []       # text of every <a>/<button> styled as a button
+        self.testimonial_texts = []
+        self.media = {"videos": 0, "iframes": 0, "images": 0}
+        self.forms = []           # [{"fields": [...], "labels_for": [...], "text": ...}]
+        self.sections = []        # [{"heading", "text"}] copy split at h1-h3, without site chrome
+        self.layout = {}          # {"viewport", "ctas", "forms"} boxes measured in the browser (see read_layout)
+
+    # -------------------------------------------------------------------
+    # Views used by the framework (same semantics as the old per-field scans)
+    # -------------------------------------------------------------------
+    @property
+    def text_content(self):
+        return self.full_text[:TEXT_LIMIT]
+
+    @property
+    def h1(self):
+        return next((text for tag, text in self.headings if tag == 'h1'), "No H1")
+
+    @property
+    def h2(self):
+        return next((text for tag, text in self.headings if tag == 'h2'), "")
+
+    @property
+    def hero_paragraphs(self):
+        return [p["text"] for p in self.paragraphs if len(p["text"]) > 20][:3]
+
+    @property
+    def all_headings(self):
+        return [text for tag, text in self.headings if tag in ('h1', 'h2', 'h3')][:10]
+
+    @property
+    def ctas(self):
+        return [text for text in self.cta_texts if text][:5]
+
+    @property
+    def testimonials(self):
+        return [text[:200] for text in self.testimonial_texts][:3]
+
+    @property
+    def video_count(self):
+        """Videos and embeds (iframes), as counted by the framework."""
+        return self.media["videos"] + self.media["iframes"]
+
+    def long_paragraphs(self, words=50):
+        return [p for p in self.paragraphs if p["words"] > words]
+
+    # -------------------------------------------------------------------
+    # Serialization
+    # -------------------------------------------------------------------
+    FIELDS = ("url", "title", "full_text", "headings", "paragraphs", "cta_texts",
+              "testimonial_texts", "media", "forms", "sections", "layout")
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        page = cls(data.get("url", ""))
+        for field in cls.FIELDS:
+            if field in data:
+                setattr(page, field, data[field])
+        page.headings = [tuple(heading) for heading in page.headings]
+        return page
+
+    # -------------------------------------------------------------------
+    # Construction
+    # -------------------------------------------------------------------
+    @classmethod
+    def from_html(cls, html, url=""):
+        return cls.from_soup(BeautifulSoup(html, PARSER), url)
+
+    @classmethod
+    def from_soup(cls, soup, url=""):
+        """Build the model with a single depth-first walk of the tree."""
+        page = cls(url)
+        stripped = []     # stripped text of every string, in document order
+        raw = []          # the same strings unstripped (for word counts)
+        forms = []        # stack of open forms
+        labels = []       # stack of open <label> elements
+        titles = []       # text of the first <title>
+        owners = []       # section index of each string in `stripped` (None inside chrome)
+        headings = [""]   # section headings; section 0 is the copy before the first heading
+        chrome = 0        # depth of open chrome elements
+
+        stack = [soup]
+        while stack:
+            node = stack.pop()
+
+            if isinstance(node, tuple):
+                # Leaving an element: its text is every string collected since entering it
+                tag, start, slots = node
+                text = ''.join(stripped[start:])
+                for target, index, make in slots:
+                    target[index] = make(text, start)
+                if tag.name == 'form':
+                    forms.pop()["text"] = text
+                elif tag.name == 'label':
+                    labels.pop()
+                if _is_chrome(tag):
+                    chrome -= 1
+                continue
+
+            if isinstance(node, NavigableString):
+                # get_text() only counts plain strings and CDATA, not comments or doctypes
+                if type(node) is NavigableString or isinstance(node, CData):
+                    raw.append(str(node))
+                    stripped.append(node.strip())
+                    owners.append(None if chrome else len(headings) - 1)
+                continue
+
+            if not isinstance(node, Tag):
+                continue
+            name = node.name
+            if name in SKIP_TAGS:
+                continue
+
+            # Reserve result slots on entry so lists keep document order even when nested
+            slots = []
+            is_chrome = _is_chrome(node)
+            if is_chrome:
+                chrome += 1
+            elif name in SECTION_TAGS and not chrome:
+                headings.append(None)
+                slots.append((headings, len(headings) - 1, lambda text, start: text))
+            if name in HEADING_TAGS:
+                page.headings.append(None)
+                slots.append((page.headings, len(page.headings) - 1, lambda text, start, name=name: (name, text)))
+            elif name == 'p':
+                page.paragraphs.append(None)
+                slots.append((page.paragraphs, len(page.paragraphs) - 1,
+                              lambda text, start: {"text": text, "words": len(''.join(raw[start:]).split())}))
+            elif name == 'title' and not titles:
+                titles.append(None)
+                slots.append((titles, 0, lambda text, start: text))
+            elif name == 'video':
+                page.media["videos"] += 1
+            elif name == 'iframe':
+                page.media["iframes"] += 1
+            elif name == 'img':
+                page.media["images"] += 1
+            elif name == 'form':
+                form = {"fields": [], "labels_for": [], "text": ""}
+                page.forms.append(form)
+                forms.append(form)
+            elif name == 'label':
+                labels.append(node)
+                if forms and node.get('for'):
+                    forms[-1]["labels_for"].append(node.get('for'))
+            elif name in FIELD_TAGS and forms:
+                forms[-1]["fields"].append({
+                    "tag": name,
+                    "type": (node.get('type') or ('text' if name == 'input' else name)).lower(),
+                    "name": node.get('name', ''),
+                    "id": node.get('id', ''),
+                    "placeholder": node.get('placeholder', ''),
+                    "aria_label": node.get('aria-label', ''),
+                    "in_label": bool(labels),
+                })
+
+            if name in ('a', 'button') and _class_matches(node, CTA_CLASS):
+                page.cta_texts.append(None)
+                slots.append((page.cta_texts, len(page.cta_texts) - 1, lambda text, start: text))
+            if _class_matches(node, TESTIMONIAL_CLASS):
+                page.testimonial_texts.append(None)
+                slots.append((page.testimonial_texts, len(page.testimonial_texts) - 1, lambda text, start: text))
+
+            if slots or is_chrome or name in ('form', 'label'):
+                stack.append((node, len(stripped), slots))
+            stack.extend(reversed(node.contents))
+
+        page.full_text = ' '.join(text for text in stripped if text)
+        texts = [[] for _ in headings]
+        for text, owner in zip(stripped, owners):
+            if text and owner is not None:
+                texts[owner].append(text)
+        page.sections = [{"heading": heading, "text": ' '.join(parts)}
+                         for heading, parts in zip(headings, texts) if parts]
+        if titles and titles[0]:
+            page.title = titles[0]
+        return page
+
+
+# ===================================================================
+# SNAPSHOTS
+# ===================================================================
+
+def save_snapshot(path, page, html, **meta):
+    """Write the page model and raw HTML as a gzip-compressed JSON snapshot."""
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "saved_at": datetime.now().isoformat(),
+        "url": page.url,
+        "meta": meta,
+        "page": page.to_dict(),
+        "html": html,
+    }
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    return path
+
+
+def load_snapshot(path):
+    """Read a snapshot; returns (page, html, snapshot dict).
+    
+    Snapshots from another version are re-extracted from their raw HTML.
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    if snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a CRO page snapshot")
+
+    html = snapshot.get("html", "")
+    if snapshot.get("version") == SNAPSHOT_VERSION:
+        page = PageModel.from_dict(snapshot["page"])
+    elif html:
+        page = PageModel.from_html(html, snapshot.get("url", ""))
+    else:
+        raise ValueError(f"{path} has unsupported snapshot version {snapshot.get('version')} and no HTML")
+    return page, html, snapshot
@@ -0,0 +1,277 @@
+"""PXL prioritization: audit findings from many pages as one ranked test backlog.
+
+Audits give raw 0-3 / 1-10 item scores; the PXL scoring in
+src/utils/pxlFramework.ts ranks test ideas one at a time in the browser.
+Here every item below its maximum, on every page, becomes a test candidate
+with the PXL variables filled in from the framework item (above the fold,
+noticeable in 5 seconds, ease) and from the finding (adds/removes
+something, backed by a measured issue, high-traffic page). With NumPy the
+rows are pulled into arrays once; variables that depend on the item, the
+page or the wording are worked out per distinct value and spread to the
+rows by index, and the points and ranking are array operations. Without
+NumPy the same is done row by row. backlog() rolls the candidates up per
+item across the site.
+
+    python cro_pxl.py audits/                          # JSON reports, searched recursively
+    python cro_pxl.py audits/items.jsonl --traffic visits.csv --limit 30
+    python cro_pxl.py --store --domain example.com --by-page
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import re
+from collections import defaultdict
+from urllib.parse import urlparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from cro_framework import DEFAULT_FRAMEWORK, load_framework
+from cro_report import REPORT_SCHEMA_NAME, report_rows
+
+# PXL points, as in pxlFramework.ts
+WEIGHTS = {"above_fold": 1, "noticeable": 2, "adds_or_removes": 2, "high_traffic": 1, "addressed_issue": 1}
+FEATURES = list(WEIGHTS)
+EASE_POINTS = {"Easy": 3, "Medium": 1, "Hard": 0}
+
+# What a change to an item's context touches
+ABOVE_FOLD_CONTEXTS = {"headline_hero", "headline_audience", "headline_offer", "headline", "title_h1", "hero_copy",
+                       "hero_copy_headings", "ctas", "ctas_found", "cta_layout"}
+NOTICEABLE_CONTEXTS = ABOVE_FOLD_CONTEXTS | {"media", "testimonials", "form_fields"}
+EASE_BY_CONTEXT = {"media": "Hard", "form_fields": "Medium", "cta_layout": "Medium", "testimonials": "Medium",
+                   "evidence": "Medium"}
+TASK_CONTEXTS = {"headline_analysis": "headline", "feature_extraction": "evidence"}
+
+ADDS_OR_REMOVES = re.compile(r'\b(add|remove|cut|drop|delete|insert|introduce|replace|move|prune)\b', re.I)
+# Pages in the top quarter by traffic count as high traffic
+HIGH_TRAFFIC_SHARE = 0.25
+
+
+def item_profile(item):
+    """PXL variables that depend only on the framework item (an item may set "above_fold"/"ease" itself)."""
+    context = item.get("context") or TASK_CONTEXTS.get(item.get("task"))
+    if context is None and item.get("when") == "has_form":
+        context = "form_fields"
+    return {
+        "above_fold": item.get("above_fold", context in ABOVE_FOLD_CONTEXTS),
+        "noticeable": item.get("noticeable", context in NOTICEABLE_CONTEXTS),
+        "ease": item.get("ease", EASE_BY_CONTEXT.get(context, "Easy")),
+        # Static placeholders without a rule are unchecked, not a measured issue
+        "measured": item.get("kind", "llm") != "static" or bool(item.get("rule")),
+    }
+
+
+# ===================================================================
+# INPUTS
+# ===================================================================
+
+def load_rows(paths):
+    """Item rows (see cro_report.report_rows) from JSON reports, items JSONL files or directories.
+
+    Only the latest audit of each URL is kept.
+    """
+    rows = []
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "**", "*.json"), recursive=True)) if os.path.isdir(path) else [path]
+        for file in files:
+            with open(file, encoding='utf-8') as f:
+                if file.endswith(".jsonl"):
+                    rows.extend(json.loads(line) for line in f if line.strip())
+                    continue
+                try:
+                    report = json.load(f)
+                except ValueError:
+                    continue
+            if isinstance(report, dict) and report.get("schema") == REPORT_SCHEMA_NAME:
+                rows.extend(report_rows(report))
+    latest = {}
+    for row in rows:
+        latest[row["url"]] = max(latest.get(row["url"], ""), row["generated_at"])
+    return [row for row in rows if row["generated_at"] == latest[row["url"]]]
+
+
+def load_traffic(path):
+    """{url: visits} from a CSV of url,visits rows (a header row is skipped)."""
+    traffic = {}
+    with open(path, newline='', encoding='utf-8') as f:
+        for record in csv.reader(f):
+            if len(record) < 2:
+                continue
+            try:
+                traffic[record[0].strip()] = float(record[1])
+            except ValueError:
+                continue
+    return traffic
+
+
+def _traffic_weights(urls, traffic):
+    """Per-URL weight (visits relative to the busiest page) and high-traffic flag.
+
+    Without traffic data every page weighs 1 and only home pages count as high traffic.
+    """
+    if not traffic:
+        return {url: (1.0, urlparse(url).path in ("", "/")) for url in urls}
+    visits = {url: traffic.get(url, traffic.get(url.rstrip('/'), 0.0)) for url in urls}
+    ranked = sorted(visits.values(), reverse=True)
+    cutoff = ranked[max(0, int(len(ranked) * HIGH_TRAFFIC_SHARE) - 1)] if ranked else 0
+    top = ranked[0] if ranked and ranked[0] > 0 else 1
+    return {url: (count / top, count > 0 and count >= cutoff) for url, count in visits.items()}
+
+
+# ===================================================================
+# SCORING
+# ===================================================================
+
+def _per_value(values, compute, dtype):
+    """compute(value) as an array over values, calling compute once per distinct value."""
+    keys, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return np.asarray([compute(key) for key in keys], dtype=dtype).reshape(len(keys), -1)[inverse.ravel()]
+
+
+def _candidate_arrays(rows, profiles, traffic):
+    default = item_profile({})
+    columns = {key: [row[key] for row in rows] for key in ("url", "id", "category", "question", "score", "suggestion")}
+
+    def item_variables(item_id):
+        profile = profiles.get(item_id, default)
+        return [profile["above_fold"], profile["noticeable"], profile["measured"], EASE_POINTS[profile["ease"]]]
+
+    # Ids are strings or None; np.unique sees None as "None", which no item has
+    profile = _per_value(columns["id"], item_variables, np.int8)
+    weights = _traffic_weights(set(columns["url"]), traffic)
+    page = _per_value(columns["url"], lambda url: weights[url], float)
+    score = np.asarray(columns["score"], dtype=float)
+    scale_max = np.fromiter((row["scale_max"] for row in rows), dtype=float, count=len(rows))
+    scale_min = np.fromiter((row.get("scale_min", 0) for row in rows), dtype=float, count=len(rows))
+    span = scale_max - scale_min
+    issues = np.fromiter((bool(row.get("issues")) for row in rows), dtype=bool, count=len(rows))
+
+    columns["above_fold"], columns["noticeable"] = profile[:, 0].astype(bool), profile[:, 1].astype(bool)
+    columns["adds_or_removes"] = _per_value(columns["suggestion"], lambda text: bool(ADDS_OR_REMOVES.search(text)),
+                                            bool)[:, 0]
+    columns["high_traffic"] = page[:, 1].astype(bool)
+    columns["addressed_issue"] = profile[:, 2].astype(bool) & issues
+    columns["ease"] = profile[:, 3].astype(int)
+    columns["severity"] = (scale_max - score) / np.where(span == 0, 1, span)
+    columns["weight"] = page[:, 0]
+    return columns
+
+
+def candidates(rows, framework=None, traffic=None):
+    """Test candidates (items below their maximum) as columns: {name: list, or array with NumPy}."""
+    profiles = {item["id"]: item_profile(item) for item in (framework or DEFAULT_FRAMEWORK)["items"]}
+    rows = [row for row in rows if row["score"] is not None and row["score"] < row["scale_max"]]
+    if np is not None and rows:
+        return _candidate_arrays(rows, profiles, traffic)
+    weights = _traffic_weights({row["url"] for row in rows}, traffic)
+    default = item_profile({})
+
+    columns = defaultdict(list)
+    for row in rows:
+        profile = profiles.get(row["id"], default)
+        weight, high_traffic = weights[row["url"]]
+        span = (row["scale_max"] - row.get("scale_min", 0)) or 1
+        for key in ("url", "id", "category", "question", "score", "suggestion"):
+            columns[key].append(row[key])
+        columns["above_fold"].append(profile["above_fold"])
+        columns["noticeable"].append(profile["noticeable"])
+        columns["adds_or_removes"].append(bool(ADDS_OR_REMOVES.search(row.get("suggestion") or "")))
+        columns["high_traffic"].append(high_traffic)
+        columns["addressed_issue"].append(profile["measured"] and bool(row.get("issues")))
+        columns["ease"].append(EASE_POINTS[profile["ease"]])
+        columns["severity"].append((row["scale_max"] - row["score"]) / span)
+        columns["weight"].append(weight)
+    return columns
+
+
+def score(columns):
+    """Add "pxl" and "impact" (severity x traffic weight) columns; returns the ranking order.
+
+    Array columns come back as lists, ready for JSON.
+    """
+    count = len(columns["id"])
+    if np is not None:
+        features = np.column_stack([np.asarray(columns[name], dtype=np.int8) for name in FEATURES]) \
+            if count else np.zeros((0, len(FEATURES)), dtype=np.int8)
+        pxl = features @ np.array([WEIGHTS[name] for name in FEATURES]) + np.asarray(columns["ease"], dtype=int)
+        impact = (np.asarray(columns["severity"], dtype=float) * np.asarray(columns["weight"], dtype=float)).round(3)
+        columns["pxl"], columns["impact"] = pxl, impact
+        order = np.lexsort((-impact, -pxl)).tolist()
+        for name, values in columns.items():
+            if isinstance(values, np.ndarray):
+                columns[name] = values.tolist()
+        return order
+    columns["pxl"] = [sum(WEIGHTS[name] * columns[name][i] for name in FEATURES) + columns["ease"][i]
+                      for i in range(count)]
+    columns["impact"] = [round(columns["severity"][i] * columns["weight"][i], 3) for i in range(count)]
+    return sorted(range(count), key=lambda i: (-columns["pxl"][i], -columns["impact"][i]))
+
+
+def prioritize(rows, framework=None, traffic=None):
+    """Every candidate on every page, best test first."""
+    columns = candidates(rows, framework, traffic)
+    order = score(columns)
+    keys = ("pxl", "impact", "url", "id", "question", "score", "suggestion") + tuple(FEATURES)
+    return [{key: columns[key][i] for key in keys} for i in order]
+
+
+def backlog(rows, framework=None, traffic=None):
+    """One entry per item across the site: where to test it first and how much it covers."""
+    columns = candidates(rows, framework, traffic)
+    order = score(columns)
+    groups = {}
+    # Walking in rank order, the first candidate of each item is its best page
+    for i in order:
+        entry = groups.get(columns["id"][i])
+        if entry is None:
+            groups[columns["id"][i]] = entry = {
+                "id": columns["id"][i], "question": columns["question"][i], "pxl": columns["pxl"][i],
+                "pages": set(), "impact": 0.0, "top_page": columns["url"][i], "suggestion": columns["suggestion"][i],
+            }
+        # Tasks (9, 10) give several rows per page; count the page once
+        entry["pages"].add(columns["url"][i])
+        entry["impact"] += columns["impact"][i]
+    for entry in groups.values():
+        entry["pages"] = len(entry["pages"])
+        entry["impact"] = round(entry["impact"], 2)
+    return sorted(groups.values(), key=lambda entry: (-entry["pxl"], -entry["impact"]))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank audit findings as a PXL-scored test backlog.")
+    parser.add_argument("paths", nargs="*", help="JSON reports, items JSONL files or directories")
+    parser.add_argument("--store", nargs="?", const="", default=None, metavar="PATH",
+                        help="Read the latest audit of each page from the history store instead")
+    parser.add_argument("--domain", help="With --store: only pages of this domain")
+    parser.add_argument("--framework", help="Framework JSON the audits used (default: built-in)")
+    parser.add_argument("--traffic", help="CSV of url,visits used to weight pages")
+    parser.add_argument("--by-page", action="store_true", help="List every page's candidates instead of one row per item")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON instead of a table")
+    args = parser.parse_args()
+
+    from cro_store import AuditStore, DEFAULT_STORE_PATH, format_rows
+    if args.store is not None:
+        store = AuditStore(args.store or DEFAULT_STORE_PATH)
+        try:
+            rows = store.latest_items(args.domain)
+        finally:
+            store.close()
+    elif args.paths:
+        rows = load_rows(args.paths)
+    else:
+        parser.error("give report paths or --store")
+
+    framework = load_framework(args.framework) if args.framework else None
+    traffic = load_traffic(args.traffic) if args.traffic else None
+    ranked = (prioritize if args.by_page else backlog)(rows, framework, traffic)[:args.limit]
+    if args.json:
+        print(json.dumps(ranked, indent=2, ensure_ascii=False))
+    else:
+        columns = ("pxl", "impact", "url", "id", "question") if args.by_page else \
+            ("pxl", "impact", "pages", "id", "question", "top_page")
+        print(format_rows([{key: entry[key] for key in columns} for entry in ranked]))
@@ -0,0 +1,188 @@
+"""Machine-readable audit reports.
+
+Each audit writes a JSON document (next to its .md/.html) that follows
+REPORT_SCHEMA. report_rows() flattens a document into one record per
+item, which is what the JSONL outputs hold, so thousands of audits can
+be loaded straight into a dataframe. Bump REPORT_SCHEMA_VERSION whenever
+a field is added, renamed, removed or changes meaning, and list the change
+in SCHEMA_CHANGES.
+
+    python cro_report.py > cro_report.schema.json
+"""
+import json
+import threading
+
+REPORT_SCHEMA_NAME = "cro-audit-report"
+REPORT_SCHEMA_VERSION = 2
+
+# Fields each version added over the one before it
+SCHEMA_CHANGES = {
+    2: ["summary.carried_forward", "summary.rule_scored", "summary.site_shared", "usage.prompt_tokens",
+        "usage.completion_tokens", "viewports", "findings"],
+}
+
+_SCALE = {
+    "type": "object",
+    "required": ["min", "max"],
+    "properties": {"min": {"type": "integer"}, "max": {"type": "integer"}},
+}
+
+REPORT_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "title": "CRO audit report",
+    "$comment": "; ".join(f"version {version} added {', '.join(fields)}" for version, fields in SCHEMA_CHANGES.items()),
+    "type": "object",
+    "required": ["schema", "schema_version", "url", "generated_at", "items"],
+    "properties": {
+        "schema": {"const": REPORT_SCHEMA_NAME},
+        "schema_version": {"const": REPORT_SCHEMA_VERSION},
+        "url": {"type": "string"},
+        "generated_at": {"type": "string", "format": "date-time"},
+        "framework": {
+            "type": "object",
+            "properties": {"name": {"type": "string"}, "version": {"type": "string"}},
+        },
+        "fetched_with": {"type": ["string", "null"]},
+        "error": {"type": ["string", "null"]},
+        "summary": {
+            "type": "object",
+            "properties": {
+                "items": {"type": "integer"},
+                "unscored": {"type": "integer"},
+                "score_pct": {"type": ["number", "null"]},
+                "carried_forward": {"type": "integer"},
+                "rule_scored": {"type": "integer"},
+                "site_shared": {"type": "integer"},
+            },
+        },
+        "timings": {"type": "object", "additionalProperties": {"type": "number"}},
+        "viewports": {
+            "type": "object",
+            "properties": {
+                "primary": {"type": "string"},
+                "captured": {"type": "array", "items": {"type": "string"}},
+                "rescored": {"type": "object", "additionalProperties": {"type": "array", "items": {"type": "string"}}},
+                "diffs": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "string"},
+                            "viewport": {"type": "string"},
+                            "question": {"type": "string"},
+                            "score": {"type": ["number", "null"]},
+                            "primary_score": {"type": ["number", "null"]},
+                            "issues": {"type": "array", "items": {"type": "string"}},
+                            "suggestion": {"type": "string"},
+                        },
+                    },
+                },
+            },
+        },
+        "findings": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "suggestion": {"type": "string"},
+                    "findings": {"type": "integer"},
+                    "items": {"type": "array", "items": {"type": "string"}},
+                    "pages": {"type": "array", "items": {"type": "string"}},
+                    "variants": {"type": "integer"},
+                    "issues": {"type": "array", "items": {"type": "string"}},
+                },
+            },
+        },
+        "usage": {
+            "type": "object",
+            "properties": {
+                "model": {"type": ["string", "null"]},
+                "api_calls": {"type": "integer"},
+                "tokens": {"type": "integer"},
+                "prompt_tokens": {"type": "integer"},
+                "completion_tokens": {"type": "integer"},
+                "retries": {"type": "integer"},
+                "token_budget": {"type": ["integer", "null"]},
+                "budget_exhausted": {"type": "boolean"},
+            },
+        },
+        "cache": {
+            "type": "object",
+            "properties": {
+                "enabled": {"type": "boolean"},
+                "hits": {"type": "integer"},
+                "misses": {"type": "integer"},
+            },
+        },
+        "items": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["id", "category", "question", "score", "scale", "status", "issues"],
+                "properties": {
+                    "id": {"type": ["string", "null"]},
+                    "category": {"type": "string"},
+                    "question": {"type": "string"},
+                    "score": {"type": ["number", "null"]},
+                    "scale": _SCALE,
+                    "status": {"enum": ["scored", "unscored"]},
+                    "issues": {"type": "array", "items": {"type": "string"}},
+                    "suggestion": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+
+def item_scale(category):
+    """Score range for a category: headline dimensions are 1-10, everything else 0-3."""
+    return {"min": 1, "max": 10} if "Headline" in category else {"min": 0, "max": 3}
+
+
+def report_rows(report):
+    """One flat record per item, carrying the audit-level fields needed to group them."""
+    shared = {
+        "schema_version": report["schema_version"],
+        "url": report["url"],
+        "generated_at": report["generated_at"],
+        "framework": report.get("framework", {}).get("name"),
+    }
+    rows = []
+    for item in report["items"]:
+        row = dict(shared)
+        row.update({
+            "id": item["id"],
+            "category": item["category"],
+            "question": item["question"],
+            "score": item["score"],
+            "scale_min": item["scale"]["min"],
+            "scale_max": item["scale"]["max"],
+            "status": item["status"],
+            "issues": item.get("issues", []),
+            "suggestion": item.get("suggestion", ""),
+        })
+        rows.append(row)
+    return rows
+
+
+def write_json_report(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    return path
+
+
+_append_lock = threading.Lock()
+
+
+def append_jsonl(path, report):
+    """Append a report's item rows to a JSONL file shared by many audits."""
+    lines = ''.join(json.dumps(row, ensure_ascii=False) + "\n" for row in report_rows(report))
+    with _append_lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+    return path
+
+
+if __name__ == "__main__":
+    print(json.dumps(REPORT_SCHEMA, indent=2))
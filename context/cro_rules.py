@@ -0,0 +1,209 @@
+"""Local scorers for framework items that are objective checks.
+
+Counting form fields, videos or long paragraphs and spotting guarantee or
+urgency wording doesn't need a model. An item opts in with a "rule" key
+naming one of RULES; the rule returns (result, confidence) or None when
+it can't tell. The auditor keeps confident local results and sends the
+rest to the LLM as usual (static items keep their placeholder result).
+"""
+import re
+
+DEFAULT_CONFIDENCE = 0.8
+
+# Input types that aren't something the visitor fills in
+HIDDEN_INPUTS = {'hidden', 'submit', 'button', 'image', 'reset'}
+
+URGENCY_PATTERNS = [
+    r'limited[- ]time', r'ends (?:today|tonight|soon|in)', r'only \d+ (?:left|spots?|seats?)', r'last chance',
+    r'countdown', r'(?:offer|deal|discount|price|sale) expires', r'hurry', r'while (?:supplies|stocks?) last', r'(?:offer|sale|deal) ends',
+    r'early[- ]bird', r'today only', r'deadline',
+]
+GUARANTEE_PATTERNS = [
+    r'money[- ]back', r'guarantee', r'free trial', r'cancel (?:at )?any ?time', r'no credit card',
+    r'risk[- ]free', r'refund', r'no questions asked', r'no commitment', r'try (?:it )?(?:for )?free',
+]
+METRIC_PATTERNS = [
+    r'\d[\d,.]*\s*(?:k|m|\+)?\+?\s*(?:users|customers|teams|companies|businesses|developers|downloads|members|clients)',
+    r'(?:4\.\d|5)[- ]star', r'rated \d', r'trusted by', r'\d+(?:\.\d+)?\s*/\s*5',
+]
+
+
+def _matches(patterns, text):
+    """Distinct patterns found in text, with the first matching snippet of each."""
+    found = []
+    for pattern in patterns:
+        match = re.search(pattern, text, re.I)
+        if match:
+            found.append(match.group(0))
+    return found
+
+
+def _result(score, issues, suggestion):
+    return {"score": score, "issues": issues, "suggestion": suggestion}
+
+
+def _user_fields(form):
+    return [field for field in form["fields"] if field["type"] not in HIDDEN_INPUTS]
+
+
+# ===================================================================
+# RULES
+# ===================================================================
+# Each rule takes (item, page) and returns (result, confidence) or None.
+
+def _form_length(item, page):
+    if not page.forms:
+        return None
+    count = len(_user_fields(page.forms[0]))
+    if count <= 3:
+        return _result(3, [f"Form has {count} fields"], "Keep the form this short."), 1.0
+    if count <= 6:
+        return _result(1, [f"Form has {count} fields"], "Cut the form to 3 fields or fewer; ask for the rest later."), 1.0
+    return _result(0, [f"Form has {count} fields"], "Cut the form to the 3 fields you need to follow up."), 1.0
+
+
+def _form_labels(item, page):
+    fields = [field for form in page.forms for field in _user_fields(form) if field["tag"] != 'select']
+    if not fields:
+        return None
+    labelled = {label for form in page.forms for label in form["labels_for"]}
+    unlabelled = [field for field in fields
+                  if not (field["in_label"] or field["aria_label"] or (field["id"] and field["id"] in labelled))]
+    names = ', '.join(field["name"] or field["placeholder"] or field["type"] for field in unlabelled[:5])
+    if not unlabelled:
+        return _result(3, [], "Labels are in place."), 1.0
+    if len(unlabelled) == len(fields):
+        return _result(0, [f"No field has a visible label ({names})"],
+                       "Place labels above fields, don't rely on placeholders."), 0.9
+    return _result(1, [f"{len(unlabelled)} of {len(fields)} fields have no label ({names})"],
+                   "Place labels above fields, don't rely on placeholders."), 0.9
+
+
+def _form_layout(item, page):
+    forms = page.layout.get("forms")
+    if not forms or len(forms[0]["fields"]) < 2:
+        return None
+    # Fields sharing a row overlap vertically
+    fields = sorted(forms[0]["fields"], key=lambda field: field["y"])
+    shared = sum(1 for above, below in zip(fields, fields[1:]) if below["y"] < above["y"] + above["h"])
+    width = page.layout["viewport"][0]
+    if not shared:
+        return _result(3, [f"Single column at {width}px wide"], "Keep the single-column layout."), 1.0
+    return _result(0, [f"{shared} fields sit beside another field at {width}px wide"],
+                   "Use single-column vertical layout for mobile."), 0.9
+
+
+# Field name/id/placeholder hints and the input type that fits them
+TYPE_HINTS = [
+    (re.compile(r'e-?mail', re.I), 'email'),
+    (re.compile(r'phone|tel|mobile', re.I), 'tel'),
+    (re.compile(r'url|website', re.I), 'url'),
+]
+
+
+def _input_types(item, page):
+    checked = []
+    wrong = []
+    for form in page.forms:
+        for field in _user_fields(form):
+            hint = ' '.join((field["name"], field["id"], field["placeholder"]))
+            for pattern, expected in TYPE_HINTS:
+                if pattern.search(hint):
+                    checked.append(field)
+                    if field["tag"] == 'input' and field["type"] == 'text':
+                        wrong.append(f"{field['name'] or field['id'] or field['placeholder']} should be type='{expected}'")
+                    break
+    if not checked:
+        return None
+    if not wrong:
+        return _result(3, [], "Input types already match their fields."), 0.9
+    return _result(0 if len(wrong) == len(checked) else 1, wrong,
+                   "Use type='email' for email, type='tel' for phone, etc."), 0.9
+
+
+def _media_demo(item, page):
+    if page.video_count:
+        return _result(3, [f"{page.video_count} videos/embeds, {page.media['images']} images"],
+                       "Make sure the demo video is visible above the fold."), 0.9
+    if not page.media["images"]:
+        return _result(0, ["No images or videos found"], "Add screenshots or a short product demo video."), 1.0
+    # Images may be logos or stock photos; let the model judge
+    return None
+
+
+def _media_present(item, page):
+    if page.video_count or page.media["images"]:
+        return None
+    return _result(0, ["No images or videos found"], "Add visuals that show the product delivering on the copy."), 1.0
+
+
+def _long_paragraphs(item, page):
+    limit = item.get("limit", 50)
+    count = len(page.long_paragraphs(limit))
+    issues = [f"{count} paragraphs over {limit} words"] if count else []
+    if count == 0:
+        return _result(3, issues, "Copy is already lean."), 1.0
+    if count <= 2:
+        return _result(2, issues, f"Tighten the {count} long paragraphs or break them into bullets."), 0.9
+    if count <= 5:
+        return _result(1, issues, "Cut or break up long paragraphs; most readers skim."), 0.9
+    return _result(0, issues, "Prune aggressively: many long paragraphs bury the offer."), 0.9
+
+
+def _main_text(page):
+    """The page copy without nav, footer or cookie banners (section texts start with their heading)."""
+    return ' '.join(section["text"] for section in page.sections)
+
+
+def _keywords(patterns):
+    def rule(item, page):
+        # Chrome says "Refund policy" or "Free trial" on every page; only the page's own copy counts
+        found = _matches(patterns, _main_text(page))
+        if len(found) >= 2:
+            return _result(3, [f"Found: {', '.join(found[:4])}"], "Keep these visible near the CTA."), 0.9
+        # One hit may be incidental ("guarantee" in a footer) and no hit may be a paraphrase; ask the model
+        return None
+    return rule
+
+
+RULES = {
+    "form_length": _form_length,
+    "form_labels": _form_labels,
+    "form_layout": _form_layout,
+    "input_types": _input_types,
+    "media_demo": _media_demo,
+    "media_present": _media_present,
+    "long_paragraphs": _long_paragraphs,
+    "urgency": _keywords(URGENCY_PATTERNS),
+    "guarantee": _keywords(GUARANTEE_PATTERNS),
+    "metrics": _keywords(METRIC_PATTERNS),
+}
+
+# Page fields each rule reads
+RULE_FIELDS = {
+    "form_length": ("forms",),
+    "form_labels": ("forms",),
+    "form_layout": ("layout",),
+    "input_types": ("forms",),
+    "media_demo": ("media",),
+    "media_present": ("media",),
+    "long_paragraphs": ("paragraphs",),
+    "urgency": ("sections",),
+    "guarantee": ("sections",),
+    "metrics": ("sections",),
+}
+
+
+def score_locally(item, page, confidence=DEFAULT_CONFIDENCE):
+    """The item's local result if its rule is at least `confidence` sure, else None."""
+    rule = RULES.get(item.get("rule"))
+    if rule is None:
+        return None
+    try:
+        outcome = rule(item, page)
+    except Exception as e:
+        print(f"⚠️ Rule {item['rule']} failed on item {item.get('id')} ({e})")
+        return None
+    if outcome is None or outcome[1] < confidence:
+        return None
+    return outcome[0]
@@ -0,0 +1,360 @@
+"""Long-running audit service: a local HTTP API over a job queue.
+
+Starting an audit from the CLI pays for imports, dotenv, a fresh OpenAI
+client and a cold Chrome every time. The service keeps those warm (one
+OpenAI client, a BrowserPool, the response cache and the rate limiter)
+and feeds submitted URLs to a fixed number of worker threads.
+
+    POST /audits              {"url": "...", "batch": true}  -> 202 {"id", "status"}
+    GET  /audits              recent jobs
+    GET  /audits/<id>         status, summary and (when done) the JSON report
+    GET  /audits/<id>/events  server-sent events: one "item" event per finished item, then "done"
+    GET  /health              queue length, workers, browser pool and cache stats
+
+    python cro_service.py --port 8765 --workers 2 --cache
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from openai import OpenAI
+
+from live_cro_analyzer import LLM_TIMEOUT, ComprehensiveCROAuditor
+from cro_browser import VIEWPORTS, BrowserPool
+from cro_cache import DEFAULT_CACHE_PATH, ResponseCache
+from cro_llm import DEFAULT_REQUESTS_PER_MIN, DEFAULT_TOKENS_PER_MIN, RateLimiter
+from cro_store import DEFAULT_STORE_PATH, AuditStore
+
+# Options a client may set per job; everything else is fixed by the service
+JOB_OPTIONS = ("batch", "fetch_mode", "max_concurrency", "token_budget", "incremental", "viewports")
+MAX_JOBS = 500
+FETCH_MODES = ("auto", "static", "browser")
+# Upper bound on a job's max_concurrency (LLM calls are capped across jobs by --llm-slots anyway)
+MAX_JOB_CONCURRENCY = 32
+# The Vite dev server; pass --cors-origin to allow another front end
+DEFAULT_CORS_ORIGIN = "http://localhost:5173"
+
+
+class AuditService:
+    """Job queue plus warm shared resources for running audits in-process."""
+
+    def __init__(self, workers=2, browser_slots=2, llm_slots=16, output_dir="audits", cache=None,
+                 requests_per_min=DEFAULT_REQUESTS_PER_MIN, tokens_per_min=DEFAULT_TOKENS_PER_MIN,
+                 max_jobs=MAX_JOBS, client=None, browser_pool=None, **auditor_kwargs):
+        self.workers = max(1, workers)
+        self.output_dir = output_dir
+        self.max_jobs = max_jobs
+        self.cache = cache
+        if client is None and os.environ.get('OPENAI_API_KEY'):
+            client = OpenAI(api_key=os.environ['OPENAI_API_KEY'], max_retries=0, timeout=LLM_TIMEOUT)
+        self.client = client
+        self.browser_pool = browser_pool or BrowserPool(size=browser_slots)
+        self.fetch_slots = threading.BoundedSemaphore(max(1, browser_slots))
+        self.llm_slots = threading.BoundedSemaphore(max(1, llm_slots))
+        self.rate_limiter = RateLimiter(requests_per_min, tokens_per_min)
+        self.auditor_kwargs = auditor_kwargs
+        self.jobs = OrderedDict()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stopping = False
+
+    # -------------------------------------------------------------------
+    # Jobs
+    # -------------------------------------------------------------------
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"audit-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, url, **options):
+        """Queue an audit and return its job dict (ValueError on a bad url or option)."""
+        check_job(url, options)
+        job = {
+            "id": uuid.uuid4().hex[:12],
+            "url": url,
+            "options": options,
+            "status": "queued",
+            "submitted": datetime.now().isoformat(),
+            "started": None,
+            "finished": None,
+            "summary": None,
+            "report": None,
+            "error": None,
+            "events": [],
+            "changed": threading.Condition(),
+        }
+        with self._lock:
+            self.jobs[job["id"]] = job
+            # Forget the oldest finished jobs beyond the limit
+            while len(self.jobs) > self.max_jobs:
+                oldest = next((j for j in self.jobs.values() if j["status"] in ("done", "failed")), None)
+                if oldest is None:
+                    break
+                del self.jobs[oldest["id"]]
+        self._queue.put(job["id"])
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def _emit(self, job, event, data):
+        with job["changed"]:
+            job["events"].append((event, data))
+            job["changed"].notify_all()
+
+    def _work(self):
+        while not self._stopping:
+            try:
+                job_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            job = self.get(job_id)
+            if job is not None:
+                self._run(job)
+            self._queue.task_done()
+
+    def _run(self, job):
+        """Run one audit with the shared resources, streaming items as events."""
+        job["status"] = "running"
+        job["started"] = datetime.now().isoformat()
+        self._emit(job, "status", {"status": "running"})
+        try:
+            kwargs = dict(self.auditor_kwargs, **job["options"])
+            auditor = ComprehensiveCROAuditor(
+                job["url"],
+                output_dir=self.output_dir,
+                client=self.client,
+                cache=self.cache,
+                fetch_slots=self.fetch_slots,
+                llm_slots=self.llm_slots,
+                browser_pool=self.browser_pool,
+                rate_limiter=self.rate_limiter,
+                on_item=lambda record: self._emit(job, "item", record),
+                **kwargs
+            )
+            auditor.run_audit()
+            job["summary"] = auditor.summary()
+            if auditor.error:
+                job["status"], job["error"] = "failed", auditor.error
+            else:
+                job["status"], job["report"] = "done", auditor.json_report()
+        except Exception as e:
+            job["status"], job["error"] = "failed", str(e)
+        job["finished"] = datetime.now().isoformat()
+        self._emit(job, "done", {"status": job["status"], "summary": job["summary"], "error": job["error"]})
+
+    def events(self, job, start=0, timeout=15):
+        """Yield (event, data) from index `start`, blocking for new ones; None on keep-alive timeouts."""
+        index = start
+        while True:
+            with job["changed"]:
+                if index >= len(job["events"]):
+                    job["changed"].wait(timeout)
+                pending = job["events"][index:]
+            if not pending:
+                yield None
+                continue
+            for event in pending:
+                index += 1
+                yield event
+                if event[0] == "done":
+                    return
+
+    def health(self):
+        with self._lock:
+            statuses = [job["status"] for job in self.jobs.values()]
+        return {
+            "workers": self.workers,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "jobs": len(statuses),
+            "openai": self.client is not None,
+            "browser_pool": self.browser_pool.stats(),
+            "cache": self.cache.stats() if self.cache else None,
+            "rate_limiter_wait_seconds": round(self.rate_limiter.waited, 1),
+        }
+
+    def close(self):
+        self._stopping = True
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self.browser_pool.close()
+        if self.cache:
+            self.cache.close()
+        store = self.auditor_kwargs.get("store")
+        if store:
+            store.close()
+
+
+def _positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def check_job(url, options):
+    """Raise ValueError unless url is an http(s) URL and every option has the right type."""
+    if not isinstance(url, str) or urlparse(url.strip()).scheme not in ("http", "https") \
+            or not urlparse(url.strip()).netloc:
+        raise ValueError("url must be an http(s) URL")
+    unknown = set(options) - set(JOB_OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown options: {', '.join(sorted(unknown))}")
+    for name in ("batch", "incremental"):
+        if name in options and not isinstance(options[name], bool):
+            raise ValueError(f"{name} must be true or false")
+    if "fetch_mode" in options and options["fetch_mode"] not in FETCH_MODES:
+        raise ValueError(f"fetch_mode must be one of: {', '.join(FETCH_MODES)}")
+    if "token_budget" in options and options["token_budget"] is not None and not _positive_int(options["token_budget"]):
+        raise ValueError("token_budget must be a positive integer")
+    if "viewports" in options:
+        viewports = options["viewports"]
+        if not isinstance(viewports, list) or not viewports or \
+                any(not isinstance(name, str) or name not in VIEWPORTS for name in viewports):
+            raise ValueError(f"viewports must be a list of: {', '.join(VIEWPORTS)}")
+    if "max_concurrency" in options:
+        value = options["max_concurrency"]
+        if not _positive_int(value) or value > MAX_JOB_CONCURRENCY:
+            raise ValueError(f"max_concurrency must be an integer from 1 to {MAX_JOB_CONCURRENCY}")
+
+
+def public_job(job, full=False):
+    """The JSON-safe view of a job."""
+    view = {key: job[key] for key in ("id", "url", "options", "status", "submitted", "started", "finished", "error")}
+    view["items_done"] = sum(1 for event, _ in job["events"] if event == "item")
+    if full:
+        view["summary"] = job["summary"]
+        view["report"] = job["report"]
+    return view
+
+
+# ===================================================================
+# HTTP
+# ===================================================================
+
+def make_handler(service, cors_origin=DEFAULT_CORS_ORIGIN):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            print(f"🌐 {self.address_string()} {format % args}")
+
+        def _headers(self, status, content_type="application/json", extra=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            if cors_origin:
+                self.send_header("Access-Control-Allow-Origin", cors_origin)
+            for name, value in extra:
+                self.send_header(name, value)
+            self.end_headers()
+
+        def _json(self, status, payload):
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self._headers(status, extra=[("Content-Length", str(len(data)))])
+            self.wfile.write(data)
+
+        def do_OPTIONS(self):
+            self._headers(204, extra=[("Access-Control-Allow-Methods", "GET, POST, OPTIONS"),
+                                      ("Access-Control-Allow-Headers", "Content-Type"),
+                                      ("Content-Length", "0")])
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip('/') != "/audits":
+                return self._json(404, {"error": "not found"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not isinstance(body, dict):
+                    return self._json(400, {"error": "body must be a JSON object"})
+                url = body.pop("url", None)
+                if not url:
+                    return self._json(400, {"error": "url is required"})
+                job = service.submit(url.strip() if isinstance(url, str) else url, **body)
+            except (ValueError, TypeError) as e:
+                return self._json(400, {"error": str(e)})
+            except Exception as e:
+                print(f"❌ POST {self.path} failed: {e}")
+                return self._json(500, {"error": "internal error"})
+            self._json(202, public_job(job))
+
+        def do_GET(self):
+            parts = [part for part in urlparse(self.path).path.split('/') if part]
+            if parts == ["health"]:
+                return self._json(200, service.health())
+            if parts == ["audits"]:
+                with service._lock:
+                    jobs = list(service.jobs.values())
+                return self._json(200, {"jobs": [public_job(job) for job in reversed(jobs)]})
+            if len(parts) >= 2 and parts[0] == "audits":
+                job = service.get(parts[1])
+                if job is None:
+                    return self._json(404, {"error": "unknown job"})
+                if parts[2:] == ["events"]:
+                    return self._stream(job)
+                if not parts[2:]:
+                    return self._json(200, public_job(job, full=True))
+            self._json(404, {"error": "not found"})
+
+        def _stream(self, job):
+            """Server-sent events; a reconnecting client resumes from Last-Event-ID."""
+            self._headers(200, "text/event-stream", [("Cache-Control", "no-cache")])
+            try:
+                start = max(0, int(self.headers.get("Last-Event-ID", -1)) + 1)
+            except ValueError:
+                start = 0
+            try:
+                for index, event in enumerate(service.events(job, start), start):
+                    if event is None:
+                        self.wfile.write(b": keep-alive\n\n")
+                    else:
+                        name, data = event
+                        self.wfile.write(f"id: {index}\nevent: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+                                         .encode('utf-8'))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve CRO audits over HTTP with a shared job queue.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=2, help="Audits running at the same time")
+    parser.add_argument("--browser-slots", type=int, default=2, help="Warm Chrome instances shared by all jobs")
+    parser.add_argument("--llm-slots", type=int, default=16, help="Maximum concurrent LLM calls across all jobs")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_REQUESTS_PER_MIN, help="OpenAI requests per minute")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TOKENS_PER_MIN, help="OpenAI tokens per minute")
+    parser.add_argument("--cache", action="store_true", help="Cache LLM responses on disk")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="SQLite file for the response cache")
+    parser.add_argument("--batch", action="store_true", help="Batch items sharing a context by default")
+    parser.add_argument("--fetch", choices=["auto", "static", "browser"], default="auto")
+    parser.add_argument("--output-dir", default="audits", help="Where reports are written")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH, metavar="PATH",
+                        help="Record finished audits in a SQLite history store")
+    parser.add_argument("--cors-origin", default=DEFAULT_CORS_ORIGIN,
+                        help="Access-Control-Allow-Origin for the front end (default: %(default)s, '' to disable)")
+    args = parser.parse_args()
+
+    service = AuditService(workers=args.workers, browser_slots=args.browser_slots, llm_slots=args.llm_slots,
+                           output_dir=args.output_dir, cache=ResponseCache(args.cache_path) if args.cache else None,
+                           requests_per_min=args.rpm, tokens_per_min=args.tpm,
+                           batch=args.batch, fetch_mode=args.fetch,
+                           store=AuditStore(args.store) if args.store else None).start()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.cors_origin))
+    server.daemon_threads = True
+    print(f"🚀 CRO audit service on http://{args.host}:{args.port} ({service.workers} workers)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,116 @@
+"""Site-level audits: find the components pages share and score them once.
+
+Pages of one site repeat the same blocks (testimonial carousels, logo
+strips, pre-footer CTA bands), so auditing 200 pages used to send those
+blocks to the LLM 200 times. A SiteProfile hashes every section,
+paragraph, testimonial and CTA of every page; blocks found on enough pages
+are the site template. Per-page prompts get only the page-unique blocks
+(strip; header, nav and footer are site chrome, which sections already
+leave out, so they stay in full_text), the template is
+audited once as its own pseudo-page (template_page), and items whose
+inputs are identical on several pages are scored once and reused
+(shared_items, keyed by cro_framework.item_fingerprint).
+"""
+import hashlib
+import re
+from collections import Counter, defaultdict
+from urllib.parse import urlparse
+
+from cro_framework import item_applies, item_fields, item_fingerprint
+from cro_page import PageModel
+
+# A block is part of the template when it is on at least this share of pages (and MIN_PAGES pages)
+MIN_SHARE = 0.5
+MIN_PAGES = 2
+# Page fields the template pseudo-page has real content for
+TEMPLATE_FIELDS = {"sections", "testimonials", "ctas"}
+
+
+def block_hash(text):
+    """Hash of a text block, ignoring case, whitespace and digits (counters, years, prices)."""
+    normalized = re.sub(r'\s+', ' ', re.sub(r'\d+', '0', text.lower())).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+class SiteProfile:
+    """Blocks repeated across the pages of a site."""
+
+    def __init__(self, pages, min_share=MIN_SHARE, min_pages=MIN_PAGES):
+        self.pages = len(pages)
+        self.threshold = max(min_pages, min_share * len(pages))
+        self.sections = self._shared([page.sections for page in pages], lambda section: section["text"])
+        self.paragraphs = self._shared([page.paragraphs for page in pages], lambda paragraph: paragraph["text"])
+        self.testimonials = self._shared([page.testimonial_texts for page in pages], lambda text: text)
+        self.ctas = self._shared([page.cta_texts for page in pages], lambda text: text)
+
+    def _shared(self, blocks_per_page, text_of):
+        """{hash: first block} for blocks on at least `threshold` pages."""
+        counts = Counter()
+        first = {}
+        for blocks in blocks_per_page:
+            hashes = set()
+            for block in blocks:
+                key = block_hash(text_of(block))
+                first.setdefault(key, block)
+                hashes.add(key)
+            counts.update(hashes)
+        return {key: first[key] for key, count in counts.items() if count >= self.threshold}
+
+    @staticmethod
+    def _unique(blocks, shared, text_of):
+        """Blocks not in the template, and the template ones removed (nothing is removed if nothing else is left)."""
+        unique = [block for block in blocks if block_hash(text_of(block)) not in shared]
+        if not unique:
+            return blocks, []
+        return unique, [block for block in blocks if block_hash(text_of(block)) in shared]
+
+    def strip(self, page):
+        """A copy of the page without template sections, paragraphs, testimonials and CTAs."""
+        stripped = PageModel.from_dict(page.to_dict())
+        stripped.sections, sections = self._unique(page.sections, self.sections, lambda section: section["text"])
+        stripped.paragraphs, paragraphs = self._unique(page.paragraphs, self.paragraphs,
+                                                       lambda paragraph: paragraph["text"])
+        stripped.testimonial_texts, _ = self._unique(page.testimonial_texts, self.testimonials, lambda text: text)
+        stripped.cta_texts, _ = self._unique(page.cta_texts, self.ctas, lambda text: text)
+        full_text = page.full_text
+        for text in [section["text"] for section in sections] + [paragraph["text"] for paragraph in paragraphs]:
+            if text:
+                full_text = full_text.replace(text, ' ', 1)
+        stripped.full_text = re.sub(r'\s+', ' ', full_text).strip()
+        return stripped
+
+    def template_page(self, url):
+        """The shared components as a page of their own."""
+        parsed = urlparse(url)
+        page = PageModel(f"{parsed.scheme}://{parsed.netloc}/#shared-components")
+        page.title = f"Shared components of {parsed.netloc}"
+        page.sections = list(self.sections.values())
+        page.headings = [('h2', section["heading"]) for section in page.sections if section["heading"]]
+        page.paragraphs = [{"text": section["text"], "words": len(section["text"].split())} for section in page.sections]
+        page.full_text = ' '.join(section["text"] for section in page.sections)
+        page.testimonial_texts = list(self.testimonials.values())
+        page.cta_texts = list(self.ctas.values())
+        return page
+
+    def stats(self):
+        return {"pages": self.pages, "shared_sections": len(self.sections), "shared_paragraphs": len(self.paragraphs),
+                "shared_testimonials": len(self.testimonials), "shared_ctas": len(self.ctas)}
+
+
+def template_framework(framework):
+    """The framework cut down to the items that read shared components."""
+    items = [item for item in framework["items"] if TEMPLATE_FIELDS & set(item_fields(item))]
+    return dict(framework, items=items)
+
+
+def shared_items(framework, pages, pack=True):
+    """Items whose inputs are identical on two or more pages: {fingerprint: (item, [page keys])}."""
+    groups = defaultdict(list)
+    items = {}
+    for key, page in pages.items():
+        for item in framework["items"]:
+            if item_applies(item, page):
+                fingerprint = item_fingerprint(item, page, pack)
+                groups[fingerprint].append(key)
+                items[fingerprint] = item
+    return {fingerprint: (items[fingerprint], keys) for fingerprint, keys in groups.items() if len(keys) > 1}
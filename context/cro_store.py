@@ -0,0 +1,345 @@
+"""Historical audit store: every audit, item score, timing and page model in SQLite.
+
+Reports are otherwise loose .md/.html/.json files, so questions like
+"which pages lost points on their CTA this week?" meant walking the audits
+directory. The auditor (and batch runs and the service through it) can
+record each finished audit here; older JSON reports can be imported. Item
+rows carry their URL, domain and timestamp so trend and regression queries
+run off indexes without joins.
+
+    python cro_store.py import audits/            # backfill from JSON reports
+    python cro_store.py regressions --since 7d --category 6.
+    python cro_store.py trend --url https://example.com/pricing --item 6.2
+    python cro_store.py latest --domain example.com
+"""
+import argparse
+import glob
+import gzip
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+from cro_report import REPORT_SCHEMA_NAME, item_scale
+
+DEFAULT_STORE_PATH = os.environ.get('CRO_STORE_PATH', 'audits/history.sqlite')
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS audits (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        ts REAL NOT NULL,
+        generated_at TEXT NOT NULL,
+        framework TEXT,
+        framework_version TEXT,
+        fetched_with TEXT,
+        score_pct REAL,
+        items INTEGER,
+        unscored INTEGER,
+        api_calls INTEGER,
+        tokens INTEGER,
+        report_path TEXT,
+        error TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS items (
+        audit_id INTEGER NOT NULL REFERENCES audits (id) ON DELETE CASCADE,
+        item_id TEXT,
+        category TEXT NOT NULL,
+        question TEXT NOT NULL,
+        score REAL,
+        scale_max INTEGER,
+        issues TEXT,
+        suggestion TEXT,
+        url TEXT NOT NULL,
+        domain TEXT NOT NULL,
+        ts REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS timings (
+        audit_id INTEGER NOT NULL REFERENCES audits (id) ON DELETE CASCADE,
+        stage TEXT NOT NULL,
+        seconds REAL NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS snapshots (
+        audit_id INTEGER PRIMARY KEY REFERENCES audits (id) ON DELETE CASCADE,
+        page BLOB NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS audits_url_ts ON audits (url, ts)",
+    "CREATE INDEX IF NOT EXISTS audits_domain_ts ON audits (domain, ts)",
+    "CREATE INDEX IF NOT EXISTS audits_ts ON audits (ts)",
+    "CREATE INDEX IF NOT EXISTS items_audit ON items (audit_id)",
+    "CREATE INDEX IF NOT EXISTS items_url_item_ts ON items (url, item_id, ts)",
+    "CREATE INDEX IF NOT EXISTS items_item_ts ON items (item_id, ts)",
+    "CREATE INDEX IF NOT EXISTS items_category_ts ON items (category, ts)",
+    "CREATE INDEX IF NOT EXISTS items_domain_ts ON items (domain, ts)",
+    "CREATE INDEX IF NOT EXISTS timings_audit ON timings (audit_id)",
+]
+
+
+def domain_of(url):
+    return urlparse(url).netloc.lower().replace('www.', '', 1)
+
+
+def parse_since(value):
+    """'7d', '12h', '30m' or an ISO date -> epoch seconds."""
+    if value is None:
+        return None
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([dhm])', value.strip())
+    if match:
+        return time.time() - float(match.group(1)) * {"d": 86400, "h": 3600, "m": 60}[match.group(2)]
+    return datetime.fromisoformat(value).timestamp()
+
+
+class AuditStore:
+    """SQLite store of audit reports, safe to share between threads."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    # -------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------
+    def _insert(self, report, page=None, report_path=None):
+        url = report["url"]
+        domain = domain_of(url)
+        ts = datetime.fromisoformat(report["generated_at"]).timestamp()
+        summary = report.get("summary", {})
+        usage = report.get("usage", {})
+        framework = report.get("framework", {})
+        cursor = self._conn.execute(
+            "INSERT INTO audits (url, domain, ts, generated_at, framework, framework_version, fetched_with, "
+            "score_pct, items, unscored, api_calls, tokens, report_path, error) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (url, domain, ts, report["generated_at"], framework.get("name"), framework.get("version"),
+             report.get("fetched_with"), summary.get("score_pct"), summary.get("items"), summary.get("unscored"),
+             usage.get("api_calls"), usage.get("tokens"), report_path, report.get("error")))
+        audit_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO items (audit_id, item_id, category, question, score, scale_max, issues, suggestion, "
+            "url, domain, ts) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(audit_id, item["id"], item["category"], item["question"], item["score"], item["scale"]["max"],
+              json.dumps(item.get("issues", []), ensure_ascii=False), item.get("suggestion", ""), url, domain, ts)
+             for item in report["items"]])
+        self._conn.executemany(
+            "INSERT INTO timings (audit_id, stage, seconds) VALUES (?, ?, ?)",
+            [(audit_id, stage, seconds) for stage, seconds in report.get("timings", {}).items()])
+        if page is not None:
+            data = gzip.compress(json.dumps(page.to_dict(), ensure_ascii=False).encode('utf-8'))
+            self._conn.execute("INSERT INTO snapshots (audit_id, page) VALUES (?, ?)", (audit_id, data))
+        return audit_id
+
+    def add(self, report, page=None, report_path=None):
+        """Record one JSON report (see cro_report) and optionally its page model; returns the audit id."""
+        with self._lock:
+            with self._conn:
+                return self._insert(report, page, report_path)
+
+    def add_many(self, reports):
+        """Record many (report, report_path) pairs in one transaction."""
+        with self._lock:
+            with self._conn:
+                return [self._insert(report, report_path=path) for report, path in reports]
+
+    def import_reports(self, paths, batch_size=500):
+        """Import JSON reports from files or directories (searched recursively); skips ones already stored."""
+        files = []
+        for path in paths:
+            if os.path.isdir(path):
+                files.extend(sorted(glob.glob(os.path.join(path, "**", "*.json"), recursive=True)))
+            else:
+                files.append(path)
+        with self._lock:
+            known = {row[0] for row in self._conn.execute("SELECT report_path FROM audits WHERE report_path IS NOT NULL")}
+
+        imported = 0
+        pending = []
+        for file in files:
+            base = file[:-len(".json")]
+            if base in known:
+                continue
+            try:
+                with open(file, encoding='utf-8') as f:
+                    report = json.load(f)
+            except Exception:
+                continue
+            if report.get("schema") != REPORT_SCHEMA_NAME:
+                continue
+            pending.append((report, base))
+            if len(pending) >= batch_size:
+                imported += len(self.add_many(pending))
+                pending = []
+        if pending:
+            imported += len(self.add_many(pending))
+        return imported
+
+    # -------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    @staticmethod
+    def _filters(url=None, domain=None, item=None, category=None, since=None, until=None):
+        clauses, params = [], []
+        for column, value in (("url", url), ("domain", domain), ("item_id", item)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(domain_of(value) if column == "domain" and "://" in value else value)
+        if category:
+            # Categories are numbered ("6. Present the Offer"), so "6." matches the section
+            clauses.append("category LIKE ? || '%'")
+            params.append(category)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        return clauses, params
+
+    def trend(self, url=None, domain=None, item=None, category=None, since=None):
+        """Score over time: per audit, the page score or the average of the matching items."""
+        if not (item or category):
+            clauses, params = self._filters(url, domain, since=since)
+            where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+            return self._query(f"SELECT generated_at, url, score_pct AS score, api_calls, tokens FROM audits {where} "
+                               "ORDER BY ts", params)
+        clauses, params = self._filters(url, domain, item, category, since)
+        clauses.append("score IS NOT NULL")
+        return self._query(
+            f"SELECT datetime(MIN(ts), 'unixepoch', 'localtime') AS generated_at, url, "
+            f"ROUND(AVG(score), 2) AS score, COUNT(*) AS items FROM items WHERE {' AND '.join(clauses)} "
+            "GROUP BY audit_id ORDER BY MIN(ts)", params)
+
+    def regressions(self, since=None, url=None, domain=None, item=None, category=None, min_drop=1):
+        """Items whose score fell by at least min_drop between an audit and the one before it (for the same URL)."""
+        clauses, params = self._filters(url, domain, item, category)
+        clauses.append("score IS NOT NULL")
+        window = "PARTITION BY url, item_id ORDER BY ts"
+        return self._query(
+            f"""SELECT url, item_id, category, question, previous, score, previous - score AS dropped,
+                       datetime(previous_ts, 'unixepoch', 'localtime') AS previous_at, datetime(ts, 'unixepoch', 'localtime') AS audited_at
+                FROM (SELECT url, item_id, category, question, score, ts,
+                             LAG(score) OVER ({window}) AS previous, LAG(ts) OVER ({window}) AS previous_ts
+                      FROM items WHERE {' AND '.join(clauses)})
+                WHERE previous IS NOT NULL AND ts >= ? AND previous - score >= ?
+                ORDER BY dropped DESC, ts DESC""",
+            params + [since or 0, min_drop])
+
+    def latest(self, domain=None, limit=100):
+        """The most recent audit of each URL."""
+        clauses, params = self._filters(domain=domain)
+        where = f"AND {' AND '.join(clauses)}" if clauses else ""
+        return self._query(
+            f"""SELECT url, generated_at, score_pct, items, unscored, api_calls, tokens, report_path
+                FROM audits a WHERE ts = (SELECT MAX(ts) FROM audits b WHERE b.url = a.url) {where}
+                ORDER BY score_pct LIMIT ?""", params + [limit])
+
+    def latest_items(self, domain=None):
+        """Item rows (as cro_report.report_rows) of the most recent audit of each URL."""
+        where = "AND a.domain = ?" if domain else ""
+        params = [domain_of(domain) if "://" in domain else domain] if domain else []
+        rows = self._query(
+            f"""SELECT i.url, a.generated_at, i.item_id AS id, i.category, i.question, i.score, i.scale_max,
+                       i.issues, i.suggestion
+                FROM audits a JOIN items i ON i.audit_id = a.id
+                WHERE a.ts = (SELECT MAX(ts) FROM audits b WHERE b.url = a.url) {where}""",
+            params)
+        for row in rows:
+            row["scale_min"] = item_scale(row["category"])["min"]
+            row["issues"] = json.loads(row["issues"]) if row["issues"] else []
+        return rows
+
+    def page(self, audit_id):
+        """The stored page model of an audit, or None."""
+        from cro_page import PageModel
+        with self._lock:
+            row = self._conn.execute("SELECT page FROM snapshots WHERE audit_id = ?", (audit_id,)).fetchone()
+        return PageModel.from_dict(json.loads(gzip.decompress(row[0]))) if row else None
+
+    def stats(self):
+        with self._lock:
+            return {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("audits", "items", "timings", "snapshots")}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def format_rows(rows):
+    """Plain-text table of query rows."""
+    if not rows:
+        return "(no rows)"
+    columns = list(rows[0])
+    cells = [[("" if row[c] is None else str(row[c]))[:60] for c in columns] for row in rows]
+    widths = [max(len(c), *(len(line[i]) for line in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(columns, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines.extend("  ".join(v.ljust(w) for v, w in zip(line, widths)) for line in cells)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the historical CRO audit store.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="SQLite file (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON instead of a table")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser("import", help="Import JSON reports (files or directories)")
+    imports.add_argument("paths", nargs="+")
+
+    for name, help_text in (("trend", "Score over time"), ("regressions", "Items whose score dropped"),
+                            ("latest", "Latest audit of each page")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--domain")
+        if name != "latest":
+            command.add_argument("--url")
+            command.add_argument("--item", help="Framework item id, e.g. 6.2")
+            command.add_argument("--category", help="Category prefix, e.g. '6.' or '6. Present the Offer'")
+            command.add_argument("--since", help="Only audits since: 7d, 12h or an ISO date")
+        if name == "regressions":
+            command.add_argument("--min-drop", type=float, default=1, help="Minimum score drop (default: %(default)s)")
+        if name == "latest":
+            command.add_argument("--limit", type=int, default=100)
+
+    commands.add_parser("stats", help="Row counts")
+    args = parser.parse_args()
+
+    store = AuditStore(args.store)
+    try:
+        if args.command == "import":
+            started = time.time()
+            count = store.import_reports(args.paths)
+            print(f"📥 Imported {count} reports in {time.time() - started:.1f}s ({store.stats()['items']} item rows)")
+            rows = None
+        elif args.command == "trend":
+            rows = store.trend(args.url, args.domain, args.item, args.category, parse_since(args.since))
+        elif args.command == "regressions":
+            rows = store.regressions(parse_since(args.since), args.url, args.domain, args.item, args.category,
+                                     args.min_drop)
+        elif args.command == "latest":
+            rows = store.latest(args.domain, args.limit)
+        else:
+            rows = [store.stats()]
+        if rows is not None:
+            print(json.dumps(rows, indent=2, ensure_ascii=False) if args.json else format_rows(rows))
+    finally:
+        store.close()
@@ -0,0 +1,202 @@
+"""Per-audit timing and token trace.
+
+A Trace is a tree of spans: the audit, its stages (fetch, browser start,
+load, scroll, parse, extract, items, report), one span per framework item
+and one per LLM call, carrying token counts, retries and cache status as
+attributes. Spans opened on a thread nest under that thread's current
+span unless a parent is given. The trace can be saved as plain JSON or as
+OTLP/JSON, which OpenTelemetry collectors and viewers can ingest, without
+depending on the OpenTelemetry SDK.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Spans that are not pipeline stages (left out of the stage table)
+DETAIL_SPANS = {"item", "batch", "llm"}
+
+
+class Trace:
+    """Thread-safe collection of spans for one audit."""
+
+    def __init__(self, name="audit", **attributes):
+        self.trace_id = os.urandom(16).hex()
+        self.spans = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.root = self._new_span(name, None, attributes)
+
+    def _new_span(self, name, parent_id, attributes):
+        span = {
+            "span_id": os.urandom(8).hex(),
+            "parent_id": parent_id,
+            "name": name,
+            "start": time.time(),
+            "end": None,
+            "attributes": dict(attributes),
+        }
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def _stack(self):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def current(self):
+        """The innermost span open on this thread (the root if none)."""
+        stack = self._stack()
+        return stack[-1] if stack else self.root
+
+    @contextmanager
+    def span(self, name, parent=None, **attributes):
+        """Time a block; yields the span so attributes can be added while it runs."""
+        parent = parent or self.current()
+        span = self._new_span(name, parent["span_id"], attributes)
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span["attributes"]["error"] = str(e)
+            raise
+        finally:
+            stack.pop()
+            span["end"] = time.time()
+
+    def add(self, name, start, end=None, parent=None, **attributes):
+        """Record a span that was timed elsewhere."""
+        parent = parent or self.current()
+        span = self._new_span(name, parent["span_id"], attributes)
+        span["start"] = start
+        span["end"] = end if end is not None else time.time()
+        return span
+
+    def finish(self, **attributes):
+        self.root["attributes"].update(attributes)
+        self.root["end"] = time.time()
+
+    # -------------------------------------------------------------------
+    # Export
+    # -------------------------------------------------------------------
+    def to_json(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace_id": self.trace_id,
+            "spans": [dict(span, seconds=seconds(span)) for span in spans],
+        }
+
+    def to_otlp(self, service_name="cro-auditor"):
+        """The trace in OTLP/JSON (ExportTraceServiceRequest) form."""
+        with self._lock:
+            spans = list(self.spans)
+        now = time.time()
+        return {"resourceSpans": [{
+            "resource": {"attributes": _otlp_attributes({"service.name": service_name})},
+            "scopeSpans": [{
+                "scope": {"name": "cro_trace"},
+                "spans": [{
+                    "traceId": self.trace_id,
+                    "spanId": span["span_id"],
+                    "parentSpanId": span["parent_id"] or "",
+                    "name": span["name"],
+                    "kind": 1,
+                    "startTimeUnixNano": str(int(span["start"] * 1e9)),
+                    "endTimeUnixNano": str(int((span["end"] or now) * 1e9)),
+                    "attributes": _otlp_attributes(span["attributes"]),
+                    "status": {"code": 2 if "error" in span["attributes"] else 1},
+                } for span in spans],
+            }],
+        }]}
+
+
+def seconds(span):
+    end = span["end"] if span["end"] is not None else time.time()
+    return round(end - span["start"], 3)
+
+
+def _otlp_attributes(attributes):
+    out = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        out.append({"key": key, "value": typed})
+    return out
+
+
+def critical_path(spans, children):
+    """The audit's stages in order, each with the item or batch that finished last inside it (if any).
+
+    Stages run one after another and their items in parallel, so the
+    last item to finish is what the stage waited on; a late start there
+    means it queued behind other calls.
+    """
+    path = []
+    for stage in sorted(children.get(spans[0]["span_id"], []), key=lambda span: span["start"]):
+        if stage["name"] in DETAIL_SPANS:
+            continue
+        detail = [span for span in children.get(stage["span_id"], []) if span["name"] in ("item", "batch")]
+        path.append((stage, max(detail, key=lambda span: span["start"] + span["seconds"]) if detail else None))
+    return path
+
+
+def format_summary(trace, slowest=5):
+    """Plain-text table of stage times, the critical path, LLM usage and the slowest items."""
+    spans = trace.to_json()["spans"]
+    children = {}
+    for span in spans:
+        children.setdefault(span["parent_id"], []).append(span)
+
+    lines = ["⏱️  Stage timings"]
+
+    def walk(span, depth):
+        for child in children.get(span["span_id"], []):
+            if child["name"] in DETAIL_SPANS:
+                continue
+            lines.append(f"   {'  ' * depth}{child['name']:<{24 - 2 * depth}}{child['seconds']:>8.2f}s")
+            walk(child, depth + 1)
+
+    root = spans[0]
+    walk(root, 0)
+    lines.append(f"   {'total':<24}{root['seconds']:>8.2f}s")
+
+    path = critical_path(spans, children)
+    if path:
+        lines.append("🧭 Critical path")
+        for span, blocker in path:
+            line = f"   {span['name']:<24}{span['seconds']:>8.2f}s"
+            if blocker is not None:
+                label = blocker["attributes"].get("id") or blocker["attributes"].get("ids") or blocker["name"]
+                line += (f"  ← {blocker['name']} {label} started at +{blocker['start'] - span['start']:.2f}s, "
+                         f"ran {blocker['seconds']:.2f}s")
+            lines.append(line)
+
+    calls = [span for span in spans if span["name"] == "llm"]
+    sent = [span for span in calls if span["attributes"].get("cache") != "hit"]
+
+    def tokens(key):
+        return sum(span["attributes"].get(key) or 0 for span in calls)
+
+    lines.append(f"🤖 LLM: {len(sent)} calls, {len(calls) - len(sent)} cache hits, "
+                 f"{tokens('prompt_tokens')} prompt + {tokens('completion_tokens')} completion tokens, "
+                 f"{tokens('retries')} retries, {sum(span['seconds'] for span in sent):.1f}s in calls")
+
+    items = sorted((span for span in spans if span["name"] in ("item", "batch")),
+                   key=lambda span: span["seconds"], reverse=True)[:slowest]
+    if items:
+        lines.append("🐢 Slowest items")
+        for span in items:
+            label = span["attributes"].get("id") or span["attributes"].get("ids") or span["name"]
+            lines.append(f"   {span['name']} {label:<20}{span['seconds']:>8.2f}s")
+    return "\n".join(lines)
@@ -1,30 +1,118 @@
-import sys
 import os
+import argparse
+import glob
 import re
 import json
 import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 from urllib.parse import urlparse
 from collections import defaultdict
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 from openai import OpenAI
 from dotenv import load_dotenv
 
+from cro_browser import (SCROLL_MAX_HEIGHT, SCROLL_TIME_BUDGET, VIEWPORTS, BrowserPool, clear_emulation,
+                         emulate_viewport, new_driver, read_layout, scroll_page)
+from cro_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, DEFAULT_TTL, ResponseCache
+from cro_dedup import merge_findings
+from cro_framework import (DEFAULT_FRAMEWORK, PACKED_BUILDERS, build_context, feature_copy, item_applies,
+                           item_fields, item_fingerprint, item_query, load_framework, render_context,
+                           validate_framework)
+from cro_http import fetch_static, needs_browser
+from cro_rules import DEFAULT_CONFIDENCE, score_locally
+from cro_store import DEFAULT_STORE_PATH, AuditStore
+from cro_llm import (DEFAULT_MAX_RETRIES, DEFAULT_REQUESTS_PER_MIN, DEFAULT_TOKENS_PER_MIN, LLMClient, RateLimiter,
+                     TokenBudgetExceeded, estimate_tokens)
+from cro_page import PARSER, PageModel, load_snapshot, save_snapshot
+from cro_report import REPORT_SCHEMA_NAME, REPORT_SCHEMA_VERSION, append_jsonl, item_scale, write_json_report
+from cro_trace import Trace, format_summary
+
 # Load environment variables
 load_dotenv()
 
+# Maximum number of OpenAI requests in flight at once
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get('CRO_MAX_CONCURRENCY', '8'))
+# Seconds before a single OpenAI request is abandoned (the SDK default is 10 minutes)
+LLM_TIMEOUT = float(os.environ.get('CRO_LLM_TIMEOUT', '60'))
+
+ITEM_SYSTEM_PROMPT = "You are an expert conversion copywriter. Always return valid JSON."
+
+# Reply caps (max_tokens) per call; replies are a few hundred tokens, the caps stop runaway ones
+ITEM_MAX_TOKENS = 400
+TASK_MAX_TOKENS = {"feature_extraction": 1200, "headline_analysis": 1000}
+
+
+class _BatchSlot:
+    """Stands in for a future: one item's share of a batched call."""
+    
+    def __init__(self, batch, item):
+        self.batch = batch
+        self.item = item
+    
+    def result(self):
+        return [(self.item["label"], self.batch["future"].result()[self.item["id"]])]
+    
+    def add_done_callback(self, fn):
+        self.batch["future"].add_done_callback(lambda _: fn(self))
+
 class ComprehensiveCROAuditor:
     """Granular per-item CRO audit using ChatGPT for maximum quality."""
     
-    def __init__(self, url):
+    # Framework "task" items mapped to the methods that produce them
+    TASKS = {
+        "feature_extraction": "_extract_features",
+        "headline_analysis": "_analyze_headline",
+    }
+    
+    def __init__(self, url, max_concurrency=DEFAULT_MAX_CONCURRENCY, framework=None, batch=False,
+                 cache=None, deterministic=True, output_dir="audits", client=None,
+                 fetch_slots=None, llm_slots=None, browser_pool=None,
+                 scroll_budget=SCROLL_TIME_BUDGET, scroll_max_height=SCROLL_MAX_HEIGHT, fetch_mode="auto",
+                 snapshot=None, save_snapshot=False, rate_limiter=None, max_retries=DEFAULT_MAX_RETRIES,
+                 token_budget=None, resume=False, jsonl=None, trace_format=None, on_item=None,
+                 incremental=False, rules=True, rule_confidence=DEFAULT_CONFIDENCE, pack=True,
+                 viewports=("desktop",), store=None, page=None, site_results=None):
+        # A snapshot carries its own URL; an explicit url only overrides it
+        self.snapshot = snapshot
+        self.save_snapshot = save_snapshot
+        self._snapshot_data = load_snapshot(snapshot) if snapshot else None
+        if snapshot and not url:
+            url = self._snapshot_data[2].get("url", "")
         self.url = url if url.startswith('http') else f'https://{url}'
+        self.max_concurrency = max(1, max_concurrency)
+        self.batch = batch
+        self.cache = cache
+        self.output_dir = output_dir
+        # Optional JSONL file collecting one row per item across many audits
+        self.jsonl = jsonl
+        # Optional AuditStore (SQLite history) shared across auditors
+        self.store = store
+        # Optional semaphores shared across auditors to cap browsers and in-flight LLM calls
+        self.fetch_slots = fetch_slots
+        self.llm_slots = llm_slots
+        self.browser_pool = browser_pool
+        self.scroll_budget = scroll_budget
+        self.scroll_max_height = scroll_max_height
+        # "auto" tries plain HTTP first, "static" never starts a browser, "browser" always does
+        self.fetch_mode = fetch_mode
+        self.fetched_with = None
+        # The first viewport is audited in full; items that read differently on the others are re-scored
+        self.viewports = list(viewports) or ["desktop"]
+        self.layout = {}
+        self.viewport_pages = {}
+        self.viewport_results = {}
+        # Sampling at 0 makes cached responses a faithful stand-in for a fresh call
+        self.temperature = 0 if cache and deterministic else 0.7
+        self.framework = validate_framework(framework or DEFAULT_FRAMEWORK, self.TASKS)
+        self.html = ""
         self.soup = None
+        self.page = None
         self.text_content = ""
         self.title = ""
         self.h1 = ""
@@ -35,91 +123,501 @@ class ComprehensiveCROAuditor:
         self.all_headings = []
         self.report = defaultdict(list)
         self.api_calls_made = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Stop making calls once this many tokens were spent (None = unlimited)
+        self.token_budget = token_budget
+        self.tokens_used = 0
+        # Estimated prompt + max_tokens of calls in flight, held against the budget until they finish
+        self.tokens_reserved = 0
+        self.budget_exhausted = False
+        self._tasks = []
+        self._batches = []
+        # Items are appended to a JSONL stream as they finish; --resume reuses it
+        self.resume = resume
+        self.stream_path = None
+        self._stream = None
+        self._recorded = {}
+        # With incremental=True, results of items whose inputs are unchanged since the
+        # last audit of this URL are carried forward from its baseline
+        self.incremental = incremental
+        self._carried = {}
+        # Objective items are scored by local rules (cro_rules) when they're confident enough
+        self.rules = rules
+        self.rule_confidence = rule_confidence
+        self.rule_scored = 0
+        # {item fingerprint: results} scored once for a whole site (see cro_site)
+        self.site_results = site_results or {}
+        self.site_shared = 0
+        # Send copy items the page sections most relevant to them instead of the leading slice
+        self.pack = pack
+        # Called with each item record as it finishes (the audit service streams these)
+        self.on_item = on_item
+        self._lock = threading.Lock()
+        self.error = None
+        # Wall-clock time (time.time()) after which no new LLM call is started; set by batch runs
+        self.deadline = None
+        self.report_base = None
+        self.timings = {}
+        # Spans for every stage, item and LLM call; saved when trace_format is "json" or "otlp"
+        self.trace = Trace("audit", url=self.url)
+        self.trace_format = trace_format
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
         
         # Configure OpenAI
         api_key = os.environ.get('OPENAI_API_KEY', '')
-        if api_key:
-            self.client = OpenAI(api_key=api_key)
-            self.model = "gpt-4o-mini"
+        self.model = "gpt-4o-mini"
+        if client:
+            self.client = client
+        elif api_key:
+            # Retries are handled by LLMClient so they respect the shared rate limiter
+            self.client = OpenAI(api_key=api_key, max_retries=0, timeout=LLM_TIMEOUT)
         else:
             print("⚠️ OPENAI_API_KEY not found.")
             self.client = None
+        self.llm = LLMClient(self.client, rate_limiter, max_retries) if self.client else None
+        if page is not None:
+            self.fetched_with = "page"
+            self.use_page(page)
         
 
     
     def run_audit(self):
+        """Fetch, audit and save reports. Returns the report base path, or None if the fetch failed."""
         print(f"\n🤖 COMPREHENSIVE CRO AUDIT (Granular Analysis)\n📍 URL: {self.url}\n")
         
-        # Fetch content
-        try:
-            self._fetch_content()
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            return
+        # Fetch content (or reuse a saved snapshot) unless a page was given or fetched already
+        if self.page is None and not self.fetch():
+            return None
         
-        print(f"\n📋 Analyzing ~40 framework items (this will take 2-3 minutes)...\n")
+        print(f"\n📋 Analyzing ~40 framework items ({self.max_concurrency} concurrent requests)...\n")
         
-        # Run ALL audit items (granular)
-        self._audit_all_items()
+        # Run ALL audit items (granular), streaming each result to disk
+        self._open_stream()
+        if self.incremental:
+            self._load_baseline()
+        try:
+            with self._stage("items"):
+                self._audit_all_items()
+        finally:
+            self._stream.close()
+            self._stream = None
+        if self.viewport_pages and not self._timed_out():
+            with self._stage("viewports"):
+                self._audit_viewports()
+        
+        # The batch already reported this URL as timed out: leave no reports or store rows behind
+        if self._timed_out():
+            self.error = "Audit time limit reached"
+            print(f"⏱️ Time limit reached for {self.url}, reports not saved")
+            return None
         
         # Save reports
-        self._save_reports()
-        print(f"\n✅ Complete! Made {self.api_calls_made} ChatGPT API calls for maximum quality.\n")
+        with self._stage("report"):
+            self._save_reports()
+            if self.incremental:
+                self._save_baseline()
+        self.trace.finish(api_calls=self.api_calls_made, tokens=self.tokens_used)
+        if self.trace_format:
+            self._save_trace()
+        print(f"\n{format_summary(self.trace)}")
+        print(f"\n✅ Complete! Made {self.api_calls_made} ChatGPT API calls{self._cache_summary()} for maximum quality.\n")
+        return self.report_base
+    
+    def fetch(self):
+        """Fetch the page (or load the snapshot); returns False and sets self.error on failure."""
+        try:
+            with self._stage("fetch"):
+                if self.snapshot:
+                    self._load_snapshot()
+                else:
+                    self._fetch_content()
+            if self.save_snapshot:
+                self._save_snapshot()
+        except Exception as e:
+            self.error = str(e)
+            print(f"❌ Error: {e}")
+            self.trace.finish(error=self.error)
+            return False
+        return True
+    
+    def summary(self):
+        """Headline numbers for this audit, as used by batch summaries."""
+        scored = [(item['score'], item_scale(cat)["max"])
+                  for cat, items in self.report.items() for item in items
+                  if isinstance(item['score'], (int, float))]
+        total = sum(out_of for _, out_of in scored)
+        return {
+            "url": self.url,
+            "items": len(scored),
+            "score_pct": round(100 * sum(score for score, _ in scored) / total, 1) if total else None,
+            "api_calls": self.api_calls_made,
+            "cache_hits": self.cache_hits,
+            "tokens": self.tokens_used,
+            "unscored": sum(1 for items in self.report.values() for item in items if item['score'] is None),
+            "carried_forward": len(self._carried),
+            "rule_scored": self.rule_scored,
+            "site_shared": self.site_shared,
+            "report": self.report_base,
+            "error": self.error,
+        }
     
 
     
+    def json_report(self):
+        """The audit as a structured document (see cro_report.REPORT_SCHEMA)."""
+        summary = self.summary()
+        return {
+            "schema": REPORT_SCHEMA_NAME,
+            "schema_version": REPORT_SCHEMA_VERSION,
+            "url": self.url,
+            "generated_at": datetime.now().isoformat(),
+            "framework": {"name": self.framework.get("name"), "version": self.framework.get("version")},
+            "fetched_with": self.fetched_with,
+            "error": self.error,
+            "summary": {"items": summary["items"], "unscored": summary["unscored"], "score_pct": summary["score_pct"],
+                        "carried_forward": summary["carried_forward"], "rule_scored": summary["rule_scored"],
+                        "site_shared": summary["site_shared"]},
+            "timings": self.timings,
+            "viewports": {
+                "primary": self.viewports[0],
+                "captured": [self.viewports[0]] + list(self.viewport_pages),
+                "rescored": {name: [result["id"] for result in results] for name, results in self.viewport_results.items()},
+                "diffs": self.viewport_diffs(),
+            },
+            "findings": self.merged_findings(),
+            "usage": {
+                "model": self.model,
+                "api_calls": self.api_calls_made,
+                "tokens": self.tokens_used,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "retries": self.llm.retries if self.llm else 0,
+                "token_budget": self.token_budget,
+                "budget_exhausted": self.budget_exhausted,
+            },
+            "cache": {"enabled": bool(self.cache), "hits": self.cache_hits, "misses": self.cache_misses},
+            "items": [
+                {
+                    "id": item["id"],
+                    "category": category,
+                    "question": item["question"],
+                    "score": item["score"],
+                    "scale": item_scale(category),
+                    "status": "unscored" if item["score"] is None else "scored",
+                    "issues": item["issues"],
+                    "suggestion": item["solution"],
+                }
+                for category, items in self.report.items() for item in items
+            ],
+        }
+    
+    def merged_findings(self):
+        """Items whose suggestions say the same thing, merged into one finding each (see cro_dedup)."""
+        rows = [{"url": self.url, "id": item["id"], "score": item["score"], "scale_max": item_scale(category)["max"],
+                 "issues": item["issues"], "suggestion": item["solution"]}
+                for category, items in self.report.items() for item in items]
+        return merge_findings(rows)
+    
+    @contextmanager
+    def _stage(self, name, **attributes):
+        """Time a pipeline stage as a trace span and record it in self.timings."""
+        with self.trace.span(name, **attributes) as span:
+            yield span
+        self.timings[name] = round(span["end"] - span["start"], 3)
+    
+    def _record_stage(self, name, start, **attributes):
+        """Record a stage that started at `start` and ends now."""
+        span = self.trace.add(name, start, **attributes)
+        self.timings[name] = round(span["end"] - span["start"], 3)
+    
     def _fetch_content(self):
-        """Fetch page with Selenium."""
+        """Fetch the page over plain HTTP when possible, otherwise with Selenium."""
+        if self.fetch_mode == "static" and len(self.viewports) > 1:
+            print("⚠️ Other viewports need the browser; auditing the static HTML only")
+        if self.fetch_mode == "static" or (self.fetch_mode == "auto" and len(self.viewports) == 1):
+            print("⚡ Fetching page over HTTP...")
+            with self._stage("http") as span:
+                try:
+                    html = fetch_static(self.url)
+                    reason = needs_browser(html)
+                except Exception as e:
+                    html, reason = None, f"HTTP fetch failed: {e}"
+                span["attributes"]["needs_browser"] = reason
+            
+            if html is not None and (reason is None or self.fetch_mode == "static"):
+                self.fetched_with = "http"
+                with self._stage("parse"):
+                    self.html = html
+                    self.soup = BeautifulSoup(html, PARSER)
+                self._extract_sections()
+                return
+            if self.fetch_mode == "static":
+                raise RuntimeError(reason)
+            print(f"↪️ Falling back to the browser ({reason})")
+        
         print("🌍 Loading page...")
-        options = Options()
-        options.add_argument('--headless')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--window-size=1920,1080')
-        options.add_argument('--log-level=3')
-        
-        driver = None
+        self.fetched_with = "browser"
+        with self.fetch_slots or nullcontext():
+            if self.browser_pool:
+                start = time.time()
+                with self.browser_pool.driver() as driver:
+                    self._record_stage("browser_start", start, pooled=True)
+                    self._load_page(driver)
+            else:
+                driver = None
+                try:
+                    with self._stage("browser_start", pooled=False):
+                        driver = new_driver()
+                    self._load_page(driver)
+                finally:
+                    if driver:
+                        driver.quit()
+        
+        self._extract_sections()
+    
+    def _load_page(self, driver):
+        """Load the URL in a driver, scroll for lazy content and parse the DOM (for every viewport)."""
+        emulated = False
         try:
-            driver = webdriver.Chrome(options=options)
-            driver.get(self.url)
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.TAG_NAME, "h1")))
+            if self.viewports[0] != "desktop":
+                emulate_viewport(driver, self.viewports[0])
+                emulated = True
+            self._render(driver)
+            with self._stage("parse"):
+                self.layout = read_layout(driver)
+                self.html = driver.page_source
+                self.soup = BeautifulSoup(self.html, PARSER)
             
-            # Scroll to load lazy content
-            total_height = int(driver.execute_script("return document.body.scrollHeight"))
-            for i in range(1, total_height, 1000):
-                driver.execute_script(f"window.scrollTo(0, {i});")
-                time.sleep(0.05)
-            time.sleep(1)
-            
-            self.soup = BeautifulSoup(driver.page_source, 'html.parser')
+            # Other viewports reuse the session: switch device emulation and reload
+            for name in self.viewports[1:]:
+                with self._stage(f"viewport_{name}"):
+                    emulate_viewport(driver, name)
+                    emulated = True
+                    self._render(driver, stages=False)
+                    page = PageModel.from_html(driver.page_source, self.url)
+                    page.layout = read_layout(driver)
+                    self.viewport_pages[name] = page
+                print(f"📱 Captured {name} viewport ({self.timings[f'viewport_{name}']}s)")
         finally:
-            if driver:
-                driver.quit()
-        
-        # Extract sections
-        for script in self.soup(["script", "style", "noscript"]):
-            script.extract()
-        
-        self.text_content = self.soup.get_text(separator=' ', strip=True)[:5000]
-        self.title = self.soup.title.string if self.soup.title else "No Title"
-        h1_tag = self.soup.find('h1')
-        self.h1 = h1_tag.get_text(strip=True) if h1_tag else "No H1"
-        h2_tag = self.soup.find('h2')
-        self.h2 = h2_tag.get_text(strip=True) if h2_tag else ""
-        
-        paragraphs = [p.get_text(strip=True) for p in self.soup.find_all('p') if len(p.get_text(strip=True)) > 20]
-        self.hero_paragraphs = paragraphs[:3]
-        
-        cta_buttons = self.soup.find_all(['a', 'button'], class_=re.compile(r'btn|button|cta', re.I))
-        self.ctas = [btn.get_text(strip=True) for btn in cta_buttons if btn.get_text(strip=True)][:5]
-        
-        self.all_headings = [h.get_text(strip=True) for h in self.soup.find_all(['h1', 'h2', 'h3'])][:10]
-        
-        testimonial_containers = self.soup.find_all(class_=re.compile(r'testimon|review|quote', re.I))
-        self.testimonials = [t.get_text(strip=True)[:200] for t in testimonial_containers][:3]
+            if emulated:
+                clear_emulation(driver)
+    
+    def _render(self, driver, stages=True):
+        """Load the URL and scroll it for lazy content."""
+        with self._stage("load") if stages else nullcontext():
+            driver.get(self.url)
+            # Not every page has an <h1>; wait for the document itself instead
+            WebDriverWait(driver, 10).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        
+        # Scroll to load lazy content
+        with self._stage("scroll") if stages else nullcontext() as span:
+            scroll = scroll_page(driver, time_budget=self.scroll_budget, max_height=self.scroll_max_height)
+            if span:
+                span["attributes"].update(height=scroll["height"], steps=scroll["steps"], stopped=scroll["stopped"])
+        print(f"📜 Scrolled {scroll['height']}px in {scroll['steps']} steps ({scroll['seconds']}s, stopped at {scroll['stopped']})")
+    
+    def _load_snapshot(self):
+        """Use a saved page snapshot instead of fetching the live page."""
+        print(f"📸 Loading snapshot {self.snapshot}...")
+        page, self.html, snapshot = self._snapshot_data
+        self.fetched_with = "snapshot"
+        meta = snapshot.get("meta", {})
+        if meta.get("viewports"):
+            self.viewports = meta["viewports"]
+            self.viewport_pages = {name: PageModel.from_dict(data) for name, data in meta.get("viewport_pages", {}).items()}
+        self.use_page(page)
+    
+    def _extract_sections(self):
+        """Build the page model in one pass and expose the fields the framework reads."""
+        with self._stage("extract"):
+            page = PageModel.from_soup(self.soup, self.url)
+            page.layout = self.layout
+        self.use_page(page)
+    
+    def use_page(self, page):
+        """Make the page model current and mirror its fields onto the auditor."""
+        self.page = page
+        self.text_content = self.page.text_content
+        self.title = self.page.title
+        self.h1 = self.page.h1
+        self.h2 = self.page.h2
+        self.hero_paragraphs = self.page.hero_paragraphs
+        self.ctas = self.page.ctas
+        self.all_headings = self.page.all_headings
+        self.testimonials = self.page.testimonials
         
         print(f"✅ Content extracted\n")
     
+    def _timed_out(self):
+        return bool(self.deadline) and time.time() >= self.deadline
+    
+    def _chat(self, system_prompt, prompt, max_tokens=ITEM_MAX_TOKENS):
+        """Send one JSON-mode chat completion (through the cache if enabled) and parse the reply."""
+        if self._timed_out():
+            raise TimeoutError("Audit time limit reached")
+        with self.trace.span("llm", model=self.model, cache="miss" if self.cache else "off",
+                             max_tokens=max_tokens) as span:
+            return self._chat_traced(span, system_prompt, prompt, max_tokens)
+    
+    def _chat_traced(self, span, system_prompt, prompt, max_tokens):
+        key = None
+        if self.cache:
+            key = self.cache.key(self.model, self.temperature, system_prompt, prompt)
+            cached = self.cache.get(key)
+            with self._lock:
+                if cached is not None:
+                    self.cache_hits += 1
+                else:
+                    self.cache_misses += 1
+            if cached is not None:
+                span["attributes"]["cache"] = "hit"
+                return json.loads(cached)
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        # Reserve the call's worst case so concurrent calls can't overshoot the budget together
+        reserved = estimate_tokens(messages, max_tokens) if self.token_budget else 0
+        with self._lock:
+            if self.token_budget and self.tokens_used + self.tokens_reserved + reserved > self.token_budget:
+                if not self.budget_exhausted:
+                    print(f"🛑 Token budget of {self.token_budget} spent, skipping remaining calls")
+                self.budget_exhausted = True
+                raise TokenBudgetExceeded(f"Token budget of {self.token_budget} spent")
+            self.tokens_reserved += reserved
+        
+        self._count_api_call()
+        if self.llm_slots:
+            self.llm_slots.acquire()
+        try:
+            response, usage = self.llm.complete(
+                model=self.model,
+                messages=messages,
+                temperature=self.temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            )
+        finally:
+            if self.llm_slots:
+                self.llm_slots.release()
+            with self._lock:
+                self.tokens_reserved -= reserved
+        span["attributes"].update(usage)
+        with self._lock:
+            self.tokens_used += usage["total_tokens"]
+            self.prompt_tokens += usage["prompt_tokens"] or 0
+            self.completion_tokens += usage["completion_tokens"] or 0
+        
+        if getattr(response.choices[0], "finish_reason", None) == "length":
+            raise ValueError(f"Reply cut off at max_tokens={max_tokens}")
+        content = response.choices[0].message.content.strip()
+        parsed = json.loads(content)
+        if self.cache:
+            self.cache.set(key, content)
+        return parsed
+    
+    def _cache_summary(self):
+        """Cache hit/miss note to show next to the API call count."""
+        note = f", {self.tokens_used} tokens"
+        if self.cache:
+            note += f" ({self.cache_hits} cache hits, {self.cache_misses} misses)"
+        return note
+    
+    def _failed_result(self, error, suggestion="Manual review"):
+        """Unscored result for an item whose call failed, so it isn't reported as a 0."""
+        if isinstance(error, TokenBudgetExceeded):
+            return {"score": None, "issues": ["Skipped: token budget exhausted"],
+                    "suggestion": "Re-run with a larger --token-budget"}
+        return {"score": None, "issues": [f"Error: {str(error)}"], "suggestion": suggestion}
+    
+    def _count_api_call(self):
+        """Increment the API call counter (safe across worker threads)."""
+        with self._lock:
+            self.api_calls_made += 1
+    
+    def _queue(self, category, task, item_id=None, record=True, first=False):
+        """Queue a task returning a list of (question, result) pairs for a category.
+        
+        first=True tasks are started before everything else (long replies that would otherwise be the tail).
+        """
+        self._tasks.append((category, item_id, task, record, first))
+    
+    def _queue_item(self, category, label, question, context, guidance, item_id=None):
+        """Queue a single framework item for LLM analysis."""
+        self._queue(category, lambda: [(label, self._analyze_item(question, context, guidance))], item_id)
+    
+    def _queue_static(self, category, label, result, item_id=None):
+        """Queue a precomputed result so it keeps its place in the report."""
+        self._queue(category, lambda: [(label, result)], item_id)
+    
+    def _plan_batches(self, items):
+        """Group LLM items by context builder; return {item_id: batch} for groups of 2+."""
+        groups = defaultdict(list)
+        for item in items:
+            if item.get("kind", "llm") == "llm":
+                groups[item["context"]].append(item)
+        
+        planned = {}
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+            # Limits differ per item (e.g. [:800] vs [:1000]); send the widest slice once
+            if self.pack and members[0]["context"] in PACKED_BUILDERS:
+                widest = max(members, key=lambda item: item.get("limit", 0))
+                context = render_context(widest, self.page, query=' '.join(item_query(item) for item in members))
+            else:
+                context = max((render_context(item, self.page, self.pack) for item in members), key=len)
+            batch = {"context": context, "items": members, "future": None}
+            self._batches.append(batch)
+            for item in members:
+                planned[item["id"]] = batch
+        return planned
+    
+    def _run_queued(self):
+        """Run queued tasks concurrently and add results in queue order."""
+        tasks, self._tasks = self._tasks, []
+        batches, self._batches = self._batches, []
+        long_tasks = sum(1 for task in tasks if task[4])
+        print(f"\n⚡ Running {len(tasks)} tasks ({len(batches)} batched calls, {long_tasks} long replies first) "
+              f"with up to {self.max_concurrency} requests in flight...")
+        parent = self.trace.current()
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            def submit(index):
+                category, item_id, task, record, _ = tasks[index]
+                if isinstance(task, _BatchSlot):
+                    future = task
+                else:
+                    future = pool.submit(self._traced, "item", parent, {"id": item_id, "category": category,
+                                                                        "resumed": not record}, task)
+                if record:
+                    future.add_done_callback(
+                        lambda done, category=category, item_id=item_id: self._record(category, item_id, done))
+                futures[index] = future
+            
+            # Slowest first: long-reply tasks, then batches (so no batched slot waits behind them), then items
+            order = sorted(range(len(tasks)), key=lambda index: not tasks[index][4])
+            for index in order[:long_tasks]:
+                submit(index)
+            for batch in batches:
+                ids = ",".join(item["id"] for item in batch["items"])
+                batch["future"] = pool.submit(self._traced, "batch", parent, {"ids": ids},
+                                              self._analyze_batch, batch["context"], batch["items"])
+            for index in order[long_tasks:]:
+                submit(index)
+            # Results go into the report in queue order
+            for index, (category, item_id, _, _, _) in enumerate(tasks):
+                for question, result in futures[index].result():
+                    self._add_item(category, question, result, item_id)
+    
+    def _traced(self, name, parent, attributes, fn, *args):
+        """Run fn(*args) on a worker thread inside a trace span."""
+        with self.trace.span(name, parent=parent, **attributes):
+            return fn(*args)
+    
     def _analyze_item(self, question, context, guidance):
         """Analyze a single framework item with ChatGPT."""
         if not self.client:
@@ -145,425 +643,173 @@ Provide your analysis as JSON:
 Be harsh and specific. Provide real examples, not generic advice."""
 
         try:
-            self.api_calls_made += 1
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are an expert conversion copywriter. Always return valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content.strip())
+            result = self._chat(ITEM_SYSTEM_PROMPT, prompt)
             return {
                 "score": result.get("score", 0),
                 "issues": result.get("issues", []),
                 "suggestion": result.get("suggestion", "")
             }
         except Exception as e:
-            return {"score": 0, "issues": [f"Error: {str(e)}"], "suggestion": "Manual review"}
+            return self._failed_result(e)
     
-    def _audit_all_items(self):
-        """Run comprehensive audit of all ~40 framework items."""
-        
-        # ===================================================================
-        # 1. ORIENT UPON ENTRANCE (4 items)
-        # ===================================================================
-        print("🔍 1/7: Orient Upon Entrance...")
-        cat = "1. Orient Upon Entrance"
-        
-        # 1.1
-        result = self._analyze_item(
-            "Does the header copy explain WHAT the product/service is?",
-            f"H1: '{self.h1}'\nH2: '{self.h2}'\nFirst paragraph: '{self.hero_paragraphs[0] if self.hero_paragraphs else 'None'}'",
-            "The H1 should immediately clarify the product category and function. Score 3 if crystal clear, 0 if vague."
-        )
-        self._add_item(cat, "Does header explain WHAT the product is?", result)
-        
-        # 1.2
-        result = self._analyze_item(
-            "Does the header copy match the pre-click ad or SERP copy?",
-            f"Page Title: '{self.title}'\nH1: '{self.h1}'",
-            "Check for message match/scent. Title is a proxy for ad copy. Strong overlap = 3, no overlap = 0."
-        )
-        self._add_item(cat, "Does header match ad/SERP expectations?", result)
-        
-        # 1.3
-        result = self._analyze_item(
-            "Does the copy clearly call out WHO the product/service is for?",
-            f"H1: '{self.h1}'\nH2: '{self.h2}'\nHero: '{self.hero_paragraphs[0] if self.hero_paragraphs else ''}'",
-            "Look for explicit audience targeting like 'for DevOps teams' or 'built for marketers'. Score 3 if specific, 0 if generic."
-        )
-        self._add_item(cat, "Does copy call out WHO it's for?", result)
-        
-        # 1.4 
-        result = self._analyze_item(
-            "Is there a clear, visually dominant page goal that leads into the funnel?",
-            f"CTAs found: {', '.join(self.ctas) if self.ctas else 'None'}",
-            "Evaluate if there's ONE primary action. Score 3 if clear dominant CTA, 0 if confusing/multiple equal CTAs."
-        )
-        self._add_item(cat, "Is there a clear page goal?", result)
-        
-        # ===================================================================
-        # 2. APPEAL TO USER MOTIVATION (2 items)
-        # ===================================================================
-        print("🔍 2/7: Appeal to User Motivation...")
-        cat = "2. Appeal to User Motivation"
-        
-        # 2.1
-        hero_text = '\n'.join(self.hero_paragraphs[:2])
-        result = self._analyze_item(
-            "Does the copy focus on desired outcomes or pain elimination?",
-            f"Hero copy:\n{hero_text}",
-            "Look for pain (frustrations, risks) and gain (achievements, outcomes) language. Score 3 if strong focus, 0 if product-centric only."
-        )
-        self._add_item(cat, "Focus on pain/gain outcomes?", result)
-        
-        # 2.2
-        result = self._analyze_item(
-            "Are these desires/pain points described specifically and vividly?",
-            f"Hero copy:\n{hero_text}\n\nAll headings: {', '.join(self.all_headings[:5])}",
-            "Check for specific, quantified language vs generic ('save time' = bad, 'deploy in 60 seconds' = good). Score 3 if vivid, 0 if generic."
-        )
-        self._add_item(cat, "Specific and vivid language?", result)
-        
-        # ===================================================================
-        # 3. CONVEY UNIQUE VALUE (4 items)
-        # ===================================================================
-        print("🔍 3/7: Convey Unique Value...")
-        cat = "3. Convey Unique Value"
-        
-        # 3.1
-        result = self._analyze_item(
-            "Does the copy bridge product features to user desires?",
-            f"Sample copy:\n{self.text_content[:1000]}",
-            "Look for 'so that', 'which means', 'allowing you to' connectors. Score 3 if consistent bridges, 0 if feature-dump."
-        )
-        self._add_item(cat, "Feature-benefit bridges?", result)
-        
-        # 3.2
-        result = self._analyze_item(
-            "Does copy explain advantages over existing solutions?",
-            f"Headings: {', '.join(self.all_headings[:10])}",
-            "Look for competitive differentiation, comparisons, or 'unlike X' language. Score 3 if clear differentiation, 0 if generic."
-        )
-        self._add_item(cat, "Competitive advantages explained?", result)
-        
-        # 3.3
-        result = self._analyze_item(
-            "Does copy support claims with objective proof?",
-            f"Sample copy:\n{self.text_content[:1000]}",
-            "Look for stats, numbers, percentages, case study data. Score 3 if proof-heavy, 0 if unsubstantiated claims."
-        )
-        self._add_item(cat, "Claims backed by proof?", result)
-        
-        # 3.4
-        result = self._analyze_item(
-            "Does copy support claims with demonstrations/previews?",
-            f"Found {len(self.soup.find_all(['video', 'iframe']))} videos, {len(self.soup.find_all('img'))} images",
-            "Check if visual demos/screenshots exist. Score 3 if strong visual proof, 0 if text-only."
-        )
-        self._add_item(cat, "Visual demonstrations included?", result)
-        
-        # ===================================================================
-        # 4. ESTABLISH CREDIBILITY (4 items)
-        # ===================================================================
-        print("🔍 4/7: Establish Credibility...")
-        cat = "4. Establish Credibility"
-        
-        # 4.1
-        testimonial_text = '\n---\n'.join(self.testimonials) if self.testimonials else "None found"
-        result = self._analyze_item(
-            "Does copy include customer endorsements from target market?",
-            f"Testimonials:\n{testimonial_text}",
-            "Check for customer quotes. Score 3 if multiple relevant testimonials, 0 if none."
-        )
-        self._add_item(cat, "Customer testimonials present?", result)
-        
-        # 4.2
-        result = self._analyze_item(
-            "Does copy include high-profile media endorsements?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Look for 'Featured in', 'As seen on', media logos. Score 3 if strong media presence, 0 if none."
-        )
-        self._add_item(cat, "Media endorsements?", result)
-        
-        # 4.3
-        result = self._analyze_item(
-            "Does copy include impressive popularity metrics?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Look for '10,000+ users', '5-star rated', large numbers. Score 3 if compelling metrics, 0 if no social proof numbers."
-        )
-        self._add_item(cat, "Popularity metrics shown?", result)
-        
-        # 4.4
-        result = self._analyze_item(
-            "Are testimonials easily verifiable?",
-            f"Testimonials:\n{testimonial_text}",
-            "Check for full names, job titles, companies, photos. Score 3 if fully attributed, 0 if anonymous."
-        )
-        self._add_item(cat, "Testimonials verifiable?", result)
-        
-        # ===================================================================
-        # 5. ADDRESS OBJECTIONS/FEARS (2 items)
-        # ===================================================================
-        print("🔍 5/7: Address Objections/Fears...")
-        cat = "5. Address Objections/Fears"
-        
-        # 5.1
-        result = self._analyze_item(
-            "Does copy offer guarantees or reassurances?",
-            f"Sample copy:\n{self.text_content[:1000]}",
-            "Look for money-back guarantees, free trials, 'cancel anytime', risk reversals. Score 3 if strong guarantees, 0 if none."
-        )
-        self._add_item(cat, "Guarantees/reassurances offered?", result)
-        
-        # 5.2
-        result = self._analyze_item(
-            "Does copy address conversion-critical questions?",
-            f"Headings: {', '.join(self.all_headings)}",
-            "Look for FAQ, 'How it works', answers to pricing/setup/time questions. Score 3 if comprehensive FAQ, 0 if glossed over."
-        )
-        self._add_item(cat, "Critical questions addressed?", result)
-        
-        # ===================================================================
-        # 6. PRESENT THE OFFER (5 items)
-        # ===================================================================
-        print("🔍 6/7: Present the Offer...")
-        cat = "6. Present the Offer"
-        
-        cta_text = ', '.join(self.ctas) if self.ctas else "No CTAs found"
-        
-        # 6.1
-        result = self._analyze_item(
-            "Does CTA focus on acquiring value vs mechanical action?",
-            f"CTAs: {cta_text}",
-            "Good: 'Get Your Free Audit', 'Start Testing'. Bad: 'Submit', 'Click Here'. Score 3 if value-focused, 0 if mechanical."
-        )
-        self._add_item(cat, "CTA focuses on value?", result)
-        
-        # 6.2
-        result = self._analyze_item(
-            "Is the CTA the most visually dominant element?",
-            f"CTAs: {cta_text}\nNote: Check visual hierarchy manually if scoring low.",
-            "Score 3 if CTA stands out clearly, 0 if buried/small."
-        )
-        self._add_item(cat, "CTA visually dominant?", result)
-        
-        # 6.3
-        result = self._analyze_item(
-            "Does CTA make clear what user gets upon converting?",
-            f"CTAs: {cta_text}",
-            "Should be obvious what happens after clicking. Score 3 if crystal clear, 0 if ambiguous."
-        )
-        self._add_item(cat, "CTA outcome clear?", result)
-        
-        # 6.4
-        result = self._analyze_item(
-            "Does offer maximize value and minimize cost perception?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Look for 'free', 'no credit card', value stacking, cost anchoring. Score 3 if optimized, 0 if value unclear."
-        )
-        self._add_item(cat, "Value maximized, cost minimized?", result)
-        
-        # 6.5
-        result = self._analyze_item(
-            "Does offer include time-sensitive incentives?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Look for urgency: limited-time, countdown, scarcity. Score 3 if strong urgency, 0 if none."
-        )
-        self._add_item(cat, "Urgency/scarcity present?", result)
-        
-        # ===================================================================
-        # 7. FORM DESIGN (9 items) - if forms exist
-        # ===================================================================
-        print("🔍 7/7: Form Design...")
-        cat = "7. Form Design"
-        
-        forms = self.soup.find_all('form')
-        if forms:
-            form_html = str(forms[0])[:500]
-            inputs = forms[0].find_all('input')
-            
-            # 7.1
-            result = self._analyze_item(
-                "Does form ask for minimum required information?",
-                f"Form has {len(inputs)} input fields",
-                "Fewer fields = higher conversion. Score 3 if ≤3 fields, 1 if 4-6, 0 if >6."
+    def _analyze_batch(self, context, items):
+        """Analyze several items sharing one context in a single call.
+        
+        Returns {item_id: result}. Items missing from the response (or all of
+        them, if the call fails) are re-run individually.
+        """
+        results = {}
+        if self.client:
+            questions = "\n\n".join(
+                f"**[{item['id']}] Question:** {item['question']}"
+                + (f"\nNote: {item['note']}" if item.get("note") else "")
+                + f"\n**Analysis Guidance:** {item['guidance']}"
+                for item in items
+            )
+            example = ",\n".join(
+                f'  "{item["id"]}": {{"score": 0-3, "issues": ["specific issue"], "suggestion": "Concrete recommendation"}}'
+                for item in items
             )
-            self._add_item(cat, "Minimum fields?", result)
+            prompt = f"""You are an expert conversion copywriter conducting a CRO audit.
+
+**Page Context:**
+{context}
+
+Answer each of the following questions independently, based on the page context above.
+
+{questions}
+
+Provide your analysis as JSON keyed by item ID:
+{{
+{example}
+}}
+
+Be harsh and specific. Provide real examples, not generic advice."""
             
-            # 7.2-7.9 (simplified for brevity - would analyze each individually)
-            self._add_item(cat, "Single-column layout?", {"score": 0, "issues": ["Manual visual check required"], "suggestion": "Use single-column vertical layout for mobile."})
-            self._add_item(cat, "Labels visible (not placeholders)?", {"score": 0, "issues": ["Manual check required"], "suggestion": "Place labels above fields, don't rely on placeholders."})
-            self._add_item(cat, "Input types optimized?", {"score": 0, "issues": ["Manual check"], "suggestion": "Use type='email' for email, type='tel' for phone, etc."})
-            self._add_item(cat, "Error messages clear?", {"score": 0, "issues": ["Manual check"], "suggestion": "Show inline errors: 'Enter a valid email address'."})
-            self._add_item(cat, "Form preserves data on error?", {"score": 0, "issues": ["Requires testing"], "suggestion": "Don't clear form on submit error."})
-            self._add_item(cat, "Trust icons present?", {"score": 0, "issues": ["Manual check"], "suggestion": "Add 'Secure checkout' or SSL badges."})
-            self._add_item(cat, "Help available if issues?", {"score": 0, "issues": ["Manual check"], "suggestion": "Add 'Need help?' link with chat/phone."})
-            self._add_item(cat, "Confidence copy near form?", {"score": 0, "issues": ["Manual check"], "suggestion": "Add testimonial or 'Join 10k users' above form."})
-        else:
-            self._add_item(cat, "No form detected", {"score": 0, "issues": ["No forms found on page"], "suggestion": "N/A"})
-        
-        # ===================================================================
-        # 8. SALES PAGE EDITING CHECKLIST
-        # ===================================================================
-        print("🔍 8/8: Sales Page Editing Checklist...")
-        
-        # -------------------------------------------------------------------
-        # 8.1 CLARITY AND OFFER (2 items)
-        # -------------------------------------------------------------------
-        cat = "8. Sales Page Editing Checklist - Clarity"
-        
-        result = self._analyze_item(
-            "Is the offer and its purpose stated with maximum clarity?",
-            f"H1: '{self.h1}'\nH2: '{self.h2}'\nFirst paragraph: '{self.hero_paragraphs[0] if self.hero_paragraphs else ''}'",
-            "Score 3 if the offer is crystal clear within 3 seconds of landing. Score 0 if visitor must search to understand what's being offered."
-        )
-        self._add_item(cat, "Offer clarity?", result)
-        
-        result = self._analyze_item(
-            "Is the value proposition immediately obvious?",
-            f"H1: '{self.h1}'\nH2: '{self.h2}'",
-            "The main benefit should jump out. Score 3 if value is obvious without reading body copy, 0 if buried."
-        )
-        self._add_item(cat, "Value prop obvious?", result)
-        
-        # -------------------------------------------------------------------
-        # 8.2 AUDIENCE AND MESSAGING ALIGNMENT (2 items)
-        # -------------------------------------------------------------------
-        cat = "8. Sales Page Editing Checklist - Messaging"
-        
-        result = self._analyze_item(
-            "Is hero copy consistent with ad/SERP entry points?",
-            f"Page Title: '{self.title}'\nH1: '{self.h1}'",
-            "Message match is critical. Score 3 if title/H1 align perfectly (ad scent), 0 if mismatch creates confusion."
-        )
-        self._add_item(cat, "Ad scent match?", result)
-        
-        result = self._analyze_item(
-            "Does copy reflect reader's motivations and pain points?",
-            f"Hero copy:\n{chr(10).join(self.hero_paragraphs[:2])}",
-            "Copy should speak to reader's world, not yours. Score 3 if empathetic and motivation-focused, 0 if company-centric."
-        )
-        self._add_item(cat, "Reader motivation reflected?", result)
-        
-        # -------------------------------------------------------------------
-        # 8.3 VALUE AND PERSUASION (3 items)
-        # -------------------------------------------------------------------
-        cat = "8. Sales Page Editing Checklist - Persuasion"
-        
-        result = self._analyze_item(
-            "Does page convey overwhelming value and opportunity?",
-            f"Sample copy:\n{self.text_content[:1000]}",
-            "Value stacking is key. Score 3 if benefits are abundant and compelling, 0 if value is unclear or weak."
-        )
-        self._add_item(cat, "Overwhelming value?", result)
-        
-        result = self._analyze_item(
-            "Does copy answer 'So what?' and 'Prove it?' for skeptics?",
-            f"Sample copy:\n{self.text_content[:1000]}",
-            "Every claim needs proof and benefit clarity. Score 3 if skeptic-proof with evidence, 0 if unsubstantiated claims."
-        )
-        self._add_item(cat, "'So what?' and 'Prove it?' answered?", result)
-        
-        result = self._analyze_item(
-            "Are claims substantiated with evidence?",
-            f"Sample copy:\n{self.text_content[:1000]}\nTestimonials: {len(self.testimonials)}",
-            "Look for testimonials, data, case studies. Score 3 if evidence-rich, 0 if claims without proof."
-        )
-        self._add_item(cat, "Claims have evidence?", result)
-        
-        # -------------------------------------------------------------------
-        # 8.4 CONTENT AND ENGAGEMENT (4 items)
-        # -------------------------------------------------------------------
-        cat = "8. Sales Page Editing Checklist - Engagement"
-        
-        result = self._analyze_item(
-            "Have generic descriptions been replaced with vivid 'word pictures'?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Vivid language creates mental images. Score 3 if copy paints pictures ('deploy in 60 seconds'), 0 if abstract/boring ('fast deployment')."
-        )
-        self._add_item(cat, "Vivid word pictures?", result)
-        
-        result = self._analyze_item(
-            "Does copy guide attention to key visual elements?",
-            f"Sample copy:\n{self.text_content[:600]}",
-            "Look for directive language like 'notice the screenshot above', 'see how'. Score 3 if copy directs eyes, 0 if disconnected from visuals."
-        )
-        self._add_item(cat, "Guides attention to visuals?", result)
-        
-        result = self._analyze_item(
-            "Do imagery and video directly support the copy's message?",
-            f"Found {len(self.soup.find_all(['video', 'iframe']))} videos, {len(self.soup.find_all('img'))} images",
-            "Visuals should enhance, not decorate. Score 3 if visuals prove claims/show product, 0 if generic stock photos."
-        )
-        self._add_item(cat, "Visuals support message?", result)
-        
-        result = self._analyze_item(
-            "Does content include authentic, memorable details?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Specificity builds trust. Score 3 if specific names/numbers/stories ('Sarah at TechCorp saved 40 hours'), 0 if generic."
-        )
-        self._add_item(cat, "Authentic details?", result)
-        
-        # -------------------------------------------------------------------
-        # 8.5 CONTENT PRUNING AND FOCUS (6 items)
-        # -------------------------------------------------------------------
-        cat = "8. Sales Page Editing Checklist - Pruning"
-        
-        # Count long paragraphs
-        long_paras = [p for p in self.soup.find_all('p') if len(p.get_text().split()) > 50]
-        result = self._analyze_item(
-            "Has all non-essential content been removed?",
-            f"Found {len(long_paras)} paragraphs over 50 words",
-            "Every word must earn its place. Score 3 if lean and focused, 0 if bloated with fluff."
-        )
-        self._add_item(cat, "Non-essential removed?", result)
-        
-        # Nested purpose checks
-        result = self._analyze_item(
-            "Does every element reflect reader's motivation?",
-            f"Headings:\n{chr(10).join(self.all_headings[:8])}",
-            "Each section should address a desire or pain. Score 3 if motivation-centric throughout, 0 if product-centric."
-        )
-        self._add_item(cat, "Elements reflect motivation?", result)
-        
-        result = self._analyze_item(
-            "Does every element convey/clarify value?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Features need benefit bridges. Score 3 if value is clear everywhere, 0 if feature-dumping without benefits."
-        )
-        self._add_item(cat, "Elements clarify value?", result)
-        
-        result = self._analyze_item(
-            "Does every element prove a claim?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Claims need proof. Score 3 if every claim backed by evidence, 0 if unsubstantiated assertions."
-        )
-        self._add_item(cat, "Elements prove claims?", result)
-        
-        result = self._analyze_item(
-            "Does every element address anxiety/objection?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Anticipate concerns. Score 3 if objections are pre-answered (FAQ, guarantees), 0 if ignored."
-        )
-        self._add_item(cat, "Addresses objections?", result)
-        
-        result = self._analyze_item(
-            "Does every element add authenticity/specificity?",
-            f"Sample copy:\n{self.text_content[:800]}",
-            "Generic kills trust. Score 3 if specific throughout ('1,247 teams', real names), 0 if vague ('many customers')."
-        )
-        self._add_item(cat, "Authentic specificity?", result)
-        
-        # ===================================================================
-        # 9. FEATURE-PAIN EXTRACTION & ANALYSIS
-        # ===================================================================
-        print(f"🔍 9/9: Extracting Features & Pain Points...")
-        cat = "9. Feature-Pain Point Analysis"
+            try:
+                parsed = self._chat(ITEM_SYSTEM_PROMPT, prompt, ITEM_MAX_TOKENS * len(items))
+                for item in items:
+                    result = parsed.get(item["id"])
+                    if isinstance(result, dict):
+                        results[item["id"]] = {
+                            "score": result.get("score", 0),
+                            "issues": result.get("issues", []),
+                            "suggestion": result.get("suggestion", "")
+                        }
+            except TokenBudgetExceeded as e:
+                return {item["id"]: self._failed_result(e) for item in items}
+            except Exception as e:
+                print(f"⚠️ Batched call failed ({e}), re-running {len(items)} items individually")
+        
+        for item in items:
+            if item["id"] not in results:
+                results[item["id"]] = self._analyze_item(item["question"], build_context(item, self.page, self.pack), item["guidance"])
+        return results
+    
+    def _audit_all_items(self):
+        """Run every framework item that applies to this page."""
+        items = [item for item in self.framework["items"] if item_applies(item, self.page)]
+        pending = [item for item in items if item["id"] not in self._recorded and item["id"] not in self._carried]
+        shared = {}
+        if self.site_results:
+            for item in pending:
+                fingerprint = item_fingerprint(item, self.page, self.pack)
+                if fingerprint in self.site_results:
+                    shared[item["id"]] = self.site_results[fingerprint]
+            pending = [item for item in pending if item["id"] not in shared]
+        self.site_shared = len(shared)
+        local = {}
+        if self.rules:
+            for item in pending:
+                result = score_locally(item, self.page, self.rule_confidence)
+                if result is not None:
+                    local[item["id"]] = result
+            pending = [item for item in pending if item["id"] not in local]
+            if local:
+                print(f"📏 {len(local)} items scored by local rules")
+        self.rule_scored = len(local)
+        batches = self._plan_batches(pending) if self.batch else {}
+        
+        current = None
+        for item in items:
+            category = item["category"]
+            if category != current:
+                print(f"🔍 {category}...")
+                current = category
+            
+            kind = item.get("kind", "llm")
+            if item["id"] in self._recorded:
+                self._queue(category, lambda results=self._recorded[item["id"]]: results, item["id"], record=False)
+            elif item["id"] in self._carried:
+                self._queue(category, lambda results=self._carried[item["id"]]: results, item["id"])
+            elif item["id"] in shared:
+                self._queue(category, lambda results=shared[item["id"]]: results, item["id"])
+            elif item["id"] in local:
+                self._queue_static(category, item["label"], local[item["id"]], item["id"])
+            elif kind == "static":
+                self._queue_static(category, item["label"], item["result"], item["id"])
+            elif kind == "task":
+                # Tasks only read the page and have the longest replies: start them first
+                self._queue(category, getattr(self, self.TASKS[item["task"]]), item["id"], first=True)
+            elif item["id"] in batches:
+                self._queue(category, _BatchSlot(batches[item["id"]], item), item["id"])
+            else:
+                self._queue_item(category, item["label"], item["question"],
+                                 build_context(item, self.page, self.pack), item["guidance"], item["id"])
+        
+        self._run_queued()
+    
+    def _audit_viewports(self):
+        """Re-score items whose inputs differ on the other viewports and note where the scores diverge."""
+        primary = {}
+        for entries in self.report.values():
+            for entry in entries:
+                primary.setdefault(entry["id"], entry)
+        
+        for name, page in self.viewport_pages.items():
+            # Tasks read copy, which the viewport rarely changes; they stay desktop-only
+            changed = [item for item in self.framework["items"]
+                       if item.get("kind", "llm") != "task" and item["id"] in primary and item_applies(item, page)
+                       and item_fingerprint(item, page, self.pack) != item_fingerprint(item, self.page, self.pack)]
+            print(f"📱 {name}: re-scoring {len(changed)} items that read differently")
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                results = list(executor.map(lambda item: self._score_on(item, page), changed))
+            self.viewport_results[name] = [
+                {
+                    "id": item["id"],
+                    "question": item["label"],
+                    "score": result["score"],
+                    "primary_score": primary[item["id"]]["score"],
+                    "issues": list(result["issues"]),
+                    "suggestion": result["suggestion"],
+                }
+                for item, result in zip(changed, results)
+            ]
+    
+    def score_item(self, item):
+        """Score one item on this page outside a full run; returns its (question, result) pairs."""
+        if item.get("kind", "llm") == "task":
+            return getattr(self, self.TASKS[item["task"]])()
+        return [(item["label"], self._score_on(item, self.page))]
+    
+    def _score_on(self, item, page):
+        """Score one item against another page model (local rule, LLM or static result)."""
+        if self.rules:
+            result = score_locally(item, page, self.rule_confidence)
+            if result is not None:
+                return result
+        if item.get("kind", "llm") == "static":
+            return item["result"]
+        return self._analyze_item(item["question"], build_context(item, page, self.pack), item["guidance"])
+    
+    def viewport_diffs(self):
+        """Re-scored items whose score differs from the primary viewport's."""
+        return [dict(result, viewport=name) for name, results in self.viewport_results.items()
+                for result in results if result["score"] != result["primary_score"]]
+    
+    def _extract_features(self):
+        """Extract features and pain points in a single call."""
+        items = []
         
         # Use ChatGPT to extract features and pain points from the page
         extraction_prompt = f"""Analyze this landing page and extract the product features and associated pain points.
@@ -575,7 +821,7 @@ H2: {self.h2}
 Hero: {self.hero_paragraphs[0] if self.hero_paragraphs else ''}
 Headings: {', '.join(self.all_headings[:10])}
 Sample Copy:
-{self.text_content[:2000]}
+{feature_copy(self.page, self.pack)}
 
 **Task:** Identify up to 5 key product features mentioned on this page and their associated pain points.
 
@@ -605,18 +851,8 @@ Be specific and base your analysis on actual page content."""
 
         if self.client:
             try:
-                self.api_calls_made += 1
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are an expert product analyst. Return valid JSON only."},
-                        {"role": "user", "content": extraction_prompt}
-                    ],
-                    temperature=0.7,
-                    response_format={"type": "json_object"}
-                )
-                
-                extracted = json.loads(response.choices[0].message.content.strip())
+                extracted = self._chat("You are an expert product analyst. Return valid JSON only.", extraction_prompt,
+                                       TASK_MAX_TOKENS["feature_extraction"])
                 features = extracted.get("features", [])
                 
                 if features:
@@ -625,8 +861,7 @@ Be specific and base your analysis on actual page content."""
                         score = f.get('severity', 0) * f.get('frequency', 0)
                         unique_marker = " [UNIQUE]" if f.get('unique', False) else ""
                         
-                        self._add_item(
-                            cat,
+                        items.append((
                             f"{f.get('feature', 'Unknown')}{unique_marker}",
                             {
                                 "score": min(score // 5, 3),  # Normalize to 0-3 scale
@@ -636,31 +871,26 @@ Be specific and base your analysis on actual page content."""
                                 ],
                                 "suggestion": f"Desired Outcome: {f.get('outcome', 'N/A')}"
                             }
-                        )
+                        ))
                 else:
-                    self._add_item(cat, "No features extracted", {
+                    items.append(("No features extracted", {
                         "score": 0,
                         "issues": ["Unable to identify clear product features from page content"],
                         "suggestion": "Make features more prominent and explicit on the page"
-                    })
+                    }))
             except Exception as e:
-                self._add_item(cat, "Extraction error", {
-                    "score": 0,
-                    "issues": [f"Error: {str(e)}"],
-                    "suggestion": "Manual feature-pain analysis needed"
-                })
+                items.append(("Extraction error", self._failed_result(e, "Manual feature-pain analysis needed")))
         else:
-            self._add_item(cat, "API unavailable", {
+            items.append(("API unavailable", {
                 "score": 0,
                 "issues": ["OpenAI API not configured"],
                 "suggestion": "N/A"
-            })
-        
-        # ===================================================================
-        # 10. HEADLINE COPY ANALYSIS
-        # ===================================================================
-        print(f"🔍 10/10: Headline Copy Analysis...")
-        cat = "10. Headline Copy Quality"
+            }))
+        return items
+    
+    def _analyze_headline(self):
+        """Score headline copy across five 1-10 dimensions."""
+        items = []
         
         headline_prompt = f"""Analyze this landing page's headline and subheadline copy quality.
 
@@ -727,109 +957,280 @@ Return JSON:
 
         if self.client:
             try:
-                self.api_calls_made += 1
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are an expert headline copywriter. Return valid JSON only."},
-                        {"role": "user", "content": headline_prompt}
-                    ],
-                    temperature=0.7,
-                    response_format={"type": "json_object"}
-                )
-                
-                headline_analysis = json.loads(response.choices[0].message.content.strip())
+                headline_analysis = self._chat("You are an expert headline copywriter. Return valid JSON only.", headline_prompt,
+                                               TASK_MAX_TOKENS["headline_analysis"])
                 dimensions = headline_analysis.get("dimensions", [])
                 
                 if dimensions:
                     for dim in dimensions:
-                        self._add_item(
-                            cat,
+                        items.append((
                             f"{dim.get('name', 'Unknown')}",
                             {
                                 "score": dim.get('score', 0),
                                 "issues": [dim.get('analysis', 'N/A')],
                                 "suggestion": dim.get('suggestion', 'N/A')
                             }
-                        )
+                        ))
                 else:
-                    self._add_item(cat, "Analysis unavailable", {
+                    items.append(("Analysis unavailable", {
                         "score": 0,
                         "issues": ["Unable to analyze headline"],
                         "suggestion": "Manual review needed"
-                    })
+                    }))
             except Exception as e:
-                self._add_item(cat, "Analysis error", {
-                    "score": 0,
-                    "issues": [f"Error: {str(e)}"],
-                    "suggestion": "Manual headline review needed"
-                })
+                items.append(("Analysis error", self._failed_result(e, "Manual headline review needed")))
         else:
-            self._add_item(cat, "API unavailable", {
+            items.append(("API unavailable", {
                 "score": 0,
                 "issues": ["OpenAI API not configured"],
                 "suggestion": "N/A"
-            })
+            }))
+        return items
     
-    def _add_item(self, category, question, result):
+    def _add_item(self, category, question, result, item_id=None):
         """Add audit result to report."""
         self.report[category].append({
+            "id": item_id,
             "question": question,
             "score": result['score'],
+            "issues": list(result['issues']),
             "details": f"{'. '.join(result['issues'])}",
             "solution": result['suggestion']
         })
     
+    def _page_slug(self):
+        """File-name-safe domain (plus path, so pages of one site stay apart)."""
+        parsed = urlparse(self.url)
+        slug = parsed.netloc.replace('www.', '').replace('.', '_')
+        path = parsed.path.strip('/')
+        if path:
+            slug += '_' + re.sub(r'[^A-Za-z0-9]+', '_', path)[:60].strip('_')
+        return slug
+    
+    def _stream_key(self):
+        """Identifies the page and framework; a resumed stream must match it."""
+        payload = json.dumps([self.url, self.page.to_dict(), self.framework.get("name"), self.framework.get("version")],
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+    
+    def _open_stream(self):
+        """Open the JSONL result stream, picking up finished items when resuming."""
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+        key = self._stream_key()
+        self.stream_path = os.path.join(self.output_dir, f"CRO_STREAM_{self._page_slug()}_{key}.jsonl")
+        
+        self._recorded = {}
+        if self.resume and os.path.exists(self.stream_path):
+            self._recorded = self._read_stream(self.stream_path)
+            print(f"⏩ Resuming: {len(self._recorded)} items already recorded in {self.stream_path}")
+            self._stream = open(self.stream_path, 'a', encoding='utf-8')
+            # Start on a fresh line if the last write was cut off
+            with open(self.stream_path, 'rb') as f:
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._stream.write("\n")
+        else:
+            self._stream = open(self.stream_path, 'w', encoding='utf-8')
+            self._stream.write(json.dumps({"type": "audit", "url": self.url, "key": key,
+                                           "framework": self.framework.get("name"),
+                                           "started": datetime.now().isoformat()}) + "\n")
+            self._stream.flush()
+    
+    @staticmethod
+    def _read_stream(path):
+        """Return {item_id: [(question, result)]} for items that finished with real scores."""
+        recorded = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash (or the blank line after it)
+                if record.get("type") != "item":
+                    continue
+                results = [(r["question"], {"score": r["score"], "issues": r["issues"], "suggestion": r["suggestion"]})
+                           for r in record["results"]]
+                # Later records win; failed or skipped items are run again
+                if all(result["score"] is not None for _, result in results):
+                    recorded[record["id"]] = results
+                else:
+                    recorded.pop(record["id"], None)
+        return recorded
+    
+    def _record(self, category, item_id, future):
+        """Append a finished item to the stream and pass it to on_item (called as each task completes)."""
+        if self._stream is None and not self.on_item:
+            return
+        try:
+            results = future.result()
+        except Exception:
+            return
+        record = {
+            "type": "item", "id": item_id, "category": category,
+            "results": [{"question": question, "score": result["score"], "issues": result["issues"],
+                         "suggestion": result["suggestion"]} for question, result in results],
+        }
+        if self.on_item:
+            self.on_item(record)
+        if self._stream is not None:
+            line = json.dumps(record, ensure_ascii=False)
+            with self._lock:
+                self._stream.write(line + "\n")
+                self._stream.flush()
+    
+    def _baseline_path(self):
+        return os.path.join(self.output_dir, "baselines", f"CRO_BASELINE_{self._page_slug()}.json.gz")
+    
+    def _load_baseline(self):
+        """Carry forward results of items whose inputs match the last audit of this URL."""
+        path = self._baseline_path()
+        if not os.path.exists(path):
+            print("🆕 No baseline for this URL yet, running a full audit")
+            return
+        try:
+            previous, _, snapshot = load_snapshot(path)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable baseline {path} ({e})")
+            return
+        
+        baseline = snapshot.get("meta", {}).get("items", {})
+        rescore = []
+        fields = set()
+        for item in self.framework["items"]:
+            if not item_applies(item, self.page) or item["id"] in self._recorded:
+                continue
+            entry = baseline.get(item["id"])
+            if entry and entry["fingerprint"] == item_fingerprint(item, self.page, self.pack):
+                self._carried[item["id"]] = [(question, result) for question, result in entry["results"]]
+            else:
+                rescore.append(item["id"])
+                fields.update(item_fields(item))
+        
+        changed = [field for field in sorted(fields) if getattr(previous, field) != getattr(self.page, field)]
+        print(f"♻️ Incremental: {len(self._carried)} items carried forward, {len(rescore)} to re-score"
+              + (f" ({', '.join(changed)} changed)" if changed else ""))
+    
+    def _save_baseline(self):
+        """Save this page and the fingerprint + results of every scored item for the next incremental run."""
+        results = defaultdict(list)
+        for entries in self.report.values():
+            for entry in entries:
+                results[entry["id"]].append((entry["question"], {"score": entry["score"], "issues": entry["issues"],
+                                                                 "suggestion": entry["solution"]}))
+        items = {}
+        for item in self.framework["items"]:
+            done = results.get(item["id"])
+            # Unscored items are left out so the next run tries them again
+            if done and item_applies(item, self.page) and all(result["score"] is not None for _, result in done):
+                items[item["id"]] = {"fingerprint": item_fingerprint(item, self.page, self.pack), "results": done}
+        
+        path = self._baseline_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        save_snapshot(path + ".tmp", self.page, self.html, items=items, audited=datetime.now().isoformat())
+        os.replace(path + ".tmp", path)
+    
+    def _save_snapshot(self):
+        """Save the fetched page as a snapshot for offline re-analysis."""
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.output_dir, f"CRO_SNAPSHOT_{self._page_slug()}_{ts}.json.gz")
+        save_snapshot(path, self.page, self.html, fetched_with=self.fetched_with, timings=self.timings,
+                      viewports=self.viewports,
+                      viewport_pages={name: page.to_dict() for name, page in self.viewport_pages.items()})
+        print(f"📸 {path}")
+        return path
+    
+    def _save_trace(self):
+        """Write the trace next to the reports, as plain JSON or OTLP/JSON."""
+        trace = self.trace.to_otlp() if self.trace_format == "otlp" else self.trace.to_json()
+        path = f"{self.report_base}.trace.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f, indent=2)
+        print(f"🧭 {path}")
+    
     def _save_reports(self):
-        """Save MD and HTML reports."""
-        if not os.path.exists("audits"):
-            os.makedirs("audits")
+        """Save MD, HTML and JSON reports."""
+        if not os.path.exists(self.output_dir):
+            os.makedirs(self.output_dir)
         
-        domain = urlparse(self.url).netloc.replace('www.', '').replace('.', '_')
         ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        base = f"audits/CRO_COMPREHENSIVE_{domain}_{ts}"
+        base = os.path.join(self.output_dir, f"CRO_COMPREHENSIVE_{self._page_slug()}_{ts}")
+        self.report_base = base
         
         # Markdown
-        md = self._generate_markdown()
         with open(f"{base}.md", 'w', encoding='utf-8') as f:
-            f.write(md)
+            self._write_markdown(f)
         print(f"📝 {base}.md")
         
         # HTML
-        html = self._generate_html(ts)
         with open(f"{base}.html", 'w', encoding='utf-8') as f:
-            f.write(html)
+            self._write_html(f, ts)
         print(f"🌍 {base}.html")
+        
+        # JSON (and shared JSONL rows for aggregation)
+        report = self.json_report()
+        write_json_report(f"{base}.json", report)
+        print(f"🧾 {base}.json")
+        if self.jsonl:
+            append_jsonl(self.jsonl, report)
+        if self.store:
+            try:
+                self.store.add(report, page=self.page, report_path=base)
+            except Exception as e:
+                print(f"⚠️ Could not record the audit in {self.store.path} ({e})")
     
-    def _generate_markdown(self):
-        """Generate markdown report."""
-        md = f"# 🤖 COMPREHENSIVE CRO AUDIT\n\n**URL:** {self.url}\n**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n**Analysis Depth:** Granular per-item (~40 AI calls)\n\n"
+    def _write_markdown(self, f):
+        """Write the markdown report to a file object."""
+        f.write(f"# 🤖 COMPREHENSIVE CRO AUDIT\n\n**URL:** {self.url}\n**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n**Analysis Depth:** Granular per-item (~40 AI calls)\n\n")
+        
+        repeated = [finding for finding in self.merged_findings() if len(finding["items"]) > 1]
+        if repeated:
+            f.write("## 🧩 Repeated Fixes\n\n")
+            for finding in repeated:
+                f.write(f"- **{finding['suggestion']}** (items {', '.join(finding['items'])})\n")
+            f.write("\n---\n\n")
         
         for cat, items in self.report.items():
-            md += f"## {cat}\n\n"
+            f.write(f"## {cat}\n\n")
             is_headline = "Headline" in cat
             denominator = 10 if is_headline else 3
             
             for item in items:
                 score = item['score']
                 # Determine icon based on scale
-                if is_headline:
+                if score is None:
+                    icon = "⚪"
+                elif is_headline:
                     icon = "🟢" if score >= 7 else ("🟡" if score >= 4 else "🔴")
                 else:
                     icon = "🟢" if score >= 2 else ("🟡" if score == 1 else "🔴")
                 
-                md += f"### {icon} {item['question']}\n"
-                md += f"- **Score:** {score}/{denominator}\n"
-                md += f"- **Analysis:** {item['details']}\n"
-                md += f"- **💡 Fix:** {item['solution']}\n\n"
-            md += "---\n\n"
-        
-        md += f"**Scoring:** 🔴 0=Critical | 🟡 1=Needs Work | 🟢 2+=Good\n*Powered by AI - {self.api_calls_made} API calls*"
-        return md
-    
-    def _generate_html(self, timestamp):
-        """Generate HTML report."""
-        html = f"""<!DOCTYPE html>
+                f.write(f"### {icon} {item['question']}\n")
+                f.write(f"- **Score:** {'n/a' if score is None else score}/{denominator}\n")
+                f.write(f"- **Analysis:** {item['details']}\n")
+                f.write(f"- **💡 Fix:** {item['solution']}\n\n")
+            f.write("---\n\n")
+        
+        diffs = self.viewport_diffs()
+        if self.viewport_results:
+            f.write("## 📱 Viewport Differences\n\n")
+            if not diffs:
+                f.write(f"No score changes on {', '.join(self.viewport_results)}.\n\n")
+            for diff in diffs:
+                f.write(f"### {diff['id']} {diff['question']} ({diff['viewport']})\n")
+                f.write(f"- **Score:** {diff['primary_score']} on {self.viewports[0]} → {diff['score']} on {diff['viewport']}\n")
+                f.write(f"- **Analysis:** {'. '.join(diff['issues'])}\n")
+                f.write(f"- **💡 Fix:** {diff['suggestion']}\n\n")
+            f.write("---\n\n")
+        
+        f.write(f"**Scoring:** 🔴 0=Critical | 🟡 1=Needs Work | 🟢 2+=Good | ⚪ Not scored\n*Powered by AI - {self.api_calls_made} API calls{self._cache_summary()}*")
+    
+    def _write_html(self, f, timestamp):
+        """Write the HTML report to a file object."""
+        f.write(f"""<!DOCTYPE html>
 <html>
 <head>
     <title>CRO Audit: {self.url}</title>
@@ -846,6 +1247,7 @@ Return JSON:
         .score.high {{ color: #0f9d58; }}
         .score.med {{ color: #f4b400; }}
         .score.low {{ color: #d93025; }}
+        .score.na {{ color: #9aa0a6; }}
         .fix {{ background: #e8f0fe; padding: 15px; border-radius: 4px; margin-top: 10px; }}
     </style>
 </head>
@@ -857,40 +1259,174 @@ Return JSON:
             Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}<br>
             Analysis: Granular per-item (~40 AI calls)
         </div>
-"""
+""")
         
         for cat, items in self.report.items():
-            html += f'<div class="category"><div class="category-header">{cat}</div>'
+            f.write(f'<div class="category"><div class="category-header">{cat}</div>')
             is_headline = "Headline" in cat
             denominator = 10 if is_headline else 3
             
             for item in items:
                 score = item['score']
                 # Determine score class
-                if is_headline:
+                if score is None:
+                    score_class = "na"
+                elif is_headline:
                     score_class = "high" if score >= 7 else ("med" if score >= 4 else "low")
                 else:
                     score_class = "high" if score >= 2 else ("med" if score == 1 else "low")
                 
-                html += f"""
+                f.write(f"""
                 <div class="item">
                     <h3>{item['question']}</h3>
-                    <div class="score {score_class}">Score: {score}/{denominator}</div>
+                    <div class="score {score_class}">Score: {'n/a' if score is None else score}/{denominator}</div>
                     <p><strong>Analysis:</strong> {item['details']}</p>
                     <div class="fix"><strong>💡 Fix:</strong> {item['solution']}</div>
-                </div>"""
-            html += "</div>"
+                </div>""")
+            f.write("</div>")
+        
+        if self.viewport_results:
+            f.write('<div class="category"><div class="category-header">📱 Viewport differences</div>')
+            diffs = self.viewport_diffs()
+            if not diffs:
+                f.write(f'<div class="item">No score changes on {", ".join(self.viewport_results)}.</div>')
+            for diff in diffs:
+                f.write(f"""
+                <div class="item">
+                    <h3>{diff['id']} {diff['question']} ({diff['viewport']})</h3>
+                    <div class="score">Score: {diff['primary_score']} on {self.viewports[0]} → {diff['score']} on {diff['viewport']}</div>
+                    <p><strong>Analysis:</strong> {'. '.join(diff['issues'])}</p>
+                    <div class="fix"><strong>💡 Fix:</strong> {diff['suggestion']}</div>
+                </div>""")
+            f.write("</div>")
             
-        html += f"""
+        f.write(f"""
         <div class="meta" style="margin-top: 40px; border-top: 1px solid #eee; padding-top: 20px;">
-            Powered by AI - {self.api_calls_made} API calls
+            Powered by AI - {self.api_calls_made} API calls{self._cache_summary()}
         </div>
     </div>
 </body>
-</html>"""
-        return html
+</html>""")
 
 if __name__ == "__main__":
-    url = sys.argv[1] if len(sys.argv) > 1 else input("Enter URL: ")
-    auditor = ComprehensiveCROAuditor(url)
-    auditor.run_audit()
+    parser = argparse.ArgumentParser(description="Comprehensive CRO audit of a landing page.")
+    parser.add_argument("url", nargs="?", help="URL to audit (prompted if omitted)")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help="Maximum OpenAI requests in flight per audit (1 = sequential)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Send items that share a page context in one batched request")
+    parser.add_argument("--cache", action="store_true", help="Cache LLM responses on disk")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help="SQLite file for the response cache")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL / 3600, help="Cache entry lifetime in hours")
+    parser.add_argument("--cache-max-entries", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="Evict least recently used entries beyond this count")
+    parser.add_argument("--no-deterministic", action="store_true",
+                        help="Keep temperature 0.7 even when the cache is enabled")
+    parser.add_argument("--fetch", choices=["auto", "static", "browser"], default="auto",
+                        help="auto: plain HTTP first, browser only for JS-rendered pages")
+    parser.add_argument("--scroll-budget", type=float, default=SCROLL_TIME_BUDGET,
+                        help="Seconds to spend scrolling for lazy-loaded content")
+    parser.add_argument("--scroll-max-height", type=int, default=SCROLL_MAX_HEIGHT,
+                        help="Stop scrolling below this many pixels")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_REQUESTS_PER_MIN,
+                        help="OpenAI requests per minute allowed across all audits (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TOKENS_PER_MIN,
+                        help="OpenAI tokens per minute allowed across all audits (0 = unlimited)")
+    parser.add_argument("--max-retries", type=int, default=DEFAULT_MAX_RETRIES,
+                        help="Retries for rate-limited or failed OpenAI calls")
+    parser.add_argument("--token-budget", type=int, help="Stop making OpenAI calls after this many tokens per audit")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip items already recorded in the result stream for the same URL and page content")
+    parser.add_argument("--jsonl", metavar="PATH",
+                        help="Append one JSON row per audited item to this file (bulk runs default to items.jsonl)")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH, metavar="PATH",
+                        help=f"Record audits in a SQLite history store (default path: {DEFAULT_STORE_PATH})")
+    parser.add_argument("--trace", choices=["json", "otlp"],
+                        help="Save a per-stage timing and token trace next to the reports (otlp = OpenTelemetry JSON)")
+    parser.add_argument("--no-rules", action="store_true",
+                        help="Send objective items (form length, media, keywords) to the LLM instead of local rules")
+    parser.add_argument("--rule-confidence", type=float, default=DEFAULT_CONFIDENCE,
+                        help="Minimum confidence for a local rule result; below it the LLM decides (default: %(default)s)")
+    parser.add_argument("--viewports", nargs="+", choices=sorted(VIEWPORTS), default=["desktop"],
+                        help="Capture these viewports in one browser session; the first is audited in full and "
+                             "items that read differently on the others are re-scored and diffed")
+    parser.add_argument("--no-pack", action="store_true",
+                        help="Send copy items the leading text of the page instead of its most relevant sections")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-score only items whose page inputs changed since the last --incremental run of the URL")
+    parser.add_argument("--framework", help="Path to a JSON framework definition (defaults to the built-in framework)")
+    parser.add_argument("--save-snapshot", action="store_true",
+                        help="Save the fetched page model and HTML as a .json.gz snapshot next to the reports")
+    parser.add_argument("--from-snapshot", nargs="+", metavar="PATH",
+                        help="Audit saved snapshot(s) instead of fetching; directories are searched for *.json.gz")
+    
+    bulk = parser.add_argument_group("bulk audits")
+    bulk.add_argument("--urls", metavar="SOURCE",
+                      help="Audit many URLs from a text file, a sitemap.xml (path or URL) or '-' for stdin")
+    bulk.add_argument("--workers", type=int, default=4, help="Pages audited at the same time")
+    bulk.add_argument("--browser-slots", type=int, default=2, help="Maximum concurrent browser fetches")
+    bulk.add_argument("--browser-max-pages", type=int, default=50,
+                      help="Recycle a pooled browser after this many pages")
+    bulk.add_argument("--browser-max-rss", type=float, default=1500,
+                      help="Recycle a pooled browser above this many MB of RSS (needs psutil)")
+    bulk.add_argument("--llm-slots", type=int, default=16, help="Maximum concurrent LLM calls across all pages")
+    bulk.add_argument("--url-timeout", type=float, default=600,
+                      help="Seconds before a page is given up on; its audit then stops at its next LLM call "
+                           "and saves no reports (a fetch or call already running finishes first, within "
+                           "CRO_LLM_TIMEOUT for calls)")
+    bulk.add_argument("--site", action="store_true",
+                      help="Treat the pages as one site: audit shared components once and write a SITE.md rollup")
+    args = parser.parse_args()
+    
+    framework = load_framework(args.framework) if args.framework else None
+    cache = None
+    if args.cache:
+        cache = ResponseCache(args.cache_path, ttl=args.cache_ttl * 3600, max_entries=args.cache_max_entries)
+    auditor_kwargs = dict(max_concurrency=args.max_concurrency, framework=framework, batch=args.batch,
+                          cache=cache, deterministic=not args.no_deterministic,
+                          scroll_budget=args.scroll_budget, scroll_max_height=args.scroll_max_height,
+                          fetch_mode=args.fetch, save_snapshot=args.save_snapshot,
+                          rate_limiter=RateLimiter(args.rpm, args.tpm), max_retries=args.max_retries,
+                          token_budget=args.token_budget, resume=args.resume, jsonl=args.jsonl,
+                          trace_format=args.trace, incremental=args.incremental,
+                          rules=not args.no_rules, rule_confidence=args.rule_confidence, pack=not args.no_pack, viewports=args.viewports,
+                          store=AuditStore(args.store) if args.store else None)
+    
+    snapshots = []
+    for path in args.from_snapshot or []:
+        if os.path.isdir(path):
+            snapshots.extend(sorted(glob.glob(os.path.join(path, "*.json.gz"))))
+        else:
+            snapshots.append(path)
+    
+    if len(snapshots) == 1:
+        auditor = ComprehensiveCROAuditor(args.url, snapshot=snapshots[0], **auditor_kwargs)
+        auditor.run_audit()
+    elif snapshots:
+        from cro_batch import BatchRunner
+        
+        if os.environ.get('OPENAI_API_KEY'):
+            auditor_kwargs["client"] = OpenAI(api_key=os.environ['OPENAI_API_KEY'], max_retries=0, timeout=LLM_TIMEOUT)
+        runner = BatchRunner(ComprehensiveCROAuditor, snapshots, workers=args.workers, llm_slots=args.llm_slots,
+                             url_timeout=args.url_timeout, snapshots=True, site=args.site, **auditor_kwargs)
+        runner.run()
+    elif args.urls:
+        from cro_batch import BatchRunner, read_urls
+        
+        if os.environ.get('OPENAI_API_KEY'):
+            # One client (and connection pool) shared by every worker
+            auditor_kwargs["client"] = OpenAI(api_key=os.environ['OPENAI_API_KEY'], max_retries=0, timeout=LLM_TIMEOUT)
+        browser_pool = BrowserPool(size=args.browser_slots, max_pages=args.browser_max_pages,
+                                   max_rss_mb=args.browser_max_rss)
+        try:
+            runner = BatchRunner(ComprehensiveCROAuditor, read_urls(args.urls), workers=args.workers,
+                                 browser_slots=args.browser_slots, llm_slots=args.llm_slots,
+                                 url_timeout=args.url_timeout, browser_pool=browser_pool, site=args.site,
+                                 **auditor_kwargs)
+            runner.run()
+        finally:
+            browser_pool.close()
+    else:
+        url = args.url or input("Enter URL: ")
+        auditor = ComprehensiveCROAuditor(url, **auditor_kwargs)
+        auditor.run_audit()
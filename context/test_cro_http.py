@@ -0,0 +1,62 @@
+"""Static-vs-browser decisions on pages served by cro_bench's local server.
+
+    python -m pytest -q test_cro_http.py
+"""
+import pytest
+
+from cro_bench import MockServer, load_fixtures
+from cro_http import fetch_static, needs_browser
+from live_cro_analyzer import ComprehensiveCROAuditor
+
+COPY = "<p>" + "Release pipelines that test themselves and tell your team what broke before customers do. " * 4 + "</p>"
+
+CLIENT_RENDERED = {
+    "spa_shell": ('<html><head><script src="/app.js"></script></head><body><div id="root"></div></body></html>',
+                  "empty SPA mount point"),
+    "next_shell": ('<html><body><div id="__next">  </div><script>self.__next_f=[]</script></body></html>',
+                   "empty SPA mount point"),
+    "noscript": ('<html><body><noscript>You need to enable JavaScript to run this app.</noscript>'
+                 '<h1>Acme</h1>' + COPY + '</body></html>', "page asks for JavaScript"),
+    "no_h1": ('<html><body><h2>Acme</h2>' + COPY + '</body></html>', "no <h1> in server HTML"),
+    "thin": ('<html><body><h1>Acme</h1><p>Loading...</p><script>' + "x" * 5000 + '</script></body></html>',
+             "too little text"),
+}
+
+
+@pytest.fixture(scope="module")
+def server():
+    fixtures = dict(load_fixtures([]), **{name: html for name, (html, _) in CLIENT_RENDERED.items()})
+    server = MockServer(fixtures).start()
+    yield server
+    server.stop()
+
+
+@pytest.mark.parametrize("name", ["small", "medium", "large"])
+def test_server_rendered_fixtures_stay_static(server, name):
+    assert needs_browser(fetch_static(f"{server.base_url}/{name}.html")) is None
+
+
+@pytest.mark.parametrize("name", sorted(CLIENT_RENDERED))
+def test_client_rendered_pages_need_the_browser(server, name):
+    assert needs_browser(fetch_static(f"{server.base_url}/{name}.html")) == CLIENT_RENDERED[name][1]
+
+
+def test_http_errors_raise(server):
+    with pytest.raises(RuntimeError, match="HTTP 404"):
+        fetch_static(f"{server.base_url}/missing.html")
+
+
+def test_auto_mode_audits_server_html_without_a_browser(server, tmp_path):
+    auditor = ComprehensiveCROAuditor(f"{server.base_url}/medium.html", client=None, output_dir=str(tmp_path))
+    assert auditor.fetch()
+    assert auditor.fetched_with == "http"
+    assert auditor.page.h1
+
+
+def test_static_mode_keeps_client_rendered_html_but_records_why(server, tmp_path):
+    auditor = ComprehensiveCROAuditor(f"{server.base_url}/spa_shell.html", client=None, output_dir=str(tmp_path),
+                                      fetch_mode="static")
+    assert auditor.fetch()
+    assert auditor.fetched_with == "http"
+    http = next(span for span in auditor.trace.spans if span["name"] == "http")
+    assert http["attributes"]["needs_browser"] == "empty SPA mount point"
@@ -0,0 +1,49 @@
+"""Token budget and retry paths of the auditor, against cro_bench's mock OpenAI server.
+
+    python -m pytest -q test_cro_llm.py
+"""
+import pytest
+from openai import OpenAI
+
+from cro_bench import MockServer, make_fixture
+from cro_page import PageModel
+from live_cro_analyzer import ComprehensiveCROAuditor
+
+
+@pytest.fixture
+def server():
+    server = MockServer({}, latency_ms=20, jitter_ms=10).start()
+    yield server
+    server.stop()
+
+
+def audit(server, tmp_path, **kwargs):
+    client = OpenAI(api_key="mock", base_url=f"{server.base_url}/v1", max_retries=0)
+    page = PageModel.from_html(make_fixture(40, seed=40), "https://example.com/")
+    auditor = ComprehensiveCROAuditor(page.url, page=page, client=client, output_dir=str(tmp_path), **kwargs)
+    auditor.run_audit()
+    return auditor
+
+
+def test_token_budget_is_a_hard_cap(server, tmp_path):
+    auditor = audit(server, tmp_path, token_budget=3000, max_concurrency=16)
+    assert auditor.budget_exhausted
+    assert 0 < auditor.tokens_used <= 3000
+    assert auditor.tokens_reserved == 0
+    # Skipped items are unscored, not zeros
+    assert auditor.summary()["unscored"] > 0
+    assert server.requests == auditor.api_calls_made
+
+
+def test_no_budget_scores_everything(server, tmp_path):
+    auditor = audit(server, tmp_path, max_concurrency=16)
+    assert not auditor.budget_exhausted
+    assert auditor.summary()["unscored"] == 0
+
+
+def test_rate_limited_calls_are_retried(server, tmp_path):
+    server.error_rate = 0.2
+    auditor = audit(server, tmp_path, max_concurrency=16)
+    assert server.errors > 0
+    assert auditor.llm.retries == server.errors
+    assert auditor.summary()["unscored"] == 0
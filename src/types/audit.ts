@@ -57,4 +57,66 @@ export interface FilterState {
   impact: string;
   effort: string;
   section: string;
-}
\ No newline at end of file
+}
+
+// Structured report written by the Python auditor (context/cro_report.py, schema_version 2)
+export interface CROReportItem {
+  id: string | null;
+  category: string;
+  question: string;
+  score: number | null;
+  scale: { min: number; max: number };
+  status: 'scored' | 'unscored';
+  issues: string[];
+  suggestion: string;
+}
+
+export interface CROViewportDiff {
+  id: string;
+  viewport: string;
+  question: string;
+  score: number | null;
+  primary_score: number | null;
+  issues: string[];
+  suggestion: string;
+}
+
+export interface CROMergedFinding {
+  suggestion: string;
+  findings: number;
+  items: string[];
+  pages: string[];
+  variants: number;
+  issues: string[];
+}
+
+export interface CROAuditReport {
+  schema: 'cro-audit-report';
+  schema_version: 2;
+  url: string;
+  generated_at: string;
+  framework: { name: string; version: string };
+  fetched_with: string | null;
+  error: string | null;
+  summary: { items: number; unscored: number; score_pct: number | null; carried_forward: number; rule_scored: number; site_shared: number };
+  timings: Record<string, number>;
+  viewports: {
+    primary: string;
+    captured: string[];
+    rescored: Record<string, string[]>;
+    diffs: CROViewportDiff[];
+  };
+  findings: CROMergedFinding[];
+  usage: {
+    model: string | null;
+    api_calls: number;
+    tokens: number;
+    prompt_tokens: number;
+    completion_tokens: number;
+    retries: number;
+    token_budget: number | null;
+    budget_exhausted: boolean;
+  };
+  cache: { enabled: boolean; hits: number; misses: number };
+  items: CROReportItem[];
+}